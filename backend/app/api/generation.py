@@ -205,7 +205,8 @@ async def delete_task(task_id: str, url: str = None, db: Session = Depends(get_d
         else:
             return {"message": "图片不存在或已删除"}
 
-    # 如果没有指定URL，删除整个任务
+    # 如果没有指定URL，删除整个任务（仍在生成的先取消，释放配额）
+    task_manager.cancel_task(task_id)
     db.delete(task)
     db.commit()
 
@@ -226,8 +227,9 @@ async def clear_tasks(session_id: str, db: Session = Depends(get_db)):
     
     count = len(tasks)
     
-    # 批量删除
+    # 批量删除（仍在生成的先取消，释放配额）
     for task in tasks:
+        task_manager.cancel_task(task.task_id)
         db.delete(task)
     
     db.commit()
@@ -0,0 +1,200 @@
+"""持久任务队列 - 基于 generation_tasks 表的租约式领取
+
+任务创建时只写入一行 pending 记录，由调度器（TaskManager 的调度循环）领取后执行。
+领取时写入租约（lease_token / lease_expires_at）并累加 attempts，执行期间定期续约，
+结束时清除租约。进程重启或崩溃后，未完成任务的租约过期（可见性超时），
+会被重新领取执行；超过最大尝试次数的任务标记为失败，避免反复崩溃的任务无限重试。
+上次执行时已提交的 DashScope 任务记录在任务行上，重新领取后接着轮询，不会重复提交和计费。
+
+领取使用带条件的 UPDATE（仅当租约为空或已过期时才写入新租约），
+多个进程共享同一数据库时同一任务也只会被一个调度器领取。
+"""
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, or_
+
+from .database import SessionLocal
+from .models import GenerationTask
+
+# 租约时长（秒）：超过这个时间没有续约，任务视为执行它的进程已退出
+LEASE_SECONDS = float(os.getenv("QWENIMG_JOB_LEASE_SECONDS", "120"))
+# 每个任务最多被领取执行的次数
+MAX_ATTEMPTS = int(os.getenv("QWENIMG_JOB_MAX_ATTEMPTS", "3"))
+# 本进程同时执行的任务数上限
+MAX_RUNNING = int(os.getenv("QWENIMG_JOB_MAX_RUNNING", "16"))
+# 每秒最多开始执行的任务数（控制积压任务的消化速度）
+DISPATCH_RATE = float(os.getenv("QWENIMG_JOB_DISPATCH_RATE", "2"))
+
+# 仍需执行的任务状态
+UNFINISHED_STATUSES = ("pending", "running")
+
+
+class ClaimedJob:
+    """调度器领取到的一个任务"""
+
+    __slots__ = (
+        "task_id", "task_type", "params", "attempts", "lease_token",
+        "remote_task_id", "remote_base_address", "remote_key",
+    )
+
+    def __init__(
+        self,
+        task_id: str,
+        task_type: str,
+        params: dict,
+        attempts: int,
+        lease_token: str,
+        remote_task_id: Optional[str] = None,
+        remote_base_address: Optional[str] = None,
+        remote_key: Optional[str] = None,
+    ):
+        self.task_id = task_id
+        self.task_type = task_type
+        self.params = params
+        self.attempts = attempts
+        self.lease_token = lease_token
+        # 上次执行时已提交的 DashScope 任务（没有则为 None）
+        self.remote_task_id = remote_task_id
+        self.remote_base_address = remote_base_address
+        self.remote_key = remote_key
+
+    def __repr__(self) -> str:
+        return f"ClaimedJob({self.task_id!r}, {self.task_type!r}, attempts={self.attempts})"
+
+
+class JobQueue:
+    """generation_tasks 表上的租约式任务队列"""
+
+    def __init__(self, lease_seconds: float = LEASE_SECONDS, max_attempts: int = MAX_ATTEMPTS):
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+    def _claimable(self, now: datetime):
+        """未完成且没有有效租约的任务"""
+        return (
+            GenerationTask.status.in_(UNFINISHED_STATUSES),
+            or_(GenerationTask.lease_expires_at.is_(None), GenerationTask.lease_expires_at < now),
+        )
+
+    def claim(self, limit: int) -> Tuple[List[ClaimedJob], List[ClaimedJob]]:
+        """
+        按创建顺序领取最多 limit 个任务
+
+        Returns:
+            (可执行的任务, 超过最大尝试次数、应标记为失败的任务)
+        """
+        if limit <= 0:
+            return [], []
+        now = datetime.now()
+        token = uuid.uuid4().hex
+        db = SessionLocal()
+        try:
+            ids = [
+                row.id for row in db.query(GenerationTask.id)
+                .filter(*self._claimable(now))
+                .order_by(GenerationTask.created_at, GenerationTask.id)
+                .limit(limit)
+            ]
+            if not ids:
+                return [], []
+
+            # 条件更新：其他进程刚领取的任务不满足条件，不会被重复领取
+            db.query(GenerationTask).filter(GenerationTask.id.in_(ids), *self._claimable(now)).update(
+                {
+                    GenerationTask.lease_token: token,
+                    GenerationTask.lease_expires_at: now + timedelta(seconds=self.lease_seconds),
+                    GenerationTask.attempts: func.coalesce(GenerationTask.attempts, 0) + 1,
+                },
+                synchronize_session=False,
+            )
+            db.commit()
+
+            jobs, abandoned = [], []
+            for task in db.query(GenerationTask).filter(GenerationTask.lease_token == token):
+                job = ClaimedJob(
+                    task.task_id, task.task_type, task.params or {}, task.attempts, token,
+                    task.remote_task_id, task.remote_base_address, task.remote_key,
+                )
+                (abandoned if task.attempts > self.max_attempts else jobs).append(job)
+            return jobs, abandoned
+        finally:
+            db.close()
+
+    def extend(self, leases: Dict[str, str]) -> None:
+        """为正在执行的任务续约（task_id -> lease_token）"""
+        if not leases:
+            return
+        db = SessionLocal()
+        try:
+            db.query(GenerationTask).filter(
+                GenerationTask.task_id.in_(list(leases)),
+                GenerationTask.lease_token.in_(set(leases.values())),
+            ).update(
+                {GenerationTask.lease_expires_at: datetime.now() + timedelta(seconds=self.lease_seconds)},
+                synchronize_session=False,
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def release(self, leases: Dict[str, str]) -> None:
+        """
+        放弃租约，让任务回到排队状态并可立即被重新领取（例如服务正常关闭时）
+
+        本次领取不计入尝试次数。
+        """
+        if not leases:
+            return
+        db = SessionLocal()
+        try:
+            db.query(GenerationTask).filter(
+                GenerationTask.task_id.in_(list(leases)),
+                GenerationTask.lease_token.in_(set(leases.values())),
+                GenerationTask.status.in_(UNFINISHED_STATUSES),
+            ).update(
+                {
+                    GenerationTask.status: "pending",
+                    GenerationTask.lease_token: None,
+                    GenerationTask.lease_expires_at: None,
+                    GenerationTask.attempts: func.coalesce(GenerationTask.attempts, 1) - 1,
+                },
+                synchronize_session=False,
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def record_remote_task(
+        self, task_id: str, remote_task_id: str, base_address: Optional[str], key: Optional[str]
+    ) -> None:
+        """记录任务已提交的 DashScope 任务，重新领取时据此接着轮询"""
+        db = SessionLocal()
+        try:
+            db.query(GenerationTask).filter(
+                GenerationTask.task_id == task_id,
+                GenerationTask.status.in_(UNFINISHED_STATUSES),
+            ).update(
+                {
+                    GenerationTask.remote_task_id: remote_task_id,
+                    GenerationTask.remote_base_address: base_address,
+                    GenerationTask.remote_key: key,
+                },
+                synchronize_session=False,
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def counts(self) -> Dict[str, int]:
+        """排队中（未领取）与执行中（持有有效租约）的任务数"""
+        now = datetime.now()
+        db = SessionLocal()
+        try:
+            unfinished = db.query(GenerationTask).filter(GenerationTask.status.in_(UNFINISHED_STATUSES))
+            queued = unfinished.filter(*self._claimable(now)).count()
+            return {"queued": queued, "leased": unfinished.count() - queued}
+        finally:
+            db.close()
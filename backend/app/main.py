@@ -7,6 +7,7 @@ import os
 import logging
 
 from .database import init_db
+from .tasks import task_manager
 from .api import generation, websocket, inspiration, upload
 
 # 配置日志
@@ -131,6 +132,15 @@ async def startup_event():
     finally:
         db.close()
 
+    # 启动任务调度：继续执行上次关闭或崩溃时未完成的任务
+    task_manager.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """关闭时交还正在执行任务的租约，重启后立即继续"""
+    await task_manager.stop()
+
 
 @app.get("/")
 async def root():
@@ -45,6 +45,17 @@ class GenerationTask(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     completed_at = Column(DateTime(timezone=True), nullable=True)
 
+    # 持久任务队列：调度器领取任务时写入租约，运行期间定期续约；
+    # 进程退出后租约过期，任务会被重新领取
+    attempts = Column(Integer, default=0)  # 已领取（执行）次数
+    lease_token = Column(String(32), nullable=True, index=True)  # 本次领取的租约标识
+    lease_expires_at = Column(DateTime, nullable=True, index=True)  # 租约到期时间
+
+    # 已提交的 DashScope 任务：提交成功后立即记录，任务被重新领取时接着轮询它而不重新提交
+    remote_task_id = Column(String(100), nullable=True)  # DashScope 任务ID
+    remote_base_address = Column(Text, nullable=True)  # 提交到的接入点
+    remote_key = Column(String(16), nullable=True)  # 提交所用 API Key 的指纹（不保存 Key 本身）
+
     # 用户信息（未来扩展）
     user_id = Column(String(50), nullable=True, index=True)
     session_id = Column(String(100), nullable=True, index=True)
@@ -74,6 +85,8 @@ class GenerationTask(Base):
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
             "completed_at": self.completed_at.isoformat() if self.completed_at else None,
+            "attempts": self.attempts,
+            "remote_task_id": self.remote_task_id,
             "user_id": self.user_id,
             "session_id": self.session_id,
         }
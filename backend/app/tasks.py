@@ -6,21 +6,23 @@ from typing import Dict, Optional, Callable, Any
 from concurrent.futures import ThreadPoolExecutor
 import sys
 import os
-from PIL import Image
-import io
 import base64
 
 # 添加父目录到路径以导入qwenimg
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
 
-from qwenimg import QwenImg
+from qwenimg import AsyncQwenImg, TaskProgress
+from qwenimg.download import download_file
+from qwenimg.keys import key_fingerprint
+from qwenimg.utils import filename_from_url
 from .database import SessionLocal
+from .jobqueue import ClaimedJob, JobQueue, MAX_RUNNING, DISPATCH_RATE
 from .models import GenerationTask
 import logging
 
 logger = logging.getLogger(__name__)
 
-# 线程池执行器 - 用于运行同步的QwenImg调用
+# 线程池执行器 - 用于视频文件下载等阻塞IO
 executor = ThreadPoolExecutor(max_workers=5)
 
 # WebSocket连接管理器
@@ -71,23 +73,221 @@ manager = ConnectionManager()
 
 class TaskManager:
     """任务管理器"""
+
+    # 调度循环的最长空闲等待（秒）：新任务会立即唤醒调度，超时只用于续约和领取过期任务
+    DISPATCH_INTERVAL = 1.0
+
     def __init__(self):
         self.tasks: Dict[str, asyncio.Task] = {}  # task_id -> asyncio.Task
-        self.qwen_client: Optional[QwenImg] = None
+        self.qwen_client: Optional[AsyncQwenImg] = None
+        # 任务持久化在 generation_tasks 表中，由调度循环领取执行，服务重启后继续
+        self.queue = JobQueue()
+        self.max_running = MAX_RUNNING
+        self.dispatch_rate = DISPATCH_RATE
+        self._leases: Dict[str, str] = {}  # task_id -> lease_token
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._runners = {
+            "text_to_image": self.run_text_to_image,
+            "image_to_video": self.run_image_to_video,
+            "text_to_video": self.run_text_to_video,
+        }
+
+    def start(self):
+        """启动调度循环（应用启动时调用），会接着执行上次未完成的任务"""
+        if self._dispatcher is None:
+            self._wakeup = asyncio.Event()
+            self._dispatcher = asyncio.create_task(self._dispatch_loop())
+            logger.info("Job dispatcher started")
+
+    async def stop(self):
+        """
+        停止调度循环（应用关闭时调用）
+
+        正在执行的任务被中断并交还租约，下次启动后立即重新执行，不计入尝试次数。
+        """
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            await asyncio.gather(self._dispatcher, return_exceptions=True)
+            self._dispatcher = None
+        leases = dict(self._leases)
+        running = list(self.tasks.values())
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+        self.queue.release(leases)
+        if self.qwen_client:
+            await self.qwen_client.close()
+            self.qwen_client = None
+        logger.info(f"Job dispatcher stopped, released {len(leases)} running task(s)")
+
+    def queue_stats(self) -> Dict[str, int]:
+        """持久队列中排队、执行中的任务数，以及本进程正在执行的任务数"""
+        stats = self.queue.counts()
+        stats["running_here"] = len(self.tasks)
+        return stats
+
+    async def _dispatch_loop(self):
+        """
+        从持久队列领取任务并执行
+
+        同时执行的任务数不超过 max_running，开始执行的速度不超过每秒 dispatch_rate 个
+        （令牌桶，允许约一秒的突发），积压的任务按创建顺序平稳消化；
+        执行中的任务每隔租约时长的三分之一续约一次。
+        """
+        loop = asyncio.get_event_loop()
+        burst = max(1.0, self.dispatch_rate)
+        tokens, last_refill = burst, loop.time()
+        last_extend = loop.time()
+        while True:
+            try:
+                now = loop.time()
+                if now - last_extend >= self.queue.lease_seconds / 3:
+                    self.queue.extend(self._leases)
+                    last_extend = now
+
+                tokens = min(burst, tokens + (now - last_refill) * self.dispatch_rate)
+                last_refill = now
+                jobs, abandoned = self.queue.claim(min(self.max_running - len(self.tasks), int(tokens)))
+                tokens -= len(jobs) + len(abandoned)
+
+                for job in abandoned:
+                    logger.warning(f"Task abandoned after {job.attempts - 1} attempts: {job.task_id}")
+                    await self.complete_task(
+                        job.task_id, [], f"任务执行 {job.attempts - 1} 次均未完成（服务重启或崩溃），已放弃"
+                    )
+                for job in jobs:
+                    if job.task_type in self._runners:
+                        self._start_job(job)
+                    else:
+                        await self.complete_task(job.task_id, [], f"Unknown task type: {job.task_type}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job dispatch failed: {e}")
+
+            # 不用 wait_for：唤醒与 stop() 的取消同时发生时，它会吞掉取消，调度循环永不退出
+            wakeup = asyncio.ensure_future(self._wakeup.wait())
+            try:
+                await asyncio.wait({wakeup}, timeout=self.DISPATCH_INTERVAL)
+            finally:
+                wakeup.cancel()
+            self._wakeup.clear()
+
+    def _start_job(self, job: ClaimedJob):
+        """执行领取到的任务，结束后释放执行槽位并唤醒调度"""
+        task = asyncio.create_task(
+            self._runners[job.task_type](job.task_id, job.params, self._remote_task(job))
+        )
+        self.tasks[job.task_id] = task
+        self._leases[job.task_id] = job.lease_token
+
+        def finished(_task):
+            if self.tasks.get(job.task_id) is _task:
+                del self.tasks[job.task_id]
+            if self._leases.get(job.task_id) == job.lease_token:
+                del self._leases[job.task_id]
+            self._wakeup.set()
+
+        task.add_done_callback(finished)
+        if job.attempts > 1:
+            logger.info(f"Task resumed: {job.task_id} (attempt {job.attempts})")
+
+    def _remote_task(self, job: ClaimedJob) -> Optional[dict]:
+        """
+        上次执行时已提交的 DashScope 任务，重新领取后接着轮询它而不重新提交
+
+        没有记录，或提交所用的 API Key 已不在本进程的配置中（无法查询该任务）时返回 None。
+        """
+        if not job.remote_task_id:
+            return None
+        self.init_client()
+        api_key = None
+        if job.remote_key:
+            keys = self.qwen_client.keys.keys if self.qwen_client.keys else [self.qwen_client.api_key]
+            api_key = next((key for key in keys if key_fingerprint(key) == job.remote_key), None)
+            if api_key is None:
+                logger.warning(
+                    f"API key of remote task {job.remote_task_id} is no longer configured, "
+                    f"task {job.task_id} will be submitted again"
+                )
+                return None
+        return {"task_id": job.remote_task_id, "api_key": api_key, "base_address": job.remote_base_address}
+
+    async def _resume(
+        self,
+        kind: str,
+        remote: dict,
+        progress: Optional[Callable[[TaskProgress], None]] = None,
+        **kwargs,
+    ):
+        """
+        等待上次执行时已提交的 DashScope 任务完成，返回与直接调用客户端相同的结果
+
+        远程任务已被取消时（服务关闭时仍在排队的任务会被取消，不计费）返回 None，由调用方重新提交。
+        """
+        last_status = []
+
+        def report(state: TaskProgress) -> None:
+            last_status[:] = [state.status]
+            if progress:
+                progress(state)
+
+        logger.info(f"Resuming remote task {remote['task_id']} ({kind})")
+        try:
+            return await self.qwen_client.resume_task(
+                kind, remote["task_id"], api_key=remote["api_key"], base_address=remote["base_address"],
+                progress=report, **{name: value for name, value in kwargs.items() if value is not None},
+            )
+        except RuntimeError:
+            if last_status == ["CANCELED"]:
+                logger.info(f"Remote task {remote['task_id']} was canceled, submitting again")
+                return None
+            raise
 
     def init_client(self, api_key: Optional[str] = None):
         """初始化QwenImg客户端"""
         if not self.qwen_client:
-            self.qwen_client = QwenImg(api_key=api_key)
+            # 使用进程内共享的自适应限流器：被限流时自动收缩并发窗口，恢复后逐步放大
+            # coalesce：不同会话同时提交完全相同的请求时共用一个远程任务和一次下载
+            # upload_cache：同一张上传图片/音频在有效期内只上传一次
+            # normalize_inputs：上传的大图/BMP/GIF 先缩小到目标分辨率并转为 JPEG 再提交
+            # hooks：按阶段（提交/排队/生成/下载/解码）和模型统计耗时直方图
+            self.qwen_client = AsyncQwenImg(
+                api_key=api_key, rate_limiter=True, coalesce=True,
+                upload_cache=True, normalize_inputs=True, hooks=True,
+            )
             logger.info("QwenImg client initialized")
 
-    async def update_task_progress(self, task_id: str, progress: float, status: str = "running"):
-        """更新任务进度"""
+    def concurrency_windows(self) -> Dict[str, int]:
+        """各模型当前允许的并发任务数（可据此调整工作池大小）"""
+        if not self.qwen_client:
+            return {}
+        return self.qwen_client.rate_limiter.windows()
+
+    def phase_timings(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """各阶段、各模型的耗时统计（次数、均值、p50/p90/p99、最大值，单位秒）"""
+        if not self.qwen_client:
+            return {}
+        return self.qwen_client.hooks.summary()
+
+    async def update_task_progress(
+        self,
+        task_id: str,
+        progress: Optional[float] = None,
+        status: str = "running",
+        remote_status: Optional[str] = None,
+        elapsed: Optional[float] = None,
+        queued: Optional[float] = None,
+    ):
+        """更新任务进度（progress 为 None 时保留原进度，只更新状态）"""
         db = SessionLocal()
         try:
             task = db.query(GenerationTask).filter(GenerationTask.task_id == task_id).first()
-            if task:
-                task.progress = progress
+            # 已结束的任务不再被迟到的进度覆盖
+            if task and task.status not in ("completed", "failed"):
+                if progress is not None:
+                    task.progress = progress
                 task.status = status
                 task.updated_at = datetime.now()
                 db.commit()
@@ -98,8 +298,11 @@ class TaskManager:
                         "type": "progress",
                         "task_id": task_id,
                         "data": {
-                            "progress": progress,
-                            "status": status
+                            "progress": task.progress,
+                            "status": status,
+                            "remote_status": remote_status,
+                            "elapsed": elapsed,
+                            "queued": queued,
                         }
                     }
                     print(f"Sending progress update: {message}")  # 调试信息
@@ -109,6 +312,44 @@ class TaskManager:
         finally:
             db.close()
 
+    def _progress_reporter(self, task_id: str) -> Callable[[TaskProgress], None]:
+        """
+        把 DashScope 任务的真实状态变化转成进度更新
+
+        客户端只在远程状态（或图片计数）变化时回调，因此每次回调才写一次库。
+        DashScope 不提供排队位置和视频的百分比进度：排队中报告已等待时长，
+        图片按已生成张数计算百分比，视频只更新状态不编造百分比。
+        同一任务的进度依次写入：写库和 WebSocket 推送都按回调顺序完成，旧进度不会覆盖新进度。
+        """
+        recorded = []
+        # 写库协程按创建顺序启动，asyncio.Lock 按等待顺序放行，因此逐条按序写入
+        writing = asyncio.Lock()
+
+        async def write(*args, **kwargs) -> None:
+            async with writing:
+                await self.update_task_progress(*args, **kwargs)
+
+        def report(state: TaskProgress) -> None:
+            # 提交成功后立即（同步）记录远程任务，之后进程退出也能接着轮询而不重复提交
+            if state.task_id and recorded != [state.task_id]:
+                recorded[:] = [state.task_id]
+                try:
+                    self.queue.record_remote_task(task_id, state.task_id, state.base_address, state.key)
+                except Exception as e:
+                    logger.error(f"Failed to record remote task of {task_id}: {e}")
+            # 最终结果（含下载后的文件）由 complete_task 写入
+            if state.done:
+                return
+            status = "pending" if state.status in ("PENDING", "QUEUED") else "running"
+            total = state.metrics.get("TOTAL")
+            progress = 100.0 * state.metrics.get("SUCCEEDED", 0) / total if total else None
+            # 回调运行在事件循环中且须立即返回，写库放到单独的协程里
+            asyncio.ensure_future(write(
+                task_id, progress, status,
+                remote_status=state.status, elapsed=state.elapsed, queued=state.queued,
+            ))
+        return report
+
     async def complete_task(self, task_id: str, result_urls: list, error_message: Optional[str] = None):
         """完成任务"""
         db = SessionLocal()
@@ -120,6 +361,8 @@ class TaskManager:
                 task.error_message = error_message
                 task.progress = 100.0 if not error_message else task.progress
                 task.completed_at = datetime.now()
+                task.lease_token = None
+                task.lease_expires_at = None
                 db.commit()
 
                 # 通过WebSocket发送完成消息
@@ -142,59 +385,31 @@ class TaskManager:
         finally:
             db.close()
 
-    async def run_text_to_image(self, task_id: str, params: dict):
-        """执行文生图任务"""
+    async def run_text_to_image(self, task_id: str, params: dict, remote: Optional[dict] = None):
+        """执行文生图任务（remote 为上次执行时已提交的 DashScope 任务）"""
         try:
             self.init_client()
-            await self.update_task_progress(task_id, 10.0, "running")
-
-            # 在线程池中运行同步调用
-            loop = asyncio.get_event_loop()
-            await self.update_task_progress(task_id, 30.0, "running")
-
-            result = await loop.run_in_executor(
-                executor,
-                self._text_to_image_sync,
-                params
-            )
 
-            await self.update_task_progress(task_id, 90.0, "running")
-
-            # 处理结果（URL列表）
-            result_urls = []
             # 确保outputs目录存在
             output_dir = "./outputs"
             if not os.path.exists(output_dir):
                 os.makedirs(output_dir)
 
-            if isinstance(result, list):
-                # 多张图片
-                for i, img in enumerate(result):
-                    # 保存图片到本地
-                    if isinstance(img, Image.Image):
-                        filename = f"{task_id}_{i}.png"
-                        filepath = os.path.join(output_dir, filename)
-                        img.save(filepath)
-                        result_urls.append(f"/outputs/{filename}")
-                    else:
-                        # 如果不是PIL图像，假设是base64编码
-                        filename = f"{task_id}_{i}.png"
-                        filepath = os.path.join(output_dir, filename)
-                        # 解码base64并保存
-                        with open(filepath, "wb") as f:
-                            f.write(base64.b64decode(img))
-                        result_urls.append(f"/outputs/{filename}")
-            else:
-                # 单张图片
-                filename = f"{task_id}_0.png"
-                filepath = os.path.join(output_dir, filename)
-                if isinstance(result, Image.Image):
-                    result.save(filepath)
-                else:
-                    # 如果不是PIL图像，假设是base64编码
-                    with open(filepath, "wb") as f:
-                        f.write(base64.b64decode(result))
-                result_urls.append(f"/outputs/{filename}")
+            # 异步提交并轮询，每张图片下载完成后立即落盘（直接写原始字节，无需PIL解码再编码）
+            n = params.get("n", 1) or 1
+            saved = {}
+            async for image in self._iter_text_to_image(params, self._progress_reporter(task_id), remote):
+                suffix = os.path.splitext(filename_from_url(image.url))[1] or ".png"
+                filename = f"{task_id}_{image.index}{suffix}"
+                with open(os.path.join(output_dir, filename), "wb") as f:
+                    f.write(image.data)
+                saved[image.index] = f"/outputs/{filename}"
+                # 最后一张由 complete_task 记录，不再单独写库
+                if len(saved) < n:
+                    await self.update_task_progress(task_id, 100.0 * len(saved) / n, "running")
+
+            # 按生成顺序返回结果URL
+            result_urls = [saved[i] for i in sorted(saved)]
 
             await self.complete_task(task_id, result_urls)
 
@@ -202,9 +417,25 @@ class TaskManager:
             logger.error(f"Text to image task failed: {e}")
             await self.complete_task(task_id, [], str(e))
 
-    def _text_to_image_sync(self, params: dict):
-        """同步执行文生图"""
-        return self.qwen_client.text_to_image(
+    async def _iter_text_to_image(
+        self,
+        params: dict,
+        progress: Optional[Callable[[TaskProgress], None]] = None,
+        remote: Optional[dict] = None,
+    ):
+        """执行文生图调用，按下载完成顺序逐张返回"""
+        if remote is not None:
+            images = await self._resume(
+                "text_to_image", remote, progress,
+                model=params.get("model", "wan2.5-t2i-preview"), n=params.get("n", 1),
+                seed=params.get("seed"), save=False, return_results=True,
+            )
+            if images is not None:
+                for image in images if isinstance(images, list) else [images]:
+                    yield image
+                return
+
+        images = self.qwen_client.iter_text_to_image(
             prompt=params.get("prompt"),
             negative_prompt=params.get("negative_prompt"),
             model=params.get("model", "wan2.5-t2i-preview"),
@@ -212,26 +443,19 @@ class TaskManager:
             size=params.get("size", "1024*1024"),
             seed=params.get("seed"),
             watermark=params.get("watermark", False),
-            save=True,  # 保存到本地
-            return_pil=True
+            save=False,  # 由任务管理器按task_id保存，避免重复写盘
+            progress=progress,
         )
+        async for image in images:
+            yield image
 
-    async def run_image_to_video(self, task_id: str, params: dict):
-        """执行图生视频任务"""
+    async def run_image_to_video(self, task_id: str, params: dict, remote: Optional[dict] = None):
+        """执行图生视频任务（remote 为上次执行时已提交的 DashScope 任务）"""
         try:
             self.init_client()
-            await self.update_task_progress(task_id, 10.0, "running")
-
             loop = asyncio.get_event_loop()
-            await self.update_task_progress(task_id, 30.0, "running")
-
-            result = await loop.run_in_executor(
-                executor,
-                self._image_to_video_sync,
-                params
-            )
 
-            await self.update_task_progress(task_id, 60.0, "running")
+            result = await self._image_to_video(params, self._progress_reporter(task_id), remote)
 
             # 确保outputs目录存在
             output_dir = "./outputs"
@@ -245,7 +469,6 @@ class TaskManager:
             # 如果result是URL，下载视频内容
             if isinstance(result, str) and (result.startswith("http://") or result.startswith("https://")):
                 logger.info(f"Video URL received: {result}")
-                await self.update_task_progress(task_id, 70.0, "running")
 
                 # 在线程池中下载（避免阻塞事件循环）
                 await loop.run_in_executor(
@@ -254,8 +477,6 @@ class TaskManager:
                     result,
                     filepath
                 )
-
-                await self.update_task_progress(task_id, 95.0, "running")
             # 如果result是文件路径，复制文件
             elif isinstance(result, str) and os.path.exists(result):
                 import shutil
@@ -285,8 +506,22 @@ class TaskManager:
             logger.error(f"Image to video task failed: {e}", exc_info=True)
             await self.complete_task(task_id, [], str(e))
 
-    def _image_to_video_sync(self, params: dict):
-        """同步执行图生视频"""
+    async def _image_to_video(
+        self,
+        params: dict,
+        progress: Optional[Callable[[TaskProgress], None]] = None,
+        remote: Optional[dict] = None,
+    ):
+        """执行图生视频调用"""
+        if remote is not None:
+            video = await self._resume(
+                "image_to_video", remote, progress, model=params.get("model"),
+                resolution=params.get("resolution", "1080P"), duration=params.get("duration", 10),
+                seed=params.get("seed"),
+            )
+            if video is not None:
+                return video.url
+
         # 转换图片URL路径为文件系统路径
         image_url = params.get("image_url", "")
         if image_url.startswith("/uploads/"):
@@ -305,7 +540,7 @@ class TaskManager:
             if not os.path.exists(image_path):
                 raise FileNotFoundError(f"Image file not found: {image_path}")
 
-        return self.qwen_client.image_to_video(
+        video = await self.qwen_client.image_to_video(
             image=image_path,
             prompt=params.get("prompt"),
             negative_prompt=params.get("negative_prompt"),
@@ -313,67 +548,30 @@ class TaskManager:
             duration=params.get("duration", 10),
             audio=params.get("audio_url"),
             seed=params.get("seed"),
-            watermark=params.get("watermark", False)
+            watermark=params.get("watermark", False),
+            progress=progress,
         )
+        return video.url
 
     def _download_video(self, url: str, filepath: str) -> None:
-        """下载视频文件（使用流式下载）"""
-        import requests
+        """
+        下载视频文件（分段并行下载，失败后可断点续传，并校验文件大小）
 
+        在线程池中运行，开始后无法中途停止：任务被取消或删除时，等待下载的协程立即结束，
+        但下载会在后台继续，直到写完 outputs 下的文件（该文件不会记录到任务中）。
+        """
         logger.info(f"Starting video download from: {url}")
-
-        # 使用流式下载，超时时间设置为(连接超时, 读取超时)
-        response = requests.get(url, stream=True, timeout=(10, 300))
-        response.raise_for_status()
-
-        # 检查Content-Type
-        content_type = response.headers.get('Content-Type', '')
-        logger.info(f"Content-Type: {content_type}")
-
-        # 获取文件大小
-        total_size = int(response.headers.get('content-length', 0))
-        logger.info(f"Total size: {total_size} bytes ({total_size / 1024 / 1024:.2f} MB)")
-
-        # 流式下载，分块写入文件
-        downloaded_size = 0
-        chunk_size = 8192  # 8KB per chunk
-
-        with open(filepath, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=chunk_size):
-                if chunk:
-                    f.write(chunk)
-                    downloaded_size += len(chunk)
-
-                    # 每下载10MB打印一次进度
-                    if downloaded_size % (10 * 1024 * 1024) < chunk_size:
-                        logger.info(f"Downloaded {downloaded_size / 1024 / 1024:.2f} MB...")
-
-        # 验证下载是否完整
+        download_file(url, filepath)
         actual_size = os.path.getsize(filepath)
         logger.info(f"Download completed. File size: {actual_size} bytes ({actual_size / 1024 / 1024:.2f} MB)")
 
-        if total_size > 0 and actual_size < total_size:
-            raise ValueError(f"Download incomplete: expected {total_size} bytes, got {actual_size} bytes")
-
-        if actual_size < 1000:  # 小于1KB可能是错误页面
-            raise ValueError(f"Downloaded file too small ({actual_size} bytes), likely an error response")
-
-    async def run_text_to_video(self, task_id: str, params: dict):
-        """执行文生视频任务"""
+    async def run_text_to_video(self, task_id: str, params: dict, remote: Optional[dict] = None):
+        """执行文生视频任务（remote 为上次执行时已提交的 DashScope 任务）"""
         try:
             self.init_client()
-            await self.update_task_progress(task_id, 10.0, "running")
-
             loop = asyncio.get_event_loop()
-            await self.update_task_progress(task_id, 30.0, "running")
-
-            result = await loop.run_in_executor(
-                executor,
-                self._text_to_video_sync,
-                params
-            )
 
-            await self.update_task_progress(task_id, 60.0, "running")
+            result = await self._text_to_video(params, self._progress_reporter(task_id), remote)
 
             # 确保outputs目录存在
             output_dir = "./outputs"
@@ -391,7 +589,6 @@ class TaskManager:
             # 如果result是URL，下载视频内容
             if isinstance(result, str) and (result.startswith("http://") or result.startswith("https://")):
                 logger.info(f"Video URL received: {result}")
-                await self.update_task_progress(task_id, 70.0, "running")
 
                 # 在线程池中下载（避免阻塞事件循环）
                 await loop.run_in_executor(
@@ -400,8 +597,6 @@ class TaskManager:
                     result,
                     filepath
                 )
-
-                await self.update_task_progress(task_id, 95.0, "running")
             # 如果result是文件路径，复制文件
             elif isinstance(result, str) and os.path.exists(result):
                 import shutil
@@ -428,7 +623,6 @@ class TaskManager:
                         # 检查是否是URL
                         if video_data.startswith("http://") or video_data.startswith("https://"):
                             logger.info(f"Video URL in dict format: {video_data}")
-                            await self.update_task_progress(task_id, 70.0, "running")
 
                             # 使用统一的下载函数
                             await loop.run_in_executor(
@@ -437,8 +631,6 @@ class TaskManager:
                                 video_data,
                                 filepath
                             )
-
-                            await self.update_task_progress(task_id, 95.0, "running")
                         # 检查是否是base64数据URI
                         elif video_data.startswith("data:video"):
                             base64_data = video_data.split(",")[1]
@@ -461,20 +653,39 @@ class TaskManager:
             logger.error(f"Text to video task failed: {e}", exc_info=True)
             await self.complete_task(task_id, [], str(e))
 
-    def _text_to_video_sync(self, params: dict):
-        """同步执行文生视频"""
-        return self.qwen_client.text_to_video(
+    async def _text_to_video(
+        self,
+        params: dict,
+        progress: Optional[Callable[[TaskProgress], None]] = None,
+        remote: Optional[dict] = None,
+    ):
+        """执行文生视频调用"""
+        if remote is not None:
+            video = await self._resume(
+                "text_to_video", remote, progress, model=params.get("model"),
+                resolution=params.get("resolution", "1080P"), duration=params.get("duration", 10),
+                seed=params.get("seed"),
+            )
+            if video is not None:
+                return video.url
+
+        video = await self.qwen_client.text_to_video(
             prompt=params.get("prompt"),
             negative_prompt=params.get("negative_prompt"),
             model=params.get("model", "wan2.5-t2v-preview"),
             resolution=params.get("resolution", "1080P"),
             duration=params.get("duration", 10),
             seed=params.get("seed"),
-            watermark=params.get("watermark", False)
+            watermark=params.get("watermark", False),
+            progress=progress,
         )
+        return video.url
 
     async def create_task(self, task_type: str, params: dict, session_id: Optional[str] = None) -> str:
-        """创建并启动任务"""
+        """创建任务：写入持久队列后由调度循环领取执行"""
+        if task_type not in self._runners:
+            raise ValueError(f"Unknown task type: {task_type}")
+
         task_id = str(uuid.uuid4())
 
         # 保存到数据库
@@ -496,28 +707,37 @@ class TaskManager:
                 seed=params.get("seed"),
                 watermark=1 if params.get("watermark") else 0,
                 params=params,
-                session_id=session_id
+                session_id=session_id,
+                attempts=0,
             )
             db.add(db_task)
             db.commit()
         finally:
             db.close()
 
-        # 启动异步任务
-        if task_type == "text_to_image":
-            task = asyncio.create_task(self.run_text_to_image(task_id, params))
-        elif task_type == "image_to_video":
-            task = asyncio.create_task(self.run_image_to_video(task_id, params))
-        elif task_type == "text_to_video":
-            task = asyncio.create_task(self.run_text_to_video(task_id, params))
-        else:
-            raise ValueError(f"Unknown task type: {task_type}")
-
-        self.tasks[task_id] = task
-        logger.info(f"Task created: {task_id} ({task_type})")
+        # 唤醒调度循环，无需等到下一次定时领取
+        if self._wakeup is not None:
+            self._wakeup.set()
+        logger.info(f"Task queued: {task_id} ({task_type})")
 
         return task_id
 
+    def cancel_task(self, task_id: str) -> bool:
+        """
+        取消仍在进行的任务（例如用户删除了任务或离开了页面）
+
+        停止轮询、释放限流窗口；DashScope 上仍在排队的远程任务也会被取消，
+        不再占用配额。已开始生成的远程任务无法取消，但结果不再获取。
+        已开始的视频下载在线程池中运行，无法中途停止，见 _download_video。
+        """
+        self._leases.pop(task_id, None)
+        task = self.tasks.pop(task_id, None)
+        if task is None or task.done():
+            return False
+        task.cancel()
+        logger.info(f"Task cancelled: {task_id}")
+        return True
+
     def get_task_status(self, task_id: str) -> Optional[dict]:
         """获取任务状态"""
         db = SessionLocal()
@@ -0,0 +1,227 @@
+"""
+Throughput and latency benchmarks of the client against the mock DashScope server.
+
+Runs offline: a :class:`MockDashScope` is started in-process unless
+``--endpoint`` points at one started separately. Scenarios:
+
+- ``single``: sequential ``text_to_image`` calls
+- ``concurrent``: ``text_to_image`` calls from a thread pool
+- ``batch``: one ``batch_text_to_image`` run
+- ``async``: ``AsyncQwenImg.text_to_image`` calls gathered on one event loop
+- ``download``: video downloads, one stream against parallel range segments
+
+Each scenario reports request latency percentiles and throughput, followed by
+the client's per-phase timings from its ``HistogramCollector``.
+
+    $ python benchmarks/bench_client.py
+    $ python benchmarks/bench_client.py --scenarios batch,download --requests 64 --concurrency 16
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mock_server import MockDashScope  # noqa: E402
+from qwenimg import AsyncQwenImg, HttpTransport, QwenImg  # noqa: E402
+
+SCENARIOS = ("single", "concurrent", "batch", "async", "download")
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(q * len(ordered)) - 1))]
+
+
+def report(name: str, latencies: List[float], wall: float, errors: int = 0, nbytes: int = 0, hooks=None) -> Dict:
+    """Print and return the results of one scenario."""
+    count = len(latencies) + errors
+    result = {
+        "scenario": name,
+        "requests": count,
+        "errors": errors,
+        "wall_seconds": wall,
+        "throughput_per_second": count / wall if wall else None,
+        "latency": {
+            "p50": percentile(latencies, 0.5),
+            "p90": percentile(latencies, 0.9),
+            "p99": percentile(latencies, 0.99),
+            "max": max(latencies) if latencies else None,
+        },
+    }
+    if nbytes:
+        result["megabytes_per_second"] = nbytes / wall / 1024 ** 2
+    if hooks is not None:
+        result["phases"] = hooks.summary()
+
+    line = f"{name:<11} {count:>5} req  {errors:>3} err  {wall:7.2f}s  {result['throughput_per_second']:7.2f} req/s"
+    if latencies:
+        line += "  p50 {p50:.3f}s  p90 {p90:.3f}s  p99 {p99:.3f}s".format(**result["latency"])
+    if nbytes:
+        line += f"  {result['megabytes_per_second']:.1f} MiB/s"
+    print(line)
+    for phase, models in (result.get("phases") or {}).items():
+        for model, stats in models.items():
+            print(
+                f"    {phase:<10} {model:<22} n={stats['count']:<5} "
+                f"p50 {stats['p50']:.3f}s  p99 {stats['p99']:.3f}s  max {stats['max']:.3f}s"
+            )
+    return result
+
+
+def timed(call: Callable[[], object]) -> float:
+    started = time.monotonic()
+    call()
+    return time.monotonic() - started
+
+
+def bench_single(endpoint: str, args, output_dir: str) -> Dict:
+    with QwenImg(api_key="mock", endpoint=endpoint, hooks=True) as client:
+        started = time.monotonic()
+        latencies = [
+            timed(lambda: client.text_to_image(f"prompt {i}", output_dir=output_dir, return_pil=args.decode))
+            for i in range(args.single_requests)
+        ]
+        return report("single", latencies, time.monotonic() - started, hooks=client.hooks)
+
+
+def bench_concurrent(endpoint: str, args, output_dir: str) -> Dict:
+    with QwenImg(api_key="mock", endpoint=endpoint, hooks=True) as client:
+        def one(i: int):
+            try:
+                return timed(
+                    lambda: client.text_to_image(f"prompt {i}", output_dir=output_dir, return_pil=args.decode)
+                )
+            except Exception:
+                return None
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            results = list(pool.map(one, range(args.requests)))
+        latencies = [r for r in results if r is not None]
+        return report(
+            "concurrent", latencies, time.monotonic() - started,
+            errors=len(results) - len(latencies), hooks=client.hooks,
+        )
+
+
+def bench_batch(endpoint: str, args, output_dir: str) -> Dict:
+    with QwenImg(api_key="mock", endpoint=endpoint, hooks=True) as client:
+        prompts = (f"prompt {i}" for i in range(args.requests))
+        started = time.monotonic()
+        latencies, errors = [], 0
+        for item in client.batch_text_to_image(
+            prompts, max_concurrency=args.concurrency, output_dir=output_dir, return_pil=args.decode
+        ):
+            if item.ok:
+                # Time from the start of the batch until the item was done
+                latencies.append(time.monotonic() - started)
+            else:
+                errors += 1
+        return report("batch", latencies, time.monotonic() - started, errors=errors, hooks=client.hooks)
+
+
+def bench_async(endpoint: str, args, output_dir: str) -> Dict:
+    async def run():
+        async with AsyncQwenImg(api_key="mock", endpoint=endpoint, hooks=True) as client:
+            semaphore = asyncio.Semaphore(args.concurrency)
+
+            async def one(i: int):
+                async with semaphore:
+                    started = time.monotonic()
+                    try:
+                        await client.text_to_image(f"prompt {i}", output_dir=output_dir, return_pil=args.decode)
+                    except Exception:
+                        return None
+                    return time.monotonic() - started
+
+            started = time.monotonic()
+            results = await asyncio.gather(*(one(i) for i in range(args.requests)))
+            latencies = [r for r in results if r is not None]
+            return report(
+                "async", latencies, time.monotonic() - started,
+                errors=len(results) - len(latencies), hooks=client.hooks,
+            )
+
+    return asyncio.run(run())
+
+
+def bench_download(server_url: str, args, output_dir: str) -> List[Dict]:
+    results = []
+    with HttpTransport() as transport, QwenImg(api_key="mock", transport=transport, hooks=True) as client:
+        for segments in (1, args.segments):
+            latencies, nbytes = [], 0
+            started = time.monotonic()
+            for i in range(args.downloads):
+                path = os.path.join(output_dir, f"video_{segments}_{i}.mp4")
+                url = f"{server_url}/files/bench_{i}.mp4"
+                latencies.append(timed(lambda: client.download_video(url, path, segments)))
+                nbytes += os.path.getsize(path)
+                os.remove(path)
+            results.append(report(f"download/{segments}", latencies, time.monotonic() - started, nbytes=nbytes))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark QwenImg against a mock DashScope server")
+    parser.add_argument("--endpoint", help="endpoint of a running mock_server.py; default starts one in-process")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"comma-separated subset of {SCENARIOS}")
+    parser.add_argument("--requests", type=int, default=32, help="requests per concurrent scenario")
+    parser.add_argument("--single-requests", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--downloads", type=int, default=4)
+    parser.add_argument("--segments", type=int, default=4)
+    parser.add_argument("--decode", action="store_true", help="return PIL images, so decoding is measured")
+    parser.add_argument("--generation-time", type=float, default=1.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--image-bytes", type=int, default=512 * 1024)
+    parser.add_argument("--video-bytes", type=int, default=16 * 1024 * 1024)
+    parser.add_argument("--bandwidth", type=float, default=8 * 1024 * 1024, help="bytes per second per download")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    server = None
+    endpoint = args.endpoint
+    if endpoint is None:
+        server = MockDashScope(
+            generation_time=args.generation_time, throttle_rate=args.throttle_rate, error_rate=args.error_rate,
+            image_bytes=args.image_bytes, video_bytes=args.video_bytes, bandwidth=args.bandwidth, seed=0,
+        ).start()
+        endpoint = server.endpoint
+    server_url = endpoint.rsplit("/api/v1", 1)[0]
+
+    benches = {
+        "single": bench_single,
+        "concurrent": bench_concurrent,
+        "batch": bench_batch,
+        "async": bench_async,
+    }
+    results = []
+    with tempfile.TemporaryDirectory(prefix="qwenimg-bench-") as output_dir:
+        for name in args.scenarios.split(","):
+            if name == "download":
+                results.extend(bench_download(server_url, args, output_dir))
+            else:
+                results.append(benches[name](endpoint, args, output_dir))
+
+    if server is not None:
+        print(f"server: {server.stats}")
+        server.stop()
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
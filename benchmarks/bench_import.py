@@ -0,0 +1,92 @@
+"""
+Import-time benchmark and budget check.
+
+``import qwenimg`` and the model tables must not load dashscope, Pillow,
+requests or aiohttp: short-lived CLI workers and serverless invocations pay for
+every import on each cold start. Each statement below is run in fresh
+interpreters under ``python -X importtime``; the median time of the imports
+it triggers is compared with its budget, and the heavy dependencies must not
+have been imported. Exits non-zero if a check fails.
+
+    $ python benchmarks/bench_import.py
+    $ python benchmarks/bench_import.py --runs 11 --scale 2    # slow machine
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ("dashscope", "PIL", "requests", "aiohttp")
+
+# (statement, budget in milliseconds, heavy modules it may import); a client
+# builds its requests session up front, everything else waits for a request
+CASES = [
+    ("import qwenimg", 20, ()),
+    ("from qwenimg.config import T2I_MODELS, I2V_MODELS, T2V_MODELS", 20, ()),
+    ("from qwenimg import QwenImg; QwenImg.list_models()", 100, ()),
+    ("from qwenimg import QwenImg; QwenImg(api_key='sk-x')", 250, ("requests",)),
+]
+
+_IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)")
+
+
+def measure(statement: str):
+    """
+    Run a statement in a fresh interpreter.
+
+    Returns:
+        Tuple of (microseconds spent in the imports it triggered, heavy
+        modules it loaded)
+    """
+    check = f"{statement}\nimport sys\nprint(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    done = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", check],
+        capture_output=True, text=True, cwd=ROOT, env=env, check=True,
+    )
+
+    # Top-level imports (no indentation) triggered by the statement; the
+    # interpreter's own startup imports come before the first qwenimg one
+    total, started = 0, False
+    for line in done.stderr.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if not match or match.group(3):
+            continue
+        started = started or match.group(4).startswith("qwenimg")
+        if started:
+            total += int(match.group(2))
+    heavy = [m for m in done.stdout.strip().split(",") if m]
+    return total, heavy
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check import times of qwenimg against their budgets")
+    parser.add_argument("--runs", type=int, default=7, help="fresh interpreters per statement")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every budget, for slow machines")
+    args = parser.parse_args()
+
+    failed = False
+    for statement, budget, allowed in CASES:
+        results = [measure(statement) for _ in range(args.runs)]
+        median = statistics.median(total for total, _ in results) / 1000
+        heavy = sorted({m for _, loaded in results for m in loaded} - set(allowed))
+        limit = budget * args.scale
+
+        problems = []
+        if median > limit:
+            problems.append(f"over budget of {limit:.0f} ms")
+        if heavy:
+            problems.append(f"imported {', '.join(heavy)}")
+        failed = failed or bool(problems)
+        print(f"{'FAIL' if problems else 'ok  '}  {median:7.1f} ms  {statement}" + (f"  ({'; '.join(problems)})" if problems else ""))
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+"""
+Local stand-in for the DashScope task API and OSS result downloads.
+
+Serves the endpoints the SDK calls for ImageSynthesis / VideoSynthesis
+(task submission, task status, task cancellation) and the result files the
+finished tasks point to, with configurable latency, failure rates and payload
+sizes. Nothing leaves the machine, so the client and backend can be measured
+without network access or paid generations.
+
+Run standalone and point a client at it:
+
+    $ python benchmarks/mock_server.py --port 8765 --generation-time 2
+    >>> client = QwenImg(api_key="mock", endpoint="http://127.0.0.1:8765/api/v1")
+
+or start it in-process:
+
+    >>> with MockDashScope(generation_time=0.5) as server:
+    ...     client = QwenImg(api_key="mock", endpoint=server.endpoint)
+"""
+
+import argparse
+import io
+import itertools
+import json
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+# Same format as the submit_time / scheduled_time / end_time task fields
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+SUBMIT_PATHS = {
+    "/api/v1/services/aigc/text2image/image-synthesis": "image",
+    "/api/v1/services/aigc/video-generation/video-synthesis": "video",
+}
+TASK_PATH = re.compile(r"^/api/v1/tasks/([^/]+)(/cancel)?$")
+FILE_PATH = re.compile(r"^/files/([^/]+)$")
+
+_STREAM_CHUNK = 64 * 1024
+
+
+class _Task:
+    __slots__ = ("task_id", "kind", "n", "submitted", "scheduled", "ended", "fails", "canceled")
+
+    def __init__(self, task_id: str, kind: str, n: int, submitted: float, queue: float, generation: float, fails: bool):
+        self.task_id = task_id
+        self.kind = kind
+        self.n = n
+        self.submitted = submitted
+        self.scheduled = submitted + queue
+        self.ended = self.scheduled + generation
+        self.fails = fails
+        self.canceled = False
+
+    def status(self, now: float) -> str:
+        if self.canceled:
+            return "CANCELED"
+        if now < self.scheduled:
+            return "PENDING"
+        if now < self.ended:
+            return "RUNNING"
+        return "FAILED" if self.fails else "SUCCEEDED"
+
+
+def _timestamp(monotonic: float) -> str:
+    # Task times are reported as wall clock times
+    return datetime.fromtimestamp(time.time() - (time.monotonic() - monotonic)).strftime(TIME_FORMAT)
+
+
+def _noise_png(nbytes: int) -> bytes:
+    """A PNG of random pixels, which does not compress, of about nbytes."""
+    from PIL import Image
+
+    side = max(1, int((nbytes / 3) ** 0.5))
+    image = Image.frombytes("RGB", (side, side), os.urandom(side * side * 3))
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG", compress_level=0)
+    return buffer.getvalue()
+
+
+class MockDashScope:
+    """
+    In-process mock of the DashScope task API.
+
+    Args:
+        host: Interface to listen on
+        port: Port to listen on, 0 for a free one
+        submit_latency: Seconds a task submission takes
+        status_latency: Seconds a task status check takes
+        queue_time: Seconds a task waits before it starts running
+        generation_time: Seconds an image task runs
+        video_generation_time: Seconds a video task runs
+        jitter: Each latency and duration varies randomly by up to this fraction
+        throttle_rate: Fraction of submissions rejected with 429 Throttling
+        error_rate: Fraction of submissions and status checks failing with 500
+        task_failure_rate: Fraction of tasks that end FAILED
+        image_bytes: Approximate size of each result image (a valid PNG)
+        video_bytes: Size of each result video
+        bandwidth: Bytes per second each download connection is limited to,
+                   None for unlimited
+        seed: Seed of the failure and jitter randomness
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        submit_latency: float = 0.05,
+        status_latency: float = 0.02,
+        queue_time: float = 0.2,
+        generation_time: float = 1.0,
+        video_generation_time: float = 3.0,
+        jitter: float = 0.2,
+        throttle_rate: float = 0.0,
+        error_rate: float = 0.0,
+        task_failure_rate: float = 0.0,
+        image_bytes: int = 512 * 1024,
+        video_bytes: int = 8 * 1024 * 1024,
+        bandwidth: Optional[float] = None,
+        seed: Optional[int] = None,
+    ):
+        self.submit_latency = submit_latency
+        self.status_latency = status_latency
+        self.queue_time = queue_time
+        self.generation_time = generation_time
+        self.video_generation_time = video_generation_time
+        self.jitter = jitter
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.task_failure_rate = task_failure_rate
+        self.bandwidth = bandwidth
+
+        self.image = _noise_png(image_bytes)
+        self.video = os.urandom(video_bytes)
+
+        self.stats: Dict[str, int] = {
+            "submitted": 0, "throttled": 0, "errors": 0, "status_checks": 0,
+            "canceled": 0, "downloads": 0, "bytes_sent": 0,
+        }
+        self._tasks: Dict[str, _Task] = {}
+        self._ids = itertools.count()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+        self._server = ThreadingHTTPServer((host, port), _handler(self))
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def endpoint(self) -> str:
+        """API endpoint to pass to ``QwenImg(endpoint=...)``."""
+        return f"{self.base_url}/api/v1"
+
+    def start(self) -> "MockDashScope":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-dashscope", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "MockDashScope":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _vary(self, seconds: float) -> float:
+        with self._lock:
+            return seconds * (1 + self._random.uniform(-self.jitter, self.jitter))
+
+    def _chance(self, rate: float) -> bool:
+        with self._lock:
+            return self._random.random() < rate
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self.stats[name] += amount
+
+    def submit(self, kind: str, body: dict):
+        """Handle a task submission; returns (HTTP status, JSON body)."""
+        time.sleep(self._vary(self.submit_latency))
+        if self._chance(self.throttle_rate):
+            self._count("throttled")
+            return 429, _error("Throttling.RateQuota", "Requests rate limit exceeded, please try again later.")
+        if self._chance(self.error_rate):
+            self._count("errors")
+            return 500, _error("InternalError", "Mock internal error.")
+
+        generation = self.generation_time if kind == "image" else self.video_generation_time
+        task_id = f"mock-{kind}-{next(self._ids)}"
+        n = int(body.get("parameters", {}).get("n", 1)) if kind == "image" else 1
+        task = _Task(
+            task_id, kind, n, time.monotonic(), self._vary(self.queue_time), self._vary(generation),
+            self._chance(self.task_failure_rate),
+        )
+        with self._lock:
+            self._tasks[task_id] = task
+            self.stats["submitted"] += 1
+        return 200, {"request_id": str(uuid.uuid4()), "output": {"task_id": task_id, "task_status": "PENDING"}}
+
+    def task_status(self, task_id: str):
+        """Handle a task status check; returns (HTTP status, JSON body)."""
+        time.sleep(self._vary(self.status_latency))
+        self._count("status_checks")
+        if self._chance(self.error_rate):
+            self._count("errors")
+            return 500, _error("InternalError", "Mock internal error.")
+        task = self._tasks.get(task_id)
+        if task is None:
+            return 404, _error("InvalidParameter", f"Task {task_id} not found.")
+
+        status = task.status(time.monotonic())
+        output = {"task_id": task_id, "task_status": status, "submit_time": _timestamp(task.submitted)}
+        if status != "PENDING":
+            output["scheduled_time"] = _timestamp(task.scheduled)
+        if status in ("SUCCEEDED", "FAILED"):
+            output["end_time"] = _timestamp(task.ended)
+        if status == "FAILED":
+            output.update(code="InternalError.Algo", message="Mock generation failure.")
+        elif status == "RUNNING" and task.kind == "image":
+            # Images finish one after another over the generation time
+            done = int(task.n * (time.monotonic() - task.scheduled) / (task.ended - task.scheduled))
+            output["task_metrics"] = {"TOTAL": task.n, "SUCCEEDED": done, "FAILED": 0}
+        elif status == "SUCCEEDED" and task.kind == "image":
+            output["results"] = [{"url": f"{self.base_url}/files/{task_id}_{i}.png"} for i in range(task.n)]
+            output["task_metrics"] = {"TOTAL": task.n, "SUCCEEDED": task.n, "FAILED": 0}
+        elif status == "SUCCEEDED":
+            output["video_url"] = f"{self.base_url}/files/{task_id}.mp4"
+        return 200, {"request_id": str(uuid.uuid4()), "output": output}
+
+    def cancel(self, task_id: str):
+        """Handle a task cancellation; only PENDING tasks can be canceled."""
+        task = self._tasks.get(task_id)
+        if task is None:
+            return 404, _error("InvalidParameter", f"Task {task_id} not found.")
+        if task.status(time.monotonic()) != "PENDING":
+            return 400, _error("UnsupportedOperation", "Failed to cancel the task, please confirm the task status.")
+        task.canceled = True
+        self._count("canceled")
+        return 200, {"request_id": str(uuid.uuid4())}
+
+
+def _error(code: str, message: str) -> dict:
+    return {"request_id": str(uuid.uuid4()), "code": code, "message": message}
+
+
+def _handler(mock: MockDashScope):
+    class Handler(BaseHTTPRequestHandler):
+        # Keep-alive, so pooled clients are measured with their pools working
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args) -> None:
+            pass
+
+        def _send_json(self, status: int, body: dict) -> None:
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        @property
+        def route(self) -> str:
+            # The asyncio SDK adds a trailing slash to task URLs
+            return self.path.split("?", 1)[0].rstrip("/")
+
+        def do_POST(self) -> None:
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length) or b"{}")
+            kind = SUBMIT_PATHS.get(self.route)
+            task = TASK_PATH.match(self.route)
+            if kind is not None:
+                self._send_json(*mock.submit(kind, body))
+            elif task and task.group(2):
+                self._send_json(*mock.cancel(task.group(1)))
+            else:
+                self._send_json(404, _error("NotFound", f"No mock for POST {self.path}"))
+
+        def do_GET(self) -> None:
+            task = TASK_PATH.match(self.route)
+            file = FILE_PATH.match(self.route)
+            if task and not task.group(2):
+                self._send_json(*mock.task_status(task.group(1)))
+            elif file:
+                self._send_file(mock.video if file.group(1).endswith(".mp4") else mock.image)
+            else:
+                self._send_json(404, _error("NotFound", f"No mock for GET {self.path}"))
+
+        def _send_file(self, payload: bytes) -> None:
+            start, end = 0, len(payload) - 1
+            match = re.match(r"bytes=(\d+)-(\d*)$", self.headers.get("Range", ""))
+            if match:
+                start = int(match.group(1))
+                end = min(int(match.group(2)), end) if match.group(2) else end
+                self.send_response(206)
+                self.send_header("Content-Range", f"bytes {start}-{end}/{len(payload)}")
+            else:
+                self.send_response(200)
+            self.send_header("Accept-Ranges", "bytes")
+            self.send_header("Content-Length", str(end - start + 1))
+            self.end_headers()
+
+            sent = 0
+            started = time.monotonic()
+            for offset in range(start, end + 1, _STREAM_CHUNK):
+                chunk = payload[offset:min(offset + _STREAM_CHUNK, end + 1)]
+                self.wfile.write(chunk)
+                sent += len(chunk)
+                if mock.bandwidth:
+                    # Sleep until the connection is back under its bandwidth
+                    ahead = sent / mock.bandwidth - (time.monotonic() - started)
+                    if ahead > 0:
+                        time.sleep(ahead)
+            mock._count("downloads")
+            mock._count("bytes_sent", sent)
+
+    return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve a local mock of the DashScope task API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--submit-latency", type=float, default=0.05)
+    parser.add_argument("--status-latency", type=float, default=0.02)
+    parser.add_argument("--queue-time", type=float, default=0.2)
+    parser.add_argument("--generation-time", type=float, default=1.0)
+    parser.add_argument("--video-generation-time", type=float, default=3.0)
+    parser.add_argument("--jitter", type=float, default=0.2)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--task-failure-rate", type=float, default=0.0)
+    parser.add_argument("--image-bytes", type=int, default=512 * 1024)
+    parser.add_argument("--video-bytes", type=int, default=8 * 1024 * 1024)
+    parser.add_argument("--bandwidth", type=float, default=None, help="bytes per second per download")
+    args = parser.parse_args()
+
+    server = MockDashScope(**vars(args))
+    print(f"Mock DashScope listening, endpoint: {server.endpoint}")
+    try:
+        server.start()._thread.join()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
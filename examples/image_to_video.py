@@ -29,18 +29,18 @@ print(f"Using image: {image_file}")
 
 # Example 1: Basic image-to-video
 print("\nStep 2: Generating video from image (basic)...")
-video_url = client.image_to_video(
+video = client.image_to_video(
     image=image_file,
     prompt="橘猫缓缓转头看向窗外，微风吹动它的毛发",
     duration=10,
     resolution="1080P"
 )
 print(f"✅ Video generated!")
-print(f"📹 Video URL: {video_url}")
+print(f"📹 Video URL: {video.url}")
 
 # Example 2: With more detailed prompt
 print("\nExample 2: Detailed prompt for better control...")
-video_url = client.image_to_video(
+video = client.image_to_video(
     image=image_file,
     prompt="""([锚定设定]，严格依据图片生成10秒视频，保持橘猫的特征和花园背景。)
     ([动态分层]，橘猫的耳朵轻轻抖动，尾巴缓缓摆动；
@@ -53,23 +53,23 @@ video_url = client.image_to_video(
     seed=12345
 )
 print(f"✅ Detailed video generated!")
-print(f"📹 Video URL: {video_url}")
+print(f"📹 Video URL: {video.url}")
 
 # Example 3: Different resolutions
 print("\nExample 3: Generate videos in different resolutions...")
 for resolution in ["480P", "720P", "1080P"]:
-    video_url = client.image_to_video(
+    video = client.image_to_video(
         image=image_file,
         prompt="橘猫眨眼睛",
         duration=5,
         resolution=resolution
     )
-    print(f"  {resolution}: {video_url}")
+    print(f"  {resolution}: {video.url}")
 
 # Example 4: Using online image URL
 print("\nExample 4: Using image from URL...")
 # If you have a public image URL, you can use it directly:
-# video_url = client.image_to_video(
+# video = client.image_to_video(
 #     image="https://example.com/your-image.png",
 #     prompt="描述视频内容",
 #     duration=10
@@ -77,14 +77,14 @@ print("\nExample 4: Using image from URL...")
 
 # Example 5: Using base64 encoded image (for private images)
 print("\nExample 5: Using base64 encoded image...")
-video_url = client.image_to_video(
+video = client.image_to_video(
     image=image_file,
     prompt="橘猫慢慢站起来伸懒腰",
     use_base64=True,  # Encode image as base64
     duration=5
 )
 print(f"✅ Video with base64 image generated!")
-print(f"📹 Video URL: {video_url}")
+print(f"📹 Video URL: {video.url}")
 
 print("\n✅ All examples completed!")
 print("💡 Tip: You can download the videos using the URLs above")
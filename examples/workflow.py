@@ -3,12 +3,10 @@ Complete workflow example: Text -> Image -> Video
 
 This example demonstrates a complete workflow:
 1. Generate an image from text
-2. Use that image to generate a video
-3. Optionally add audio to the video
+2. Use that image to generate two videos concurrently
 """
 
-from qwenimg import QwenImg
-import os
+from qwenimg import Pipeline, QwenImg
 
 # Initialize client
 client = QwenImg()
@@ -24,23 +22,6 @@ prompt_image = """一位身穿白色长袍的古风男子，
 背景是金色的圆形光晕，
 古风仙侠风格，高品质4K"""
 
-image = client.text_to_image(
-    prompt=prompt_image,
-    negative_prompt="模糊、粗糙、色彩暗淡",
-    size="1024*1024",
-    seed=12345,
-    output_dir="./outputs/workflow"
-)
-print("✅ Image generated successfully!")
-
-# Find the generated image file
-image_dir = "./outputs/workflow"
-image_files = [f for f in os.listdir(image_dir) if f.endswith(('.png', '.jpg', '.jpeg'))]
-image_path = os.path.join(image_dir, image_files[-1])
-print(f"📁 Image saved at: {image_path}")
-
-# Step 2: Generate video from the image
-print("\n🎬 Step 2: Generating video from the image...")
 prompt_video = """严格依据图片生成10秒视频，保持角色特征和场景风格。
 ([动态分层]，前景的云雾缓缓流动，角色的长发和衣袍随风轻轻摆动。
 远景的山峰和金色光晕保持稳定，营造神圣氛围。)
@@ -48,41 +29,64 @@ prompt_video = """严格依据图片生成10秒视频，保持角色特征和场
 8-10秒：镜头缓缓上移，展现天空和光晕。)
 ([技术参数]，60帧每秒，4K超清画质，保证流畅度。)"""
 
-video_url = client.image_to_video(
-    image=image_path,
+# The image stage feeds two video stages. Both videos start from the image's
+# URL as soon as it is ready and generate at the same time; with more prompts,
+# the next image would already be generating while these videos run.
+pipeline = Pipeline(client)
+pipeline.add(
+    "image", "text_to_image",
+    negative_prompt="模糊、粗糙、色彩暗淡",
+    size="1024*1024",
+    seed=12345,
+    output_dir="./outputs/workflow",
+)
+pipeline.add(
+    "video", "image_to_video", after="image",
     prompt=prompt_video,
     negative_prompt="模糊、抖动、失真",
     resolution="1080P",
     duration=10,
-    seed=12345
+    seed=12345,
 )
-print("✅ Video generated successfully!")
-print(f"📹 Video URL: {video_url}")
+pipeline.add(
+    "video_alt", "image_to_video", after="image",
+    prompt="角色缓缓转身，眼神望向远方，云雾翻涌，充满仙气",
+    duration=5,
+    resolution="720P",
+)
+
+results = {}
+for r in pipeline.run([prompt_image]):
+    if not r.ok:
+        print(f"❌ Stage {r.stage} failed: {r.error}")
+        continue
+    results[r.stage] = r.result
+    if r.stage == "image":
+        print("✅ Image generated successfully!")
+        print(f"📁 Image saved at: {r.result.path} ({r.result.nbytes / 1024:.0f} KB)")
+        print("\n🎬 Step 2: Generating two videos from the image at the same time...")
+    else:
+        print(f"✅ Video {r.stage} generated: {r.result.url}")
 
 # Step 3: Show summary
 print("\n" + "=" * 60)
-print("🎉 Workflow completed successfully!")
+print("🎉 Workflow completed!")
 print("=" * 60)
-print(f"\n📸 Image: {image_path}")
-print(f"   Size: {image.size}")
-print(f"   Format: {image.format}")
-print(f"\n📹 Video: {video_url}")
-print(f"   Resolution: 1080P")
-print(f"   Duration: 10 seconds")
+if "image" in results:
+    image = results["image"]
+    print(f"\n📸 Image: {image.path}")
+    print(f"   Size: {image.image.size}")
+    print(f"   Format: {image.image.format}")
+if "video" in results:
+    print(f"\n📹 Video: {results['video'].url}")
+    print(f"   Resolution: 1080P")
+    print(f"   Duration: 10 seconds")
+if "video_alt" in results:
+    print(f"\n📹 Alternative video: {results['video_alt'].url}")
 
 print("\n💡 Next steps:")
-print("   1. Download the video from the URL above")
+print("   1. Download the videos with client.download_video(...)")
 print("   2. View the generated image in the outputs/workflow directory")
-print("   3. Use the image for further processing or video generation")
-
-# Optional: Generate another video with different style
-print("\n🔄 Bonus: Generating alternative video style...")
-video_url_2 = client.image_to_video(
-    image=image_path,
-    prompt="角色缓缓转身，眼神望向远方，云雾翻涌，充满仙气",
-    duration=5,
-    resolution="720P"
-)
-print(f"✅ Alternative video: {video_url_2}")
+print("   3. Pass more prompts to pipeline.run() to pipeline a whole batch")
 
 print("\n✨ All done!")
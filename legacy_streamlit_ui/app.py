@@ -280,11 +280,11 @@ def run_i2v_task(client, kwargs, temp_image_path):
         st.session_state.i2v_task_status = 'running'
         st.session_state.i2v_task_progress = 20
 
-        video_url = client.image_to_video(**kwargs)
+        video = client.image_to_video(**kwargs)
 
         st.session_state.i2v_task_progress = 100
         st.session_state.i2v_result = {
-            'url': video_url,
+            'url': video.url,
             'prompt': kwargs.get('prompt', ''),
             'params': kwargs
         }
@@ -314,11 +314,11 @@ def run_t2v_task(client, kwargs):
         st.session_state.t2v_task_status = 'running'
         st.session_state.t2v_task_progress = 20
 
-        video_url = client.text_to_video(**kwargs)
+        video = client.text_to_video(**kwargs)
 
         st.session_state.t2v_task_progress = 100
         st.session_state.t2v_result = {
-            'url': video_url,
+            'url': video.url,
             'prompt': kwargs['prompt'],
             'params': kwargs
         }
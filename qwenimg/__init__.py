@@ -14,15 +14,62 @@ Examples:
 
     Generate video from image:
 
-    >>> video_url = client.image_to_video("cat.png", prompt="猫在奔跑", duration=10)
+    >>> video = client.image_to_video("cat.png", prompt="猫在奔跑", duration=10)
 
     Generate video from text:
 
-    >>> video_url = client.text_to_video("一只猫在草地上奔跑")
+    >>> video = client.text_to_video("一只猫在草地上奔跑")
+
+    Asyncio client:
+
+    >>> from qwenimg import AsyncQwenImg
+    >>> async with AsyncQwenImg() as client:
+    ...     image = await client.text_to_image("一只可爱的猫")
 """
 
-from .client import QwenImg
+import importlib
+
 from .config import T2I_MODELS, I2V_MODELS, T2V_MODELS
 
 __version__ = "0.1.0"
-__all__ = ["QwenImg", "T2I_MODELS", "I2V_MODELS", "T2V_MODELS"]
+
+# Public names and the submodules they live in. The clients pull in dashscope,
+# Pillow, requests and aiohttp, which take hundreds of milliseconds to import,
+# so each submodule is only imported when one of its names is first used.
+_EXPORTS = {
+    "QwenImg": "client",
+    "AsyncQwenImg": "aio",
+    "TaskHandle": "tasks",
+    "TaskProgress": "tasks",
+    "poll_many": "tasks",
+    "HttpTransport": "transport",
+    "BatchResult": "batch",
+    "Pipeline": "pipeline",
+    "PipelineResult": "pipeline",
+    "ImageResult": "results",
+    "VideoResult": "results",
+    "RateLimiter": "ratelimit",
+    "ResultCache": "cache",
+    "UploadCache": "uploads",
+    "Region": "regions",
+    "RegionRouter": "regions",
+    "KeyPool": "keys",
+    "Hooks": "hooks",
+    "HookEvent": "hooks",
+    "HistogramCollector": "hooks",
+}
+
+__all__ = [*_EXPORTS, "T2I_MODELS", "I2V_MODELS", "T2V_MODELS"]
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
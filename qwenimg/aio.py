@@ -0,0 +1,779 @@
+"""
+Asyncio client for QwenImg.
+
+The blocking client waits inside ``ImageSynthesis.call`` / ``VideoSynthesis.call``
+for the whole generation. ``AsyncQwenImg`` instead submits the task, polls its
+status with ``asyncio.sleep`` between requests and streams results with
+aiohttp, so a single event loop can keep many generations in flight.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import inspect
+import os
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, AsyncIterator, Awaitable, Callable, Dict, Iterable, Optional, Union, List
+
+import aiohttp
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+from .client import _BaseClient, _upload_cache
+from .config import (
+    BEIJING_ENDPOINT,
+    DEFAULT_T2I_MODEL,
+    DEFAULT_I2V_MODEL,
+    DEFAULT_T2V_MODEL,
+    DEFAULT_SIZE,
+    DEFAULT_RESOLUTION,
+    DEFAULT_DURATION,
+    DEFAULT_OUTPUT_DIR,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_READ_TIMEOUT,
+    POLL_BACKOFF,
+    POLL_MAX_FAILURES,
+    SUBMIT_MAX_RETRIES,
+)
+from .cache import request_key
+from .hooks import Hooks, emit
+from .keys import KeyPool, key_fingerprint
+from .preprocess import get_normalize_pool, normalize_image
+from .ratelimit import ModelLimiter, RateLimiter, backoff_delay, get_rate_limiter
+from .regions import RegionRouter
+from .results import ImageResult, VideoResult, task_timings
+from .tasks import (
+    FINAL_TASK_STATUSES,
+    PERMANENT,
+    THROTTLED,
+    TRANSIENT,
+    ProgressListeners,
+    TaskProgress,
+    cancel_task,
+    classify_response,
+    fetch_task,
+    poll_intervals,
+    task_api,
+    task_metrics,
+    task_response,
+)
+from .uploads import UploadCache, local_inputs
+from .utils import save_image
+
+# Errors of a request that never got an answer; they say nothing about the
+# task, so submissions are retried and status checks repeated
+NETWORK_ERRORS = (OSError, aiohttp.ClientError, asyncio.TimeoutError)
+
+
+@functools.lru_cache(maxsize=None)
+def aio_task_api(kind: str):
+    """Get the asyncio DashScope task API class of a task kind, None if the SDK has none."""
+    try:
+        from dashscope.aigc.image_synthesis import AioImageSynthesis
+        from dashscope.aigc.video_synthesis import AioVideoSynthesis
+    except ImportError:  # older dashscope releases only ship the sync task API
+        return None
+    return AioImageSynthesis if kind == "text_to_image" else AioVideoSynthesis
+
+
+async def _within(awaitable: Awaitable, timeout: Optional[float]):
+    """Await with a deadline; the awaited generation is canceled when it passes."""
+    try:
+        return await asyncio.wait_for(awaitable, timeout)
+    except asyncio.TimeoutError:
+        raise TimeoutError(f"Generation did not finish within {timeout:g} seconds") from None
+
+
+class _InFlight:
+    """A generation shared by identical requests, and how many callers await it."""
+
+    __slots__ = ("future", "listeners", "waiters")
+
+    def __init__(self, future: asyncio.Future, listeners: ProgressListeners):
+        self.future = future
+        self.listeners = listeners
+        self.waiters = 0
+
+
+class AsyncQwenImg(_BaseClient):
+    """
+    Asyncio client with the same surface as :class:`QwenImg`.
+
+    Examples:
+        >>> import asyncio
+        >>> from qwenimg import AsyncQwenImg
+        >>>
+        >>> async def main():
+        ...     async with AsyncQwenImg() as client:
+        ...         images = await asyncio.gather(
+        ...             client.text_to_image("一只可爱的猫"),
+        ...             client.text_to_image("美丽的风景", n=4),
+        ...         )
+        ...         video_url = await client.text_to_video("一只猫在草地上奔跑")
+        >>>
+        >>> asyncio.run(main())
+
+    Canceling the asyncio task of a call, or its ``timeout`` passing, also
+    cancels the remote task if DashScope has not started it yet.
+    """
+
+    def __init__(
+        self,
+        api_key: Union[str, Iterable[str], KeyPool, None] = None,
+        endpoint: str = BEIJING_ENDPOINT,
+        region: str = "beijing",
+        max_connections: int = 100,
+        rate_limiter: Union[bool, RateLimiter, None] = None,
+        coalesce: bool = False,
+        upload_cache: Union[bool, str, UploadCache, None] = None,
+        normalize_inputs: bool = False,
+        router: Optional[RegionRouter] = None,
+        hooks: Union[bool, Hooks, None] = None,
+    ):
+        """
+        Initialize AsyncQwenImg client.
+
+        Args:
+            api_key: DashScope API key, or several keys (a list or a KeyPool)
+                    that submissions are spread over. If not provided, will
+                    try to get from DASHSCOPE_API_KEY environment variable or
+                    .env file (several keys may be comma-separated).
+            endpoint: API endpoint URL. Default is Beijing endpoint.
+            region: Region ("beijing" or "singapore"). Default is "beijing".
+            max_connections: Maximum number of concurrent download connections
+            rate_limiter: Keep submissions under each model's QPS and adaptive
+                    concurrent task window, see :class:`QwenImg`
+            coalesce: Let identical requests made while one of them is still
+                    running share its task and download, see :class:`QwenImg`
+            upload_cache: Upload each local input once and reuse the
+                    uploaded URL, see :class:`QwenImg`
+            normalize_inputs: Shrink and re-encode local input images before
+                    upload, see :class:`QwenImg`
+            router: Spread submissions across DashScope regions, see
+                    :class:`QwenImg`
+            hooks: Report per-phase timings to a :class:`Hooks` object, see
+                    :class:`QwenImg`
+        """
+        super().__init__(api_key=api_key, endpoint=endpoint, region=region, router=router, hooks=hooks)
+        self.uploads = _upload_cache(upload_cache)
+        self.normalize_inputs = normalize_inputs
+        self.max_connections = max_connections
+        if rate_limiter is True:
+            rate_limiter = get_rate_limiter()
+        self.rate_limiter = rate_limiter or None
+        self.coalesce = coalesce
+        self._inflight: Dict[str, _InFlight] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self) -> "AsyncQwenImg":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Close the underlying HTTP sessions, including the SDK's session for this event loop."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        try:
+            from dashscope.api_entities.aio_session import close_shared_aio_session
+        except ImportError:
+            # Older SDKs open and close a session per request
+            return
+        # The SDK keeps one session per event loop and only closes it at
+        # interpreter exit, after asyncio.run() has closed the loop
+        await close_shared_aio_session()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_connections)
+            timeout = aiohttp.ClientTimeout(
+                sock_connect=HTTP_CONNECT_TIMEOUT, sock_read=HTTP_READ_TIMEOUT
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        return self._session
+
+    async def _task_api(self, kind: str, method: str, *args, **kwargs):
+        """Call a DashScope task API method without blocking the event loop."""
+        aio_api = aio_task_api(kind)
+        if aio_api is not None:
+            return await getattr(aio_api, method)(*args, **kwargs)
+
+        # Submission and status checks are short requests, so running the
+        # sync SDK in the default executor only occupies a thread briefly.
+        loop = asyncio.get_running_loop()
+        call = functools.partial(getattr(task_api(kind), method), *args, **kwargs)
+        return await loop.run_in_executor(None, call)
+
+    async def _fetch(self, kind: str, task_id: str, params: dict):
+        """Check a task's status on the endpoint it was submitted to."""
+        api_key, base_address = params["api_key"], params.get("base_address")
+        api, aio_api = task_api(kind), aio_task_api(kind)
+        if aio_api is None:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, fetch_task, api, task_id, api_key, base_address)
+        if base_address is None:
+            return await aio_api.fetch(task_id, api_key=api_key)
+        # Like the sync classes, AioImageSynthesis.fetch does not pass base_address on
+        response = await super(aio_api, aio_api).fetch(task_id, api_key=api_key, base_address=base_address)
+        return task_response(api, response)
+
+    async def _cancel(self, kind: str, task_id: str, params: dict) -> bool:
+        """Cancel a PENDING task on the endpoint it was submitted to; returns whether it was canceled."""
+        api_key, base_address = params["api_key"], params.get("base_address")
+        aio_api = aio_task_api(kind)
+        if aio_api is None:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, cancel_task, task_api(kind), task_id, api_key, base_address)
+        try:
+            response = await super(aio_api, aio_api).cancel(task_id, api_key=api_key, base_address=base_address)
+        except NETWORK_ERRORS:
+            return False
+        return classify_response(response) is None
+
+    async def _acquire(self, limiter: ModelLimiter) -> None:
+        delay = limiter.try_acquire()
+        while delay:
+            await asyncio.sleep(delay)
+            delay = limiter.try_acquire()
+
+    async def _submit(self, kind: str, params: dict, what: str):
+        """
+        Create a task, retrying throttled and transient failures with jittered backoff.
+
+        Returns:
+            Tuple of (submission response, parameters the task was submitted
+            with, rate limiter whose slot the task holds)
+        """
+        loop = asyncio.get_running_loop()
+        attempt = 0
+        while True:
+            if local_inputs(params):
+                # Hashing and uploading a file blocks, so it runs in the default executor
+                region, routed = await loop.run_in_executor(None, self._route, params)
+            else:
+                region, routed = self._route(params)
+            limiter = self._limiter(routed)
+            if limiter is not None:
+                try:
+                    await self._acquire(limiter)
+                except BaseException:
+                    self._release_key(routed)
+                    raise
+            failure = None
+            started = loop.time()
+            try:
+                response = await self._task_api(kind, "async_call", **routed)
+                failure = classify_response(response)
+                self._submitted(kind, routed, region, attempt, loop.time() - started, response, failure)
+                if region is not None:
+                    self.router.record(region, loop.time() - started, failure)
+                if failure is not None and self._rejected_key(routed, response):
+                    failure = TRANSIENT
+                if failure is None or failure == PERMANENT or attempt >= SUBMIT_MAX_RETRIES:
+                    self._check_response(response, what)
+                    if limiter is not None:
+                        limiter.accepted()
+                    return response, routed, limiter
+            except NETWORK_ERRORS:
+                self._submitted(kind, routed, region, attempt, loop.time() - started, None, TRANSIENT)
+                if region is not None:
+                    self.router.record(region, loop.time() - started, TRANSIENT)
+                if limiter is not None:
+                    limiter.release()
+                self._release_key(routed)
+                if attempt >= SUBMIT_MAX_RETRIES:
+                    raise
+            except BaseException:
+                if limiter is not None:
+                    limiter.release(throttled=failure == THROTTLED)
+                self._release_key(routed)
+                raise
+            else:
+                if limiter is not None:
+                    limiter.release(throttled=failure == THROTTLED)
+                self._release_key(routed)
+
+            await asyncio.sleep(backoff_delay(attempt))
+            attempt += 1
+
+    async def _generate(self, kind: str, params: dict, what: str, progress: Optional[ProgressListeners] = None):
+        """Submit a task and poll it until DashScope reports a final state."""
+        response, params, limiter = await self._submit(kind, params, what)
+        try:
+            return await self._poll(kind, response.output.task_id, params, what, progress, response)
+        finally:
+            if limiter is not None:
+                limiter.release()
+            self._release_key(params)
+
+    async def _poll(
+        self,
+        kind: str,
+        task_id: str,
+        params: dict,
+        what: str,
+        progress: Optional[ProgressListeners] = None,
+        response=None,
+    ):
+        """Poll a task until DashScope reports a final state; response is its submission, if made here."""
+        submitted_at = time.monotonic()
+        started_at = None
+        status = "PENDING"
+        metrics: Dict[str, int] = {}
+        event = dict(kind=kind, model=params["model"], task_id=task_id)
+        key = key_fingerprint(params["api_key"]) if params.get("api_key") else None
+
+        def report(status: str, done: bool = False) -> None:
+            if not progress:
+                return
+            now = time.monotonic()
+            queued = task_timings(response).get("queued") if done else None
+            if queued is None:
+                queued = (started_at if started_at is not None else now) - submitted_at
+            progress.report(TaskProgress(
+                kind, task_id, params["model"], status, now - submitted_at, queued, metrics, done,
+                params.get("base_address"), key,
+            ))
+
+        report("PENDING")
+
+        try:
+            interval, max_interval = poll_intervals(kind, params)
+            network_failures = 0
+            while True:
+                await asyncio.sleep(interval)
+                interval = min(interval * POLL_BACKOFF, max_interval)
+
+                started = time.monotonic()
+                try:
+                    response = await self._fetch(kind, task_id, params)
+                except NETWORK_ERRORS as e:
+                    # Like TaskHandle: check again later, up to a bound
+                    emit(self.hooks, "status", time.monotonic() - started, status=status, failure=TRANSIENT, **event)
+                    network_failures += 1
+                    if network_failures >= POLL_MAX_FAILURES:
+                        raise RuntimeError(
+                            f"Failed to check task {task_id}: {network_failures} consecutive network errors"
+                        ) from e
+                    continue
+                network_failures = 0
+                failure = classify_response(response)
+                # Like TaskHandle: a throttled or failed check keeps the last known status
+                if failure is None:
+                    status = response.output.task_status
+                emit(
+                    self.hooks, "status", time.monotonic() - started, request_id=response.request_id,
+                    status=status, failure=failure, **event,
+                )
+                if failure in (THROTTLED, TRANSIENT):
+                    continue
+
+                if failure is None:
+                    metrics = task_metrics(response) or metrics
+                    if status != "PENDING" and started_at is None:
+                        started_at = time.monotonic()
+                    report(status, status in FINAL_TASK_STATUSES)
+                if failure is not None or status in FINAL_TASK_STATUSES:
+                    emit(
+                        self.hooks, "result", time.monotonic() - submitted_at, request_id=response.request_id,
+                        status=status, failure=failure, timings=task_timings(response), **event,
+                    )
+                self._check_response(response, what)
+                if status in FINAL_TASK_STATUSES:
+                    return response
+        except asyncio.CancelledError:
+            # The caller gave up or its timeout passed; DashScope only
+            # cancels tasks that have not started
+            if status == "PENDING":
+                await self._cancel(kind, task_id, params)
+            report("CANCELED", True)
+            raise
+
+    async def _shared(
+        self,
+        key: str,
+        make: Callable[[ProgressListeners], Awaitable],
+        progress: Optional[Callable[[TaskProgress], None]] = None,
+    ):
+        """
+        Run make(listeners) once for all concurrent callers with the same key.
+
+        Every caller's progress callback is added to the shared listeners.
+        The shared work is only canceled once every caller has been.
+        """
+        entry = self._inflight.get(key)
+        if entry is None:
+            listeners = ProgressListeners()
+            entry = _InFlight(asyncio.ensure_future(make(listeners)), listeners)
+            self._inflight[key] = entry
+
+            def forget(done: asyncio.Future) -> None:
+                if key in self._inflight and self._inflight[key].future is done:
+                    del self._inflight[key]
+            entry.future.add_done_callback(forget)
+
+        if progress is not None:
+            entry.listeners.add(progress)
+        entry.waiters += 1
+        try:
+            # A caller being cancelled must not cancel the work others wait for
+            return await asyncio.shield(entry.future)
+        except asyncio.CancelledError:
+            entry.waiters -= 1
+            if entry.waiters == 0 and not entry.future.done():
+                if self._inflight.get(key) is entry:
+                    del self._inflight[key]
+                entry.future.cancel()
+            raise
+
+    async def _fetch_images(self, params: dict, progress: Optional[ProgressListeners] = None) -> List[ImageResult]:
+        """Generate and download all images of a request without saving them."""
+        response = await self._generate("text_to_image", params, "image", progress)
+        images = [r async for r in self._task_images(response, False, None, params.get("seed"), params["model"])]
+        return sorted(images, key=lambda r: r.index)
+
+    async def _task_images(
+        self, response, save: bool, output_dir: Optional[str], seed: Optional[int], model: Optional[str] = None
+    ) -> AsyncIterator[ImageResult]:
+        """Download the images of a finished task, yielding them as they complete."""
+        image_urls = [result.url for result in response.output.results]
+        timings = task_timings(response)
+        async for result in self._download_images(image_urls, save, output_dir):
+            emit(
+                self.hooks, "download", result.timings["download"], kind="text_to_image", model=model,
+                task_id=response.output.task_id, request_id=response.request_id,
+                url=result.url, nbytes=result.nbytes,
+            )
+            result.seed = seed
+            result.timings.update(timings)
+            yield result
+
+    async def _own_images(self, images: List[ImageResult], save: bool, output_dir: str) -> AsyncIterator[ImageResult]:
+        """Give one caller of a shared request its own result objects and files."""
+        loop = asyncio.get_running_loop()
+        for r in images:
+            saved_path = None
+            if save:
+                saved_path = await loop.run_in_executor(None, save_image, r.data, r.url, output_dir)
+            yield ImageResult(r.url, r.data, saved_path, r.index, r.seed, dict(r.timings))
+
+    async def _fetch_bytes(self, url: str) -> bytes:
+        async with self._get_session().get(url) as response:
+            response.raise_for_status()
+            return await response.read()
+
+    async def text_to_image(
+        self,
+        prompt: str,
+        model: str = DEFAULT_T2I_MODEL,
+        negative_prompt: str = "",
+        n: int = 1,
+        size: str = DEFAULT_SIZE,
+        seed: Optional[int] = None,
+        prompt_extend: bool = True,
+        watermark: bool = False,
+        save: bool = True,
+        output_dir: str = DEFAULT_OUTPUT_DIR,
+        return_pil: bool = True,
+        return_results: bool = False,
+        progress: Optional[Callable[[TaskProgress], None]] = None,
+        timeout: Optional[float] = None,
+    ) -> Union[Image.Image, List[Image.Image], List[str], ImageResult, List[ImageResult]]:
+        """
+        Generate images from text prompt.
+
+        Takes the same arguments and returns the same values as
+        :meth:`QwenImg.text_to_image`.
+
+        Examples:
+            >>> image = await client.text_to_image("一只可爱的猫")
+            >>> images = await client.text_to_image("美丽的风景", n=4)
+        """
+        params = self._text_to_image_params(
+            prompt, model, negative_prompt, n, size, seed, prompt_extend, watermark
+        )
+        if self.coalesce:
+            images = await _within(self._shared(
+                request_key("text_to_image", params),
+                lambda listeners: self._fetch_images(params, listeners), progress,
+            ), timeout)
+            if not (save or return_pil or return_results):
+                return []
+            downloaded = [r async for r in self._own_images(images, save, output_dir)]
+            return self._image_results(downloaded, n, return_pil, return_results, model)
+
+        response = await _within(
+            self._generate("text_to_image", params, "image", ProgressListeners(progress)), timeout
+        )
+        return await self._finish_images(
+            response, n, save, output_dir, return_pil, return_results, seed, model
+        )
+
+    async def _finish_images(
+        self,
+        response,
+        n: int,
+        save: bool,
+        output_dir: str,
+        return_pil: bool,
+        return_results: bool,
+        seed: Optional[int],
+        model: str,
+    ):
+        """Download the images of a finished task and shape them like text_to_image."""
+        # Nothing to fetch if the caller wants neither the files nor the images
+        if not (save or return_pil or return_results):
+            return []
+
+        downloaded = sorted(
+            [r async for r in self._task_images(response, save, output_dir, seed, model)],
+            key=lambda r: r.index,
+        )
+        return self._image_results(downloaded, n, return_pil, return_results, model)
+
+    def _image_results(
+        self, downloaded: List[ImageResult], n: int, return_pil: bool, return_results: bool, model: str
+    ):
+        """Return downloaded images the way text_to_image was asked to."""
+        if return_results:
+            return downloaded[0] if n == 1 else downloaded
+        if not return_pil:
+            return [r.path for r in downloaded]
+
+        results = [r.image for r in downloaded]
+        for r in downloaded:
+            emit(
+                self.hooks, "decode", r.timings["decode"], kind="text_to_image",
+                model=model, url=r.url, nbytes=r.nbytes,
+            )
+        return results[0] if n == 1 else results
+
+    async def iter_text_to_image(
+        self,
+        prompt: str,
+        model: str = DEFAULT_T2I_MODEL,
+        negative_prompt: str = "",
+        n: int = 1,
+        size: str = DEFAULT_SIZE,
+        seed: Optional[int] = None,
+        prompt_extend: bool = True,
+        watermark: bool = False,
+        save: bool = True,
+        output_dir: str = DEFAULT_OUTPUT_DIR,
+        progress: Optional[Callable[[TaskProgress], None]] = None,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[ImageResult]:
+        """
+        Generate images from text prompt and yield each one as soon as it is downloaded.
+
+        Takes the same arguments as :meth:`QwenImg.iter_text_to_image`.
+
+        Examples:
+            >>> async for result in client.iter_text_to_image("美丽的风景", n=4):
+            ...     print(result.path)
+        """
+        params = self._text_to_image_params(
+            prompt, model, negative_prompt, n, size, seed, prompt_extend, watermark
+        )
+        if self.coalesce:
+            images = await _within(self._shared(
+                request_key("text_to_image", params),
+                lambda listeners: self._fetch_images(params, listeners), progress,
+            ), timeout)
+            async for result in self._own_images(images, save, output_dir):
+                yield result
+            return
+
+        response = await _within(
+            self._generate("text_to_image", params, "image", ProgressListeners(progress)), timeout
+        )
+        async for result in self._task_images(response, save, output_dir, seed, model):
+            yield result
+
+    async def _download_image(self, index: int, image_url: str, save: bool, output_dir: str) -> ImageResult:
+        # Download image once; the same bytes feed the file and the PIL image
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        image_data = await self._fetch_bytes(image_url)
+        download_time = loop.time() - started
+        saved_path = None
+        if save:
+            saved_path = await loop.run_in_executor(
+                None, save_image, image_data, image_url, output_dir
+            )
+        return ImageResult(image_url, image_data, saved_path, index, timings={"download": download_time})
+
+    async def _download_images(
+        self, image_urls: List[str], save: bool, output_dir: str
+    ) -> AsyncIterator[ImageResult]:
+        """Download images concurrently, yielding them as they complete."""
+        for future in asyncio.as_completed(
+            [self._download_image(index, url, save, output_dir) for index, url in enumerate(image_urls)]
+        ):
+            yield await future
+
+    async def image_to_video(
+        self,
+        image: str,
+        model: str = DEFAULT_I2V_MODEL,
+        prompt: str = "",
+        negative_prompt: str = "",
+        audio: Optional[str] = None,
+        resolution: str = DEFAULT_RESOLUTION,
+        duration: int = DEFAULT_DURATION,
+        seed: Optional[int] = None,
+        watermark: bool = False,
+        use_base64: bool = False,
+        progress: Optional[Callable[[TaskProgress], None]] = None,
+        timeout: Optional[float] = None,
+    ) -> VideoResult:
+        """
+        Generate video from image.
+
+        Takes the same arguments as :meth:`QwenImg.image_to_video`.
+
+        Returns:
+            VideoResult with the URL of the generated video
+        """
+        if self._should_normalize(image, resolution):
+            # On the normalize pool, bounding how many images are decoded at once
+            image = await asyncio.get_running_loop().run_in_executor(
+                get_normalize_pool(), normalize_image, image, resolution
+            )
+        params = self._image_to_video_params(
+            image, model, prompt, negative_prompt, audio,
+            resolution, duration, seed, watermark, use_base64,
+        )
+        return await self._generate_video("image_to_video", params, progress, timeout)
+
+    async def text_to_video(
+        self,
+        prompt: str,
+        model: str = DEFAULT_T2V_MODEL,
+        negative_prompt: str = "",
+        resolution: str = DEFAULT_RESOLUTION,
+        duration: int = DEFAULT_DURATION,
+        seed: Optional[int] = None,
+        watermark: bool = False,
+        progress: Optional[Callable[[TaskProgress], None]] = None,
+        timeout: Optional[float] = None,
+    ) -> VideoResult:
+        """
+        Generate video from text prompt.
+
+        Takes the same arguments as :meth:`QwenImg.text_to_video`.
+
+        Returns:
+            VideoResult with the URL of the generated video
+        """
+        params = self._text_to_video_params(
+            prompt, model, negative_prompt, resolution, duration, seed, watermark
+        )
+        return await self._generate_video("text_to_video", params, progress, timeout)
+
+    async def resume_task(
+        self,
+        kind: str,
+        task_id: str,
+        api_key: Optional[str] = None,
+        base_address: Optional[str] = None,
+        **kwargs,
+    ):
+        """
+        Wait for a task submitted earlier, possibly by another process.
+
+        Nothing is submitted; the existing task is polled and the call returns
+        what ``await client.<kind>(**kwargs)`` would have returned. Takes the
+        same arguments as :meth:`QwenImg.resume_task`.
+
+        Examples:
+            >>> video = await client.resume_task("text_to_video", task_id)
+        """
+        if kind not in ("text_to_image", "image_to_video", "text_to_video"):
+            raise ValueError(f"Unknown task kind: {kind}")
+        arguments = inspect.signature(getattr(self, kind)).bind_partial(**kwargs)
+        arguments.apply_defaults()
+        args = arguments.arguments
+
+        params = {
+            "api_key": api_key or self.api_key,
+            "base_address": base_address or self.endpoint,
+            "model": args["model"],
+            "seed": args["seed"],
+        }
+        what = "image" if kind == "text_to_image" else "video"
+        if what == "video":
+            params.update(resolution=args["resolution"], duration=args["duration"])
+        response = await _within(
+            self._poll(kind, task_id, params, what, ProgressListeners(args["progress"])), args["timeout"]
+        )
+        if what == "video":
+            return self._video_result(response, params)
+        return await self._finish_images(
+            response, args["n"], args["save"], args["output_dir"], args["return_pil"],
+            args["return_results"], args["seed"], args["model"],
+        )
+
+    def _video_result(self, response, params: dict) -> VideoResult:
+        """Build the result of a finished video task."""
+        return VideoResult(
+            response.output.video_url, task_id=response.output.task_id,
+            seed=params.get("seed"), timings=task_timings(response), model=params["model"],
+        )
+
+    async def _generate_video(
+        self,
+        kind: str,
+        params: dict,
+        progress: Optional[Callable[[TaskProgress], None]] = None,
+        timeout: Optional[float] = None,
+    ) -> VideoResult:
+        """Generate a video, sharing the task with identical requests when coalescing."""
+        async def generate(listeners: ProgressListeners) -> VideoResult:
+            return self._video_result(await self._generate(kind, params, "video", listeners), params)
+
+        if self.coalesce:
+            return (await _within(self._shared(request_key(kind, params), generate, progress), timeout)).copy()
+        return await _within(generate(ProgressListeners(progress)), timeout)
+
+    async def download_video(
+        self, video: Union[str, VideoResult], filepath: str, chunk_size: int = 1024 * 1024
+    ) -> str:
+        """
+        Stream a generated video to disk.
+
+        Args:
+            video: VideoResult returned by image_to_video / text_to_video, or
+                   the video URL; a VideoResult's path is set to filepath
+            filepath: Destination file path
+            chunk_size: Bytes read from the socket per write
+
+        Returns:
+            Path to saved video
+        """
+        url = video.url if isinstance(video, VideoResult) else video
+        Path(filepath).parent.mkdir(parents=True, exist_ok=True)
+        loop = asyncio.get_running_loop()
+        started = time.monotonic()
+
+        async with self._get_session().get(url) as response:
+            response.raise_for_status()
+            with open(filepath, "wb") as f:
+                async for chunk in response.content.iter_chunked(chunk_size):
+                    await loop.run_in_executor(None, f.write, chunk)
+
+        download_time = time.monotonic() - started
+        if isinstance(video, VideoResult):
+            video.path = str(filepath)
+            video.timings["download"] = download_time
+        emit(
+            self.hooks, "download", download_time, url=url, nbytes=os.path.getsize(filepath),
+            model=video.model if isinstance(video, VideoResult) else None,
+            task_id=video.task_id if isinstance(video, VideoResult) else None,
+        )
+        return str(filepath)
@@ -0,0 +1,144 @@
+"""
+Batch generation with bounded concurrency.
+
+Inputs are read lazily and only ``max_concurrency`` tasks are submitted or
+buffered at any time, so memory stays flat whether the batch has ten prompts
+or a million.
+"""
+
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+from .tasks import TaskHandle, TaskPoller
+
+
+class BatchResult:
+    """
+    Outcome of one item of a batch.
+
+    Examples:
+        >>> for item in client.batch_text_to_image(prompts, max_concurrency=8):
+        ...     if item.ok:
+        ...         print(item.index, item.result)
+        ...     else:
+        ...         print(item.index, "failed:", item.error)
+    """
+
+    def __init__(
+        self,
+        index: int,
+        request: Any,
+        result: Any = None,
+        error: Optional[BaseException] = None,
+        task_id: Optional[str] = None,
+    ):
+        """
+        Args:
+            index: Position of the item in the input
+            request: The input item (prompt, image or parameter dict)
+            result: What the single-item method would have returned
+            error: Exception raised while submitting, generating or downloading
+            task_id: Remote DashScope task id, None if submission failed
+        """
+        self.index = index
+        self.request = request
+        self.result = result
+        self.error = error
+        self.task_id = task_id
+
+    @property
+    def ok(self) -> bool:
+        """Whether the item succeeded."""
+        return self.error is None
+
+    def __repr__(self) -> str:
+        state = "ok" if self.ok else f"error={self.error!r}"
+        return f"BatchResult(index={self.index}, task_id={self.task_id!r}, {state})"
+
+
+def item_kwargs(item: Any, key: str, defaults: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Turn a batch input item into keyword arguments for a submit_* method.
+
+    Args:
+        item: Either a plain value for ``key`` or a dict of keyword arguments
+        key: Argument a plain value stands for ("prompt" or "image")
+        defaults: Arguments shared by all items; the item's own values win
+
+    Returns:
+        Keyword arguments for the submit method
+    """
+    if isinstance(item, dict):
+        return {**defaults, **item}
+    return {**defaults, key: item}
+
+
+def run_batch(
+    submit: Callable[[Any], TaskHandle],
+    items: Iterable[Any],
+    max_concurrency: int,
+    ordered: bool = False,
+) -> Iterator[BatchResult]:
+    """
+    Submit items with at most ``max_concurrency`` in flight and yield their results.
+
+    Args:
+        submit: Submits one input item and returns its handle
+        items: Input items, consumed lazily
+        max_concurrency: Maximum number of submitted-but-not-yielded items
+        ordered: Yield results in input order (True) or completion order (False)
+
+    Yields:
+        One BatchResult per input item
+    """
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1")
+
+    items = iter(items)
+    poller = TaskPoller()
+    pending: Dict[int, Any] = {}       # in flight: handle id -> (index, item)
+    finished: Dict[int, BatchResult] = {}  # waiting for their turn when ordered
+    next_index = 0                     # next input index to read
+    next_to_yield = 0                  # next index to yield when ordered
+    exhausted = False
+
+    def emit(result: BatchResult) -> Iterator[BatchResult]:
+        nonlocal next_to_yield
+        if not ordered:
+            yield result
+            return
+        finished[result.index] = result
+        while next_to_yield in finished:
+            yield finished.pop(next_to_yield)
+            next_to_yield += 1
+
+    while True:
+        # Top up the window; buffered ordered results count against it so
+        # a slow head-of-line item cannot make the buffer grow without bound
+        while not exhausted and len(poller) + len(finished) < max_concurrency:
+            try:
+                item = next(items)
+            except StopIteration:
+                exhausted = True
+                break
+
+            index = next_index
+            next_index += 1
+            try:
+                handle = submit(item)
+            except Exception as e:
+                yield from emit(BatchResult(index, item, error=e))
+                continue
+
+            pending[id(handle)] = (index, item)
+            poller.add(handle)
+
+        if not poller:
+            break
+
+        handle = poller.next_done()
+        index, item = pending.pop(id(handle))
+        try:
+            result = BatchResult(index, item, handle.result(), task_id=handle.task_id)
+        except Exception as e:
+            result = BatchResult(index, item, error=e, task_id=handle.task_id)
+        yield from emit(result)
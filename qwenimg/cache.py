@@ -0,0 +1,282 @@
+"""
+Content-addressed on-disk cache of generation results.
+
+A request with a fixed ``seed`` (and, for images, ``prompt_extend=False``)
+produces the same output every time, so its result files can be stored under
+a hash of the request and returned on the next identical call without
+generating anything.
+
+Files live in a sharded directory (``<root>/<key[:2]>/<key>/<file>``) and are
+tracked in a SQLite index, which evicts the least recently used entries when
+the cache grows past its size limit and expires entries past their maximum
+age. The index is safe to share between threads and processes.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from .config import CACHE_DIR, CACHE_MAX_BYTES, CACHE_MAX_AGE
+from .tasks import TaskHandle
+from .utils import file_digest
+
+# Request parameters that decide the output; the API key does not
+CACHE_KEY_PARAMS = (
+    "model", "prompt", "negative_prompt", "size", "seed", "watermark", "n",
+    "prompt_extend", "img_url", "audio_url", "resolution", "duration",
+)
+
+
+def _hash_file_url(value):
+    """Replace a file:// input with the hash of its content."""
+    if isinstance(value, str) and value.startswith("file://"):
+        return "sha256:" + file_digest(value[len("file://"):])
+    return value
+
+
+def request_key(kind: str, params: dict) -> str:
+    """
+    Get a canonical hash of the parameters that decide a request's output.
+
+    Args:
+        kind: Task kind ("text_to_image", "image_to_video" or "text_to_video")
+        params: API parameters of the request
+
+    Returns:
+        Hex digest identifying the request
+    """
+    canonical = {"kind": kind}
+    for name in CACHE_KEY_PARAMS:
+        if params.get(name) is not None:
+            canonical[name] = _hash_file_url(params[name])
+    payload = json.dumps(canonical, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def cache_key(kind: str, params: dict) -> Optional[str]:
+    """
+    Get the cache key of a request.
+
+    Returns:
+        :func:`request_key` of the request, or None if its output is not
+        reproducible and must not be cached
+    """
+    if params.get("seed") is None:
+        return None
+    if kind == "text_to_image" and params.get("prompt_extend", True):
+        return None
+    return request_key(kind, params)
+
+
+def completed_handle(kind: str, params: dict, finish: Callable[[None], object]) -> TaskHandle:
+    """Create a handle that is already done, for results served from the cache."""
+    handle = TaskHandle(None, kind, None, params, finish)
+    handle.status = "SUCCEEDED"
+    return handle
+
+
+class ResultCache:
+    """
+    Size- and age-bounded cache of result files, keyed by :func:`cache_key`.
+
+    Examples:
+        >>> client = QwenImg(cache=True)                 # default directory
+        >>> client = QwenImg(cache=ResultCache("/data/qwenimg-cache", max_bytes=50 * 1024**3))
+        >>> client.text_to_image("一只猫", seed=42, prompt_extend=False)  # generated
+        >>> client.text_to_image("一只猫", seed=42, prompt_extend=False)  # from cache
+    """
+
+    def __init__(
+        self,
+        directory: str = CACHE_DIR,
+        max_bytes: int = CACHE_MAX_BYTES,
+        max_age: Optional[float] = CACHE_MAX_AGE,
+    ):
+        """
+        Args:
+            directory: Cache root directory
+            max_bytes: Total size of cached files above which the least
+                       recently used entries are evicted
+            max_age: Seconds after which an entry expires, None to keep
+                     entries until they are evicted
+        """
+        self.directory = Path(directory).expanduser()
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._lock = threading.Lock()
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self._connect() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY,"
+                " files TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)")
+            # Caches created before result URLs were kept have no urls column
+            if "urls" not in {row[1] for row in db.execute("PRAGMA table_info(entries)")}:
+                db.execute("ALTER TABLE entries ADD COLUMN urls TEXT")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # One short-lived connection per operation keeps the cache usable from
+        # any thread; SQLite's own locking covers other processes
+        db = sqlite3.connect(str(self.directory / "index.sqlite3"), timeout=30)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def _entry_dir(self, key: str) -> Path:
+        return self.directory / key[:2] / key
+
+    def get(self, key: str) -> Optional[List[str]]:
+        """
+        Look up the files of a cached result.
+
+        Args:
+            key: Cache key from :func:`cache_key`
+
+        Returns:
+            Paths of the cached files in result order, or None on a miss
+        """
+        entry = self.get_entry(key)
+        return None if entry is None else [path for path, _ in entry]
+
+    def get_entry(self, key: str) -> Optional[List[Tuple[str, Optional[str]]]]:
+        """
+        Look up the files of a cached result and the URLs they were downloaded from.
+
+        Args:
+            key: Cache key from :func:`cache_key`
+
+        Returns:
+            (path, URL) pairs in result order, or None on a miss. The URL is
+            the one DashScope returned for the result, so it may have
+            expired; it is None for entries stored without one.
+        """
+        now = time.time()
+        with self._lock, self._connect() as db:
+            row = db.execute("SELECT files, created_at, urls FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+
+            paths = [str(self._entry_dir(key) / name) for name in json.loads(row[0])]
+            expired = self.max_age is not None and now - row[1] > self.max_age
+            if expired or not all(os.path.exists(path) for path in paths):
+                self._delete(db, key)
+                return None
+
+            db.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            urls = json.loads(row[2]) if row[2] else [None] * len(paths)
+            return list(zip(paths, urls))
+
+    def temp_path(self) -> str:
+        """
+        Get a fresh path inside the cache directory to download a file to.
+
+        Files written there can be moved into an entry with :meth:`put_files`
+        without copying.
+        """
+        staging = self.directory / "tmp"
+        staging.mkdir(exist_ok=True)
+        fd, path = tempfile.mkstemp(dir=str(staging))
+        os.close(fd)
+        return path
+
+    def put_files(
+        self, key: str, files: List[Tuple[str, str]], urls: Optional[List[str]] = None
+    ) -> List[str]:
+        """
+        Move files into the cache as the result of a request.
+
+        Args:
+            key: Cache key from :func:`cache_key`
+            files: (file name, path) pairs in result order; the files are
+                   moved, not copied
+            urls: URLs the files were downloaded from, returned by :meth:`get_entry`
+
+        Returns:
+            Paths of the cached files
+        """
+        entry_dir = self._entry_dir(key)
+        entry_dir.mkdir(parents=True, exist_ok=True)
+
+        names, size, cached = [], 0, []
+        for index, (name, path) in enumerate(files):
+            # Prefix with the index so results with equal file names stay apart
+            name = f"{index}_{name}"
+            target = entry_dir / name
+            os.replace(path, target)
+            names.append(name)
+            size += target.stat().st_size
+            cached.append(str(target))
+
+        now = time.time()
+        with self._lock, self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO entries (key, files, size, created_at, accessed_at, urls) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, json.dumps(names), size, now, now, json.dumps(urls) if urls else None),
+            )
+            self._evict(db, keep=key)
+        return cached
+
+    def put(self, key: str, files: List[Tuple[str, bytes]], urls: Optional[List[str]] = None) -> List[str]:
+        """
+        Store in-memory result files.
+
+        Args:
+            key: Cache key from :func:`cache_key`
+            files: (file name, content) pairs in result order
+            urls: URLs the files were downloaded from, returned by :meth:`get_entry`
+
+        Returns:
+            Paths of the cached files
+        """
+        staged = []
+        for name, data in files:
+            path = self.temp_path()
+            with open(path, "wb") as f:
+                f.write(data)
+            staged.append((name, path))
+        return self.put_files(key, staged, urls)
+
+    def _delete(self, db: sqlite3.Connection, key: str) -> None:
+        db.execute("DELETE FROM entries WHERE key = ?", (key,))
+        shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+
+    def _evict(self, db: sqlite3.Connection, keep: Optional[str] = None) -> None:
+        """Drop expired entries, then least recently used ones until under max_bytes."""
+        if self.max_age is not None:
+            cutoff = time.time() - self.max_age
+            for (key,) in db.execute("SELECT key FROM entries WHERE created_at < ?", (cutoff,)).fetchall():
+                self._delete(db, key)
+
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in db.execute("SELECT key, size FROM entries ORDER BY accessed_at").fetchall():
+            if total <= self.max_bytes:
+                break
+            if key != keep:
+                self._delete(db, key)
+                total -= size
+
+    def clear(self) -> None:
+        """Remove every cached result."""
+        with self._lock, self._connect() as db:
+            for (key,) in db.execute("SELECT key FROM entries").fetchall():
+                self._delete(db, key)
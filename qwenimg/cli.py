@@ -0,0 +1,299 @@
+"""
+Command-line batch runner.
+
+Runs the jobs of a JSONL or CSV file with bounded concurrency and records
+each one in a :class:`~qwenimg.journal.Journal`, so an interrupted run picks
+up where it stopped when started again.
+
+    $ qwenimg run prompts.jsonl --concurrency 8 --output-dir outputs
+    $ qwenimg status prompts.jsonl --failed
+    $ qwenimg models
+
+Each JSONL line is an object of arguments for the job's ``submit_*`` method,
+plus an optional ``kind`` ("text_to_image", "image_to_video" or
+"text_to_video", default ``--kind``) and ``id``. CSV files have the same
+names as column headers. A job without an ``id`` is identified by its line
+(JSONL) or row (CSV) number, so keep ids explicit if the file may be edited
+between runs.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from .batch import run_batch
+from .config import BATCH_MAX_CONCURRENCY, DEFAULT_OUTPUT_DIR, DOWNLOAD_WORKERS, BEIJING_ENDPOINT
+from .journal import FAILED, SUBMITTED, SUCCEEDED, Journal, job_spec
+from .keys import key_fingerprint
+from .utils import filename_from_url
+
+KINDS = ("text_to_image", "image_to_video", "text_to_video")
+
+# CSV cells are strings; these arguments are converted to their real types
+INT_ARGUMENTS = ("n", "duration", "seed")
+BOOL_ARGUMENTS = ("prompt_extend", "watermark", "use_base64")
+TRUE_VALUES = ("1", "true", "yes", "y", "on")
+FALSE_VALUES = ("0", "false", "no", "n", "off")
+
+# One job of a job file: (id, kind, submit_* arguments)
+Job = Tuple[str, str, Dict[str, Any]]
+
+
+def _csv_value(name: str, value: str) -> Any:
+    if name in INT_ARGUMENTS:
+        return int(value)
+    if name in BOOL_ARGUMENTS:
+        if value.lower() in TRUE_VALUES:
+            return True
+        if value.lower() in FALSE_VALUES:
+            return False
+        raise ValueError(f"{name} must be true or false, got {value!r}")
+    return value
+
+
+def read_jobs(path: str, kind: str = "text_to_image", format: Optional[str] = None) -> Iterator[Job]:
+    """
+    Read the jobs of a JSONL or CSV file lazily.
+
+    Args:
+        path: Job file
+        kind: Kind of jobs that do not name one
+        format: "jsonl" or "csv", default from the file extension
+
+    Yields:
+        (job id, kind, submit_* arguments) per job
+    """
+    format = format or ("csv" if path.lower().endswith(".csv") else "jsonl")
+    with open(path, encoding="utf-8", newline="" if format == "csv" else None) as f:
+        if format == "csv":
+            for number, row in enumerate(csv.DictReader(f), 1):
+                # Empty cells leave the argument at its default
+                job = {name: _csv_value(name, value) for name, value in row.items() if name and value}
+                yield str(job.pop("id", number)), job.pop("kind", kind), job
+        else:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    job = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"{path}:{number}: invalid JSON: {e}")
+                if isinstance(job, str):
+                    job = {"prompt" if kind != "image_to_video" else "image": job}
+                yield str(job.pop("id", number)), job.pop("kind", kind), job
+
+
+def default_journal_path(jobs_path: str) -> str:
+    return f"{jobs_path}.journal.sqlite3"
+
+
+def run_jobs(
+    client,
+    jobs: Iterator[Job],
+    journal: Journal,
+    concurrency: int = BATCH_MAX_CONCURRENCY,
+    output_dir: str = DEFAULT_OUTPUT_DIR,
+    retry_failed: bool = False,
+    log: Callable[[str], None] = print,
+) -> Dict[str, int]:
+    """
+    Run jobs with a client, skipping those the journal has finished.
+
+    Jobs the journal records as submitted are polled through
+    :meth:`QwenImg.resume_task` instead of being submitted again. Images are
+    saved and videos downloaded into ``output_dir`` (or the job's own
+    ``output_dir``). Videos download on a pool of ``DOWNLOAD_WORKERS``
+    threads, so a slow download does not hold up submitting and polling
+    the other jobs; a job is recorded as finished once its video is on disk.
+
+    Args:
+        client: QwenImg client
+        jobs: Jobs from :func:`read_jobs`
+        journal: Journal of this job file
+        concurrency: Maximum number of tasks in flight
+        output_dir: Directory for the results
+        retry_failed: Run jobs that failed in an earlier run again
+        log: Called with one line per finished job
+
+    Returns:
+        Number of jobs "skipped", "resumed", "succeeded" and "failed" by this run
+
+    Raises:
+        ValueError: If a job differs from the job of the same id in the journal
+    """
+    counts = {"skipped": 0, "resumed": 0, SUCCEEDED: 0, FAILED: 0}
+    keys = client.keys.keys if client.keys is not None else [client.api_key]
+    keys_by_fingerprint = {key_fingerprint(key): key for key in keys}
+
+    def todo():
+        for job_id, kind, kwargs in jobs:
+            spec = job_spec(kind, kwargs)
+            entry = journal.get(job_id)
+            if entry is not None and entry.spec != spec:
+                raise ValueError(
+                    f"Job {job_id} is not the job of that id recorded in {journal.path}; "
+                    "give jobs explicit ids or use a new journal"
+                )
+            if entry is not None and (entry.status == SUCCEEDED or (entry.status == FAILED and not retry_failed)):
+                counts["skipped"] += 1
+                continue
+            yield job_id, kind, kwargs, spec, entry
+
+    def submit(item):
+        job_id, kind, kwargs, spec, entry = item
+        if kind not in KINDS:
+            raise ValueError(f"Unknown kind {kind!r}, expected one of {KINDS}")
+        kwargs = dict(kwargs)
+        job_dir = kwargs.pop("output_dir", output_dir)
+        if kind == "text_to_image":
+            kwargs.update(save=True, output_dir=job_dir, return_pil=False, return_results=False)
+
+        if entry is not None and entry.status == SUBMITTED and entry.task_id:
+            api_key = keys_by_fingerprint.get(entry.key)
+            if api_key is None:
+                raise ValueError(f"Task {entry.task_id} was submitted with an API key that is not configured")
+            counts["resumed"] += 1
+            return client.resume_task(kind, entry.task_id, api_key, entry.base_address, **kwargs)
+
+        handle = getattr(client, f"submit_{kind}")(**kwargs)
+        fingerprint = key_fingerprint(handle.api_key) if handle.api_key else None
+        journal.submitted(job_id, kind, spec, handle.task_id, handle.base_address, fingerprint)
+        return handle
+
+    def record(job_id: str, kind: str, spec: str, outputs, error: Optional[BaseException]) -> None:
+        if error is None:
+            journal.finished(job_id, outputs)
+            counts[SUCCEEDED] += 1
+            log(f"{job_id}\tsucceeded\t{' '.join(outputs)}")
+        else:
+            journal.failed(job_id, kind, spec, str(error))
+            counts[FAILED] += 1
+            log(f"{job_id}\tfailed\t{error}")
+
+    # Video downloads in progress; the journal is only written from this thread
+    downloads: Dict[Future, Tuple[str, str, str]] = {}
+
+    def collect(block: bool) -> None:
+        done, _ = wait(list(downloads), timeout=None if block else 0)
+        for future in done:
+            job_id, kind, spec = downloads.pop(future)
+            try:
+                record(job_id, kind, spec, [future.result()], None)
+            except Exception as e:
+                record(job_id, kind, spec, None, e)
+
+    pool = ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS, thread_name_prefix="qwenimg-cli-download")
+    try:
+        for item in run_batch(submit, todo(), concurrency):
+            job_id, kind, kwargs, spec, _ = item.request
+            if item.error is not None or kind == "text_to_image":
+                record(job_id, kind, spec, item.result, item.error)
+            else:
+                path = os.path.join(kwargs.get("output_dir", output_dir), filename_from_url(item.result.url))
+                downloads[pool.submit(client.download_video, item.result, path)] = (job_id, kind, spec)
+            collect(block=False)
+        collect(block=True)
+    finally:
+        # Interrupted: downloads not started yet are resumed by the next run
+        for future in downloads:
+            future.cancel()
+        pool.shutdown(wait=True)
+    return counts
+
+
+def _run(args) -> int:
+    from .client import QwenImg
+
+    journal = Journal(args.journal or default_journal_path(args.jobs))
+    client = QwenImg(
+        api_key=args.api_key, endpoint=args.endpoint, region=args.region,
+        rate_limiter=args.rate_limit or None, upload_cache=args.upload_cache or None,
+    )
+    jobs = read_jobs(args.jobs, args.kind, args.format)
+    try:
+        counts = run_jobs(client, jobs, journal, args.concurrency, args.output_dir, args.retry_failed)
+    except KeyboardInterrupt:
+        print(
+            f"Interrupted; tasks already submitted are recorded in {journal.path} "
+            "and will be resumed by the next run",
+            file=sys.stderr,
+        )
+        return 130
+    except (OSError, ValueError) as e:
+        # Unreadable job file, or a job file that no longer matches the journal
+        print(f"qwenimg: {e}", file=sys.stderr)
+        return 2
+    finally:
+        client.close()
+
+    print(
+        f"{counts[SUCCEEDED]} succeeded, {counts[FAILED]} failed, {counts['resumed']} resumed, "
+        f"{counts['skipped']} skipped (already done)",
+        file=sys.stderr,
+    )
+    return 1 if counts[FAILED] else 0
+
+
+def _status(args) -> int:
+    path = args.journal or default_journal_path(args.jobs)
+    if not os.path.exists(path):
+        print(f"No journal at {path}", file=sys.stderr)
+        return 1
+
+    journal = Journal(path)
+    counts = journal.counts()
+    for status in (SUCCEEDED, SUBMITTED, FAILED):
+        print(f"{status:<10} {counts.get(status, 0)}")
+    if args.failed:
+        for entry in journal.entries(FAILED):
+            print(f"{entry.job_id}\t{entry.error}")
+    return 0
+
+
+def _models(args) -> int:
+    from .client import QwenImg
+
+    print(json.dumps(QwenImg.list_models(args.type), indent=2, ensure_ascii=False))
+    return 0
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Entry point of the ``qwenimg`` console script."""
+    parser = argparse.ArgumentParser(prog="qwenimg", description="Batch image and video generation with DashScope")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run the jobs of a JSONL or CSV file, resuming an earlier run")
+    run.add_argument("jobs", help="job file (.jsonl or .csv)")
+    run.add_argument("--journal", help="journal database (default: <jobs>.journal.sqlite3)")
+    run.add_argument("--kind", choices=KINDS, default="text_to_image", help="kind of jobs that do not name one")
+    run.add_argument("--format", choices=("jsonl", "csv"), help="job file format (default: from the extension)")
+    run.add_argument("-j", "--concurrency", type=int, default=BATCH_MAX_CONCURRENCY, help="tasks in flight")
+    run.add_argument("-o", "--output-dir", default=DEFAULT_OUTPUT_DIR)
+    run.add_argument("--retry-failed", action="store_true", help="run jobs that failed in an earlier run again")
+    run.add_argument("--api-key", help="API key(s), comma-separated (default: DASHSCOPE_API_KEY)")
+    run.add_argument("--endpoint", default=BEIJING_ENDPOINT)
+    run.add_argument("--region", default="beijing", choices=("beijing", "singapore"))
+    run.add_argument("--rate-limit", action="store_true", help="stay within each model's QPS and task quota")
+    run.add_argument("--upload-cache", action="store_true", help="upload each local input file only once")
+    run.set_defaults(handler=_run)
+
+    status = commands.add_parser("status", help="show how far the jobs of a job file got")
+    status.add_argument("jobs", help="job file (.jsonl or .csv)")
+    status.add_argument("--journal", help="journal database (default: <jobs>.journal.sqlite3)")
+    status.add_argument("--failed", action="store_true", help="list failed jobs and their errors")
+    status.set_defaults(handler=_status)
+
+    models = commands.add_parser("models", help="list the supported models")
+    models.add_argument("type", nargs="?", default="all", choices=("all", "t2i", "i2v", "t2v"))
+    models.set_defaults(handler=_models)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,18 +2,24 @@
 Main client class for QwenImg.
 """
 
+from __future__ import annotations
+
+import inspect
 import os
-from typing import Optional, Union, List
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+from typing import TYPE_CHECKING, Optional, Union, List, Iterable, Iterator, Any, Tuple, Callable
 from pathlib import Path
 from http import HTTPStatus
-import dashscope
-from dashscope import ImageSynthesis, VideoSynthesis
-from PIL import Image
-import requests
-from io import BytesIO
+
+if TYPE_CHECKING:
+    from PIL import Image
 
 from .config import (
     BEIJING_ENDPOINT,
+    SINGAPORE_ENDPOINT,
     DEFAULT_T2I_MODEL,
     DEFAULT_I2V_MODEL,
     DEFAULT_T2V_MODEL,
@@ -21,19 +27,362 @@ from .config import (
     DEFAULT_RESOLUTION,
     DEFAULT_DURATION,
     DEFAULT_OUTPUT_DIR,
+    DOWNLOAD_WORKERS,
+    DOWNLOAD_SEGMENTS,
+    BATCH_MAX_CONCURRENCY,
+    PACK_WINDOW,
+    SUBMIT_MAX_RETRIES,
     T2I_MODELS,
     I2V_MODELS,
     T2V_MODELS,
 )
+from .batch import BatchResult, item_kwargs, run_batch
+from .download import download_file
+from .hooks import HistogramCollector, Hooks, emit
+from .cache import ResultCache, cache_key, completed_handle, request_key
+from .packing import RequestPacker, pack_key
+from .preprocess import RESOLUTION_SHORT_SIDE, normalize_image
+from .keys import KeyPool
+from .ratelimit import ModelLimiter, RateLimiter, backoff_delay, get_rate_limiter
+from .regions import Region, RegionRouter
+from .results import ImageResult, VideoResult, task_timings
+from .singleflight import SingleFlight
+from .tasks import (
+    PERMANENT, THROTTLED, TRANSIENT, TaskHandle, TaskProgress, classify_response, poll_many, task_api,
+)
+from .transport import HttpTransport, get_default_transport
+from .uploads import UploadCache, upload_inputs
 from .utils import (
     get_api_key,
     prepare_image_url,
-    download_image,
+    fetch_bytes,
+    filename_from_url,
+    save_image,
     format_size,
 )
 
 
-class QwenImg:
+def _upload_cache(upload_cache: Union[bool, str, UploadCache, None]) -> Optional[UploadCache]:
+    """Resolve the ``upload_cache`` argument of the clients."""
+    if upload_cache is True:
+        return UploadCache()
+    if isinstance(upload_cache, str):
+        return UploadCache(upload_cache)
+    return upload_cache or None
+
+
+class _BaseClient:
+    """
+    Shared configuration, validation and request building for the sync and
+    async clients.
+    """
+
+    def __init__(
+        self,
+        api_key: Union[str, Iterable[str], KeyPool, None] = None,
+        endpoint: str = BEIJING_ENDPOINT,
+        region: str = "beijing",
+        router: Optional[RegionRouter] = None,
+        hooks: Union[bool, Hooks, None] = None,
+    ):
+        """
+        Initialize QwenImg client.
+
+        Args:
+            api_key: DashScope API key, or several keys (a list or a KeyPool)
+                    to spread submissions over. If not provided, will try to
+                    get from DASHSCOPE_API_KEY environment variable or .env
+                    file, where several keys may be given comma-separated.
+            endpoint: API endpoint URL. Default is Beijing endpoint.
+            region: Region ("beijing" or "singapore"). Default is "beijing".
+            router: Spread submissions across several regions instead of
+                    using endpoint / region
+            hooks: Receiver of phase timing events; True for a
+                    HistogramCollector
+        """
+        if api_key is None or isinstance(api_key, str):
+            api_key = get_api_key(api_key)
+            if "," in api_key:
+                api_key = [key.strip() for key in api_key.split(",") if key.strip()]
+        if isinstance(api_key, str):
+            self.keys = None
+        else:
+            self.keys = api_key if isinstance(api_key, KeyPool) else KeyPool(api_key)
+            api_key = self.keys.keys[0]
+        self.api_key = api_key
+        self.router = router
+
+        # The endpoint belongs to this client and is passed with every
+        # request, so clients for different regions can share a process
+        if region.lower() == "singapore":
+            self.endpoint = SINGAPORE_ENDPOINT
+        else:
+            self.endpoint = endpoint
+
+        if hooks is True:
+            hooks = HistogramCollector()
+        self.hooks = hooks or None
+
+    def _text_to_image_params(
+        self,
+        prompt: str,
+        model: str,
+        negative_prompt: str,
+        n: int,
+        size: str,
+        seed: Optional[int],
+        prompt_extend: bool,
+        watermark: bool,
+    ) -> dict:
+        """Validate text-to-image arguments and build the API parameters."""
+        # Validate model
+        if model not in T2I_MODELS:
+            raise ValueError(f"Unsupported model: {model}. Supported models: {list(T2I_MODELS.keys())}")
+
+        # Format size
+        size = format_size(size)
+
+        # Validate batch size
+        max_batch = T2I_MODELS[model]["max_batch"]
+        if n < 1 or n > max_batch:
+            raise ValueError(f"n must be between 1 and {max_batch}")
+
+        # Prepare parameters
+        params = {
+            "api_key": self.api_key,
+            "base_address": self.endpoint,
+            "model": model,
+            "prompt": prompt,
+            "negative_prompt": negative_prompt,
+            "n": n,
+            "size": size,
+            "prompt_extend": prompt_extend,
+            "watermark": watermark,
+        }
+
+        if seed is not None:
+            params["seed"] = seed
+
+        return params
+
+    def _image_to_video_params(
+        self,
+        image: str,
+        model: str,
+        prompt: str,
+        negative_prompt: str,
+        audio: Optional[str],
+        resolution: str,
+        duration: int,
+        seed: Optional[int],
+        watermark: bool,
+        use_base64: bool,
+    ) -> dict:
+        """Validate image-to-video arguments and build the API parameters."""
+        # Validate model
+        if model not in I2V_MODELS:
+            raise ValueError(f"Unsupported model: {model}. Supported models: {list(I2V_MODELS.keys())}")
+
+        # Validate resolution
+        supported_resolutions = I2V_MODELS[model]["supported_resolutions"]
+        if resolution not in supported_resolutions:
+            raise ValueError(f"Unsupported resolution: {resolution}. Supported: {supported_resolutions}")
+
+        # Validate duration
+        supported_durations = I2V_MODELS[model]["supported_durations"]
+        if duration not in supported_durations:
+            raise ValueError(f"Unsupported duration: {duration}. Supported: {supported_durations}")
+
+        # Prepare image URL
+        img_url = prepare_image_url(image, use_base64)
+
+        # Prepare parameters
+        params = {
+            "api_key": self.api_key,
+            "base_address": self.endpoint,
+            "model": model,
+            "img_url": img_url,
+            "resolution": resolution,
+            "duration": duration,
+            "watermark": watermark,
+        }
+
+        if prompt:
+            params["prompt"] = prompt
+
+        if negative_prompt:
+            params["negative_prompt"] = negative_prompt
+
+        if audio:
+            params["audio_url"] = prepare_image_url(audio, use_base64)
+
+        if seed is not None:
+            params["seed"] = seed
+
+        return params
+
+    def _text_to_video_params(
+        self,
+        prompt: str,
+        model: str,
+        negative_prompt: str,
+        resolution: str,
+        duration: int,
+        seed: Optional[int],
+        watermark: bool,
+    ) -> dict:
+        """Validate text-to-video arguments and build the API parameters."""
+        # Validate model
+        if model not in T2V_MODELS:
+            raise ValueError(f"Unsupported model: {model}. Supported models: {list(T2V_MODELS.keys())}")
+
+        # Validate resolution
+        supported_resolutions = T2V_MODELS[model]["supported_resolutions"]
+        if resolution not in supported_resolutions:
+            raise ValueError(f"Unsupported resolution: {resolution}. Supported: {supported_resolutions}")
+
+        # Validate duration
+        supported_durations = T2V_MODELS[model]["supported_durations"]
+        if duration not in supported_durations:
+            raise ValueError(f"Unsupported duration: {duration}. Supported: {supported_durations}")
+
+        # Prepare parameters
+        params = {
+            "api_key": self.api_key,
+            "base_address": self.endpoint,
+            "model": model,
+            "prompt": prompt,
+            "resolution": resolution,
+            "duration": duration,
+            "watermark": watermark,
+        }
+
+        if negative_prompt:
+            params["negative_prompt"] = negative_prompt
+
+        if seed is not None:
+            params["seed"] = seed
+
+        return params
+
+    def _route(self, params: dict) -> Tuple[Optional[Region], dict]:
+        """
+        Pick the region for one submission attempt.
+
+        Returns:
+            The region (None without a router) and the parameters to submit
+            there, with the key to use and local inputs uploaded if the SDK
+            cannot do it. A key taken from the key pool is in flight until
+            given to :meth:`_release_key`.
+        """
+        region = None
+        if self.router is not None:
+            region = self.router.choose()
+            params = {**params, "base_address": region.endpoint}
+        if region is not None and region.api_key:
+            params["api_key"] = region.api_key
+        elif self.keys is not None:
+            params = {**params, "api_key": self.keys.acquire()}
+
+        try:
+            if self.uploads is not None:
+                return region, self.uploads.prepare(params)
+            import dashscope
+
+            if params.get("base_address") != dashscope.base_http_api_url:
+                # The SDK uploads file:// inputs through its global endpoint
+                return region, upload_inputs(params)
+        except BaseException:
+            self._release_key(params)
+            raise
+        return region, params
+
+    def _submitted(
+        self,
+        kind: str,
+        params: dict,
+        region: Optional[Region],
+        attempt: int,
+        duration: float,
+        response,
+        failure: Optional[str],
+    ) -> None:
+        """Report a submission attempt to the hooks."""
+        if self.hooks is None:
+            return
+        task_id = response.output.task_id if failure is None else None
+        emit(
+            self.hooks, "submit", duration, kind=kind, model=params["model"], task_id=task_id,
+            request_id=getattr(response, "request_id", None), failure=failure, attempt=attempt,
+            region=region.name if region is not None else None,
+        )
+
+    def _limiter(self, params: dict) -> Optional[ModelLimiter]:
+        """Get the rate limiter of a submission's model (and key, with a key pool)."""
+        if self.rate_limiter is None:
+            return None
+        return self.rate_limiter.for_model(params["model"], params["api_key"] if self.keys is not None else None)
+
+    def _release_key(self, params: dict) -> None:
+        """Stop counting a submission or task against its key of the key pool."""
+        if self.keys is not None:
+            self.keys.release(params["api_key"])
+
+    def _rejected_key(self, params: dict, response) -> bool:
+        """Quarantine a pool key DashScope rejected; True if another key may succeed."""
+        return self.keys is not None and self.keys.reject(params["api_key"], response)
+
+    def _should_normalize(self, image: str, resolution: str) -> bool:
+        """Whether an input image is a local file that normalize_inputs applies to."""
+        return (
+            self.normalize_inputs
+            and resolution in RESOLUTION_SHORT_SIDE
+            and not image.startswith(("data:", "http://", "https://"))
+            and os.path.isfile(image)
+        )
+
+    @staticmethod
+    def _check_response(response, what: str) -> None:
+        """Raise RuntimeError if a DashScope response reports a failure."""
+        if response.status_code != HTTPStatus.OK:
+            raise RuntimeError(
+                f"Failed to generate {what}. Status: {response.status_code}, "
+                f"Code: {response.code}, Message: {response.message}"
+            )
+
+        output = response.output
+        if output is not None and output.task_status in ("FAILED", "CANCELED", "UNKNOWN"):
+            raise RuntimeError(
+                f"Failed to generate {what}. Task status: {output.task_status}, "
+                f"Code: {output.get('code')}, Message: {output.get('message')}"
+            )
+
+    @staticmethod
+    def list_models(model_type: str = "all") -> dict:
+        """
+        List all supported models.
+
+        Args:
+            model_type: Type of models to list ("t2i", "i2v", "t2v", or "all")
+
+        Returns:
+            Dictionary of supported models
+        """
+        if model_type == "t2i":
+            return T2I_MODELS
+        elif model_type == "i2v":
+            return I2V_MODELS
+        elif model_type == "t2v":
+            return T2V_MODELS
+        else:
+            return {
+                "text_to_image": T2I_MODELS,
+                "image_to_video": I2V_MODELS,
+                "text_to_video": T2V_MODELS,
+            }
+
+
+class QwenImg(_BaseClient):
     """
     Simple and elegant client for Alibaba Cloud Qwen Image and Video Generation.
 
@@ -54,7 +403,7 @@ class QwenImg:
         ...     seed=12345
         ... )
 
-        >>> video_url = client.image_to_video(
+        >>> video = client.image_to_video(
         ...     image="cat.png",
         ...     prompt="猫在奔跑",
         ...     duration=10
@@ -63,26 +412,98 @@ class QwenImg:
 
     def __init__(
         self,
-        api_key: Optional[str] = None,
+        api_key: Union[str, Iterable[str], KeyPool, None] = None,
         endpoint: str = BEIJING_ENDPOINT,
         region: str = "beijing",
+        transport: Optional[HttpTransport] = None,
+        download_workers: int = DOWNLOAD_WORKERS,
+        pack_requests: bool = False,
+        pack_window: float = PACK_WINDOW,
+        rate_limiter: Union[bool, RateLimiter, None] = None,
+        cache: Union[bool, str, ResultCache, None] = None,
+        coalesce: bool = False,
+        upload_cache: Union[bool, str, UploadCache, None] = None,
+        normalize_inputs: bool = False,
+        router: Optional[RegionRouter] = None,
+        hooks: Union[bool, Hooks, None] = None,
     ):
         """
         Initialize QwenImg client.
 
         Args:
-            api_key: DashScope API key. If not provided, will try to get from
-                    DASHSCOPE_API_KEY environment variable or .env file.
+            api_key: DashScope API key, or several keys (a list or a KeyPool)
+                    that submissions are spread over. If not provided, will
+                    try to get from DASHSCOPE_API_KEY environment variable or
+                    .env file (several keys may be comma-separated).
             endpoint: API endpoint URL. Default is Beijing endpoint.
             region: Region ("beijing" or "singapore"). Default is "beijing".
+            transport: HTTP transport used for downloads. Defaults to a pooled
+                    keep-alive transport shared by all clients in the process.
+            download_workers: Number of result files downloaded in parallel
+            pack_requests: Merge concurrent text-to-image requests that share
+                    all parameters and have no fixed seed into one API call
+                    with n up to the model's max_batch
+            pack_window: Seconds a packable request waits for companions
+            rate_limiter: Keep submissions under each model's QPS and
+                    concurrent task quota. True uses the limiter shared by all
+                    clients in the process; a RateLimiter instance can be
+                    shared between specific clients.
+            cache: Serve reproducible requests (fixed seed, and for images
+                    prompt_extend=False) from an on-disk result cache. True
+                    uses the default directory, a string a custom directory.
+                    With a cache, video results also carry the path of the
+                    cached file. Cache hits keep the URL DashScope first
+                    returned, which may have expired by then.
+            coalesce: Let identical requests made while one of them is still
+                    running share its task and download. Each caller still
+                    gets its own result objects and saved files.
+            upload_cache: Upload each local image / audio input once and reuse
+                    the uploaded URL until it expires, instead of letting the
+                    SDK upload the file on every call. True uses the default
+                    index file, a string a custom path.
+            normalize_inputs: Shrink local image-to-video input images to the
+                    requested resolution and re-encode them as compact JPEGs
+                    without metadata before they are uploaded
+            router: Send each submission to the DashScope region with the
+                    best recent latency and error rate, see
+                    :class:`RegionRouter`. Overrides endpoint / region.
+            hooks: Report the timing of each submission, status check, task,
+                    download and decode to a :class:`Hooks` object. True
+                    collects per-phase latency histograms in a
+                    :class:`HistogramCollector`, available as ``client.hooks``.
         """
-        self.api_key = get_api_key(api_key)
+        super().__init__(api_key=api_key, endpoint=endpoint, region=region, router=router, hooks=hooks)
+        self.uploads = _upload_cache(upload_cache)
+        self.normalize_inputs = normalize_inputs
+        self.transport = transport or get_default_transport()
+        self._download_pool = ThreadPoolExecutor(
+            max_workers=download_workers, thread_name_prefix="qwenimg-download"
+        )
+        if rate_limiter is True:
+            rate_limiter = get_rate_limiter()
+        self.rate_limiter = rate_limiter or None
+        if cache is True:
+            cache = ResultCache()
+        elif isinstance(cache, str):
+            cache = ResultCache(cache)
+        self.cache = cache or None
+        self._singleflight = SingleFlight() if coalesce else None
+        self._packer = None
+        if pack_requests:
+            self._packer = RequestPacker(
+                lambda params: self._submit("text_to_image", params, lambda r: r),
+                window=pack_window,
+            )
 
-        # Set endpoint based on region
-        if region.lower() == "singapore":
-            dashscope.base_http_api_url = SINGAPORE_ENDPOINT
-        else:
-            dashscope.base_http_api_url = endpoint
+    def close(self) -> None:
+        """Stop the download workers. Downloads already started still finish."""
+        self._download_pool.shutdown(wait=False)
+
+    def __enter__(self) -> "QwenImg":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
     def text_to_image(
         self,
@@ -97,7 +518,10 @@ class QwenImg:
         save: bool = True,
         output_dir: str = DEFAULT_OUTPUT_DIR,
         return_pil: bool = True,
-    ) -> Union[Image.Image, List[Image.Image], List[str]]:
+        return_results: bool = False,
+        progress: Optional[Callable[[TaskProgress], None]] = None,
+        timeout: Optional[float] = None,
+    ) -> Union[Image.Image, List[Image.Image], List[str], ImageResult, List[ImageResult]]:
         """
         Generate images from text prompt.
 
@@ -113,8 +537,18 @@ class QwenImg:
             save: Whether to save images to disk
             output_dir: Directory to save images
             return_pil: Whether to return PIL.Image objects (True) or file paths (False)
+            return_results: Return :class:`ImageResult` objects instead, which
+                    carry the URL, saved path, byte size, seed and timings and
+                    only decode the image when ``.image`` is accessed
+            progress: Called with a :class:`TaskProgress` once the task is
+                    submitted and whenever DashScope reports a new state
+                    (PENDING, RUNNING, SUCCEEDED, ...) or image count
+            timeout: Seconds the task may take after it is submitted; a task
+                    still running then is canceled and TimeoutError raised.
+                    None waits for as long as DashScope takes
 
         Returns:
+            If return_results=True: ImageResult if n=1, otherwise a list of them
             If n=1 and return_pil=True: Single PIL.Image object
             If n>1 and return_pil=True: List of PIL.Image objects
             If return_pil=False: List of saved file paths
@@ -124,69 +558,299 @@ class QwenImg:
             >>> image = client.text_to_image("一只可爱的猫")
             >>> images = client.text_to_image("美丽的风景", n=4)
         """
-        # Validate model
-        if model not in T2I_MODELS:
-            raise ValueError(f"Unsupported model: {model}. Supported models: {list(T2I_MODELS.keys())}")
+        return self.submit_text_to_image(
+            prompt, model, negative_prompt, n, size, seed, prompt_extend,
+            watermark, save, output_dir, return_pil, return_results, progress, timeout,
+        ).wait()
 
-        # Format size
-        size = format_size(size)
+    def submit_text_to_image(
+        self,
+        prompt: str,
+        model: str = DEFAULT_T2I_MODEL,
+        negative_prompt: str = "",
+        n: int = 1,
+        size: str = DEFAULT_SIZE,
+        seed: Optional[int] = None,
+        prompt_extend: bool = True,
+        watermark: bool = False,
+        save: bool = True,
+        output_dir: str = DEFAULT_OUTPUT_DIR,
+        return_pil: bool = True,
+        return_results: bool = False,
+        progress: Optional[Callable[[TaskProgress], None]] = None,
+        timeout: Optional[float] = None,
+    ) -> TaskHandle:
+        """
+        Submit a text-to-image task without waiting for it to finish.
 
-        # Validate batch size
-        max_batch = T2I_MODELS[model]["max_batch"]
-        if n < 1 or n > max_batch:
-            raise ValueError(f"n must be between 1 and {max_batch}")
+        Takes the same arguments as :meth:`text_to_image`. The handle's
+        ``wait()`` / ``result()`` return what text_to_image would have returned.
 
-        # Prepare parameters
-        params = {
-            "api_key": self.api_key,
-            "model": model,
-            "prompt": prompt,
-            "negative_prompt": negative_prompt,
-            "n": n,
-            "size": size,
-            "prompt_extend": prompt_extend,
-            "watermark": watermark,
-        }
+        Examples:
+            >>> handles = [client.submit_text_to_image(p) for p in prompts]
+            >>> for handle in client.poll_many(handles):
+            ...     image = handle.result()
+        """
+        params = self._text_to_image_params(
+            prompt, model, negative_prompt, n, size, seed, prompt_extend, watermark
+        )
+        finish = partial(
+            self._collect_images, n=n, save=save, output_dir=output_dir,
+            return_pil=return_pil, return_results=return_results, seed=seed, model=model,
+        )
 
-        if seed is not None:
-            params["seed"] = seed
+        key = self._cache_key("text_to_image", params)
+        if key is not None:
+            cached = self.cache.get_entry(key)
+            if cached is not None:
+                handle = completed_handle("text_to_image", params, partial(finish, cached=cached))
+                return self._watch(handle, progress, timeout)
+            finish = partial(finish, cache_key=key)
 
-        # Call API
-        response = ImageSynthesis.call(**params)
+        if self._singleflight is not None:
+            share = partial(
+                self._share_images, n=n, save=save, output_dir=output_dir,
+                return_pil=return_pil, return_results=return_results, model=model,
+            )
+            handle = self._submit_shared_images(params, key, share)
+        elif self._packer is not None and pack_key(params) is not None:
+            handle = self._packer.add(params, lambda offset: partial(finish, start=offset))
+        else:
+            handle = self._submit("text_to_image", params, finish)
+        return self._watch(handle, progress, timeout)
 
-        if response.status_code != HTTPStatus.OK:
-            raise RuntimeError(
-                f"Failed to generate image. Status: {response.status_code}, "
-                f"Code: {response.code}, Message: {response.message}"
+    @staticmethod
+    def _watch(
+        handle: TaskHandle,
+        progress: Optional[Callable[[TaskProgress], None]],
+        timeout: Optional[float] = None,
+    ) -> TaskHandle:
+        handle.set_timeout(timeout)
+        if progress is not None:
+            handle.add_progress_callback(progress)
+        return handle
+
+    def _collect_images(
+        self,
+        response,
+        n: int,
+        save: bool,
+        output_dir: str,
+        return_pil: bool,
+        return_results: bool = False,
+        seed: Optional[int] = None,
+        start: int = 0,
+        cache_key: Optional[str] = None,
+        cached: Optional[List[Tuple[str, Optional[str]]]] = None,
+        model: Optional[str] = None,
+    ) -> Union[Image.Image, List[Image.Image], List[str], ImageResult, List[ImageResult]]:
+        """Download the images of a finished text-to-image task.
+
+        ``start`` selects the caller's slice of the results when the task
+        was shared by packed requests.
+        """
+        wanted = save or return_pil or return_results
+
+        # Nothing to fetch if the caller wants neither the files nor the
+        # images, unless they are going into the cache
+        if not (wanted or cache_key):
+            self._check_response(response, "image")
+            return []
+
+        # Download all images concurrently, then restore the API's order
+        downloaded = sorted(
+            self._iter_images(response, save, output_dir, start, n, cache_key, cached, seed, model),
+            key=lambda r: r.index,
+        )
+        if not wanted:
+            return []
+        return self._image_output(downloaded, n, return_pil, return_results, model)
+
+    def _image_output(
+        self,
+        images: List[ImageResult],
+        n: int,
+        return_pil: bool,
+        return_results: bool = False,
+        model: Optional[str] = None,
+    ):
+        """Turn downloaded images into what text_to_image returns."""
+        if return_results:
+            return images[0] if n == 1 else images
+
+        if not return_pil:
+            return [r.path for r in images]
+
+        results = [r.image for r in images]
+        for r in images:
+            emit(
+                self.hooks, "decode", r.timings["decode"], kind="text_to_image",
+                model=model, url=r.url, nbytes=r.nbytes,
             )
+        return results[0] if n == 1 else results
 
-        # Process results
-        results = []
-        saved_paths = []
+    def _submit_shared_images(self, params: dict, key: Optional[str], share) -> TaskHandle:
+        """Submit a text-to-image request that identical in-flight requests join."""
+        def submit():
+            fetch = partial(self._fetch_images, cache_key=key, seed=params.get("seed"), model=params["model"])
+            return self._submit("text_to_image", params, fetch)
 
-        for result in response.output.results:
-            image_url = result.url
+        return self._singleflight.do(request_key("text_to_image", params), submit, share)
 
-            # Download image
-            image_data = requests.get(image_url).content
+    def _fetch_images(
+        self,
+        response,
+        cache_key: Optional[str] = None,
+        seed: Optional[int] = None,
+        model: Optional[str] = None,
+    ) -> List[ImageResult]:
+        """Download all images of a shared task without saving them."""
+        images = self._iter_images(response, False, None, cache_key=cache_key, seed=seed, model=model)
+        return sorted(images, key=lambda r: r.index)
 
-            # Convert to PIL Image
-            if return_pil:
-                pil_image = Image.open(BytesIO(image_data))
-                results.append(pil_image)
+    def _own_images(self, images: List[ImageResult], save: bool, output_dir: str) -> List[ImageResult]:
+        """Give one caller of a shared request its own result objects and files."""
+        return [
+            ImageResult(
+                r.url, r.data, save_image(r.data, r.url, output_dir) if save else None,
+                r.index, r.seed, dict(r.timings),
+            )
+            for r in images
+        ]
 
-            # Save to disk
-            if save:
-                saved_path = download_image(image_url, output_dir)
-                saved_paths.append(saved_path)
-                if not return_pil:
-                    results.append(saved_path)
+    def _share_images(
+        self,
+        images: List[ImageResult],
+        n: int,
+        save: bool,
+        output_dir: str,
+        return_pil: bool,
+        return_results: bool = False,
+        model: Optional[str] = None,
+    ):
+        if not (save or return_pil or return_results):
+            return []
+        return self._image_output(self._own_images(images, save, output_dir), n, return_pil, return_results, model)
 
-        # Return results
-        if return_pil:
-            return results[0] if n == 1 else results
-        else:
-            return results
+    def iter_text_to_image(
+        self,
+        prompt: str,
+        model: str = DEFAULT_T2I_MODEL,
+        negative_prompt: str = "",
+        n: int = 1,
+        size: str = DEFAULT_SIZE,
+        seed: Optional[int] = None,
+        prompt_extend: bool = True,
+        watermark: bool = False,
+        save: bool = True,
+        output_dir: str = DEFAULT_OUTPUT_DIR,
+        progress: Optional[Callable[[TaskProgress], None]] = None,
+        timeout: Optional[float] = None,
+    ) -> Iterator[ImageResult]:
+        """
+        Generate images from text prompt and yield each one as soon as it is downloaded.
+
+        Takes the same arguments as :meth:`text_to_image`, except that images
+        are always returned as :class:`ImageResult` objects whose PIL image is
+        opened lazily.
+
+        Yields:
+            ImageResult objects in download completion order; ``result.index``
+            is the image's position in the task's results
+
+        Examples:
+            >>> for result in client.iter_text_to_image("美丽的风景", n=4):
+            ...     print(result.path, len(result.data))
+        """
+        params = self._text_to_image_params(
+            prompt, model, negative_prompt, n, size, seed, prompt_extend, watermark
+        )
+        key = self._cache_key("text_to_image", params)
+        cached = None if key is None else self.cache.get_entry(key)
+
+        if cached is None and self._singleflight is not None:
+            handle = self._submit_shared_images(params, key, lambda images: images)
+            images = self._watch(handle, progress, timeout).wait()
+            yield from self._own_images(images, save, output_dir)
+            return
+
+        response = None
+        if cached is None:
+            handle = self._submit("text_to_image", params, lambda r: r)
+            response = self._watch(handle, progress, timeout).wait()
+        yield from self._iter_images(
+            response, save, output_dir, cache_key=key, cached=cached, seed=seed, model=model
+        )
+
+    def _iter_images(
+        self,
+        response,
+        save: bool,
+        output_dir: str,
+        start: int = 0,
+        n: Optional[int] = None,
+        cache_key: Optional[str] = None,
+        cached: Optional[List[Tuple[str, Optional[str]]]] = None,
+        seed: Optional[int] = None,
+        model: Optional[str] = None,
+    ) -> Iterator[ImageResult]:
+        """
+        Yield the images of a finished task, or of a cache hit, as they become available.
+
+        With ``cache_key`` the downloaded images are stored in the cache once
+        all of them have been yielded.
+        """
+        if cached is not None:
+            for index, (path, url) in enumerate(cached):
+                data = Path(path).read_bytes()
+                # Cached files are stored as "<index>_<original file name>"
+                name = os.path.basename(path).split("_", 1)[1]
+                saved_path = save_image(data, name, output_dir) if save else None
+                # Entries cached without their URL give the cached file instead
+                yield ImageResult(url or path, data, saved_path, index, seed)
+            return
+
+        self._check_response(response, "image")
+        results = response.output.results[start:] if n is None else response.output.results[start:start + n]
+        image_urls = [result.url for result in results]
+        timings = task_timings(response)
+
+        downloaded = []
+        for result in self._download_images(image_urls, save, output_dir):
+            emit(
+                self.hooks, "download", result.timings["download"], kind="text_to_image", model=model,
+                task_id=response.output.task_id, request_id=response.request_id,
+                url=result.url, nbytes=result.nbytes,
+            )
+            result.seed = seed
+            result.timings.update(timings)
+            if cache_key is not None:
+                downloaded.append(result)
+            yield result
+
+        if cache_key is None:
+            return
+        downloaded.sort(key=lambda r: r.index)
+        self.cache.put(
+            cache_key, [(filename_from_url(r.url), r.data) for r in downloaded], [r.url for r in downloaded]
+        )
+
+    def _download_image(self, index: int, image_url: str, save: bool, output_dir: str) -> ImageResult:
+        # Download image once; the same bytes feed the file and the PIL image
+        started = time.monotonic()
+        image_data = fetch_bytes(image_url, self.transport)
+        download_time = time.monotonic() - started
+        saved_path = save_image(image_data, image_url, output_dir) if save else None
+        return ImageResult(image_url, image_data, saved_path, index, timings={"download": download_time})
+
+    def _download_images(self, image_urls: List[str], save: bool, output_dir: str) -> Iterator[ImageResult]:
+        """Download images on the bounded download pool, yielding them as they complete."""
+        futures = [
+            self._download_pool.submit(self._download_image, index, url, save, output_dir)
+            for index, url in enumerate(image_urls)
+        ]
+        for future in as_completed(futures):
+            yield future.result()
 
     def image_to_video(
         self,
@@ -200,7 +864,9 @@ class QwenImg:
         seed: Optional[int] = None,
         watermark: bool = False,
         use_base64: bool = False,
-    ) -> str:
+        progress: Optional[Callable[[TaskProgress], None]] = None,
+        timeout: Optional[float] = None,
+    ) -> VideoResult:
         """
         Generate video from image.
 
@@ -215,64 +881,53 @@ class QwenImg:
             seed: Random seed for reproducibility
             watermark: Whether to add watermark
             use_base64: Whether to encode local images as base64
+            progress: Called with a :class:`TaskProgress` once the task is
+                    submitted and whenever DashScope reports a new state
+            timeout: Seconds the task may take after it is submitted; a task
+                    still running then is canceled and TimeoutError raised
 
         Returns:
-            URL of the generated video
+            VideoResult with the video URL (and local path if the client has a cache)
 
         Examples:
             >>> client = QwenImg()
-            >>> video_url = client.image_to_video("cat.png", prompt="猫在奔跑")
-            >>> video_url = client.image_to_video("cat.png", duration=10, resolution="1080P")
+            >>> video = client.image_to_video("cat.png", prompt="猫在奔跑")
+            >>> video = client.image_to_video("cat.png", duration=10, resolution="1080P")
         """
-        # Validate model
-        if model not in I2V_MODELS:
-            raise ValueError(f"Unsupported model: {model}. Supported models: {list(I2V_MODELS.keys())}")
+        return self.submit_image_to_video(
+            image, model, prompt, negative_prompt, audio,
+            resolution, duration, seed, watermark, use_base64, progress, timeout,
+        ).wait()
 
-        # Validate resolution
-        supported_resolutions = I2V_MODELS[model]["supported_resolutions"]
-        if resolution not in supported_resolutions:
-            raise ValueError(f"Unsupported resolution: {resolution}. Supported: {supported_resolutions}")
-
-        # Validate duration
-        supported_durations = I2V_MODELS[model]["supported_durations"]
-        if duration not in supported_durations:
-            raise ValueError(f"Unsupported duration: {duration}. Supported: {supported_durations}")
-
-        # Prepare image URL
-        img_url = prepare_image_url(image, use_base64)
-
-        # Prepare parameters
-        params = {
-            "api_key": self.api_key,
-            "model": model,
-            "img_url": img_url,
-            "resolution": resolution,
-            "duration": duration,
-            "watermark": watermark,
-        }
-
-        if prompt:
-            params["prompt"] = prompt
-
-        if negative_prompt:
-            params["negative_prompt"] = negative_prompt
-
-        if audio:
-            params["audio_url"] = prepare_image_url(audio, use_base64)
-
-        if seed is not None:
-            params["seed"] = seed
-
-        # Call API
-        response = VideoSynthesis.call(**params)
-
-        if response.status_code != HTTPStatus.OK:
-            raise RuntimeError(
-                f"Failed to generate video. Status: {response.status_code}, "
-                f"Code: {response.code}, Message: {response.message}"
-            )
+    def submit_image_to_video(
+        self,
+        image: str,
+        model: str = DEFAULT_I2V_MODEL,
+        prompt: str = "",
+        negative_prompt: str = "",
+        audio: Optional[str] = None,
+        resolution: str = DEFAULT_RESOLUTION,
+        duration: int = DEFAULT_DURATION,
+        seed: Optional[int] = None,
+        watermark: bool = False,
+        use_base64: bool = False,
+        progress: Optional[Callable[[TaskProgress], None]] = None,
+        timeout: Optional[float] = None,
+    ) -> TaskHandle:
+        """
+        Submit an image-to-video task without waiting for it to finish.
 
-        return response.output.video_url
+        Takes the same arguments as :meth:`image_to_video`. The handle's
+        ``wait()`` / ``result()`` return a :class:`VideoResult`.
+        """
+        # Normalized inline: the submission needs the result before it can go out
+        if self._should_normalize(image, resolution):
+            image = normalize_image(image, resolution)
+        params = self._image_to_video_params(
+            image, model, prompt, negative_prompt, audio,
+            resolution, duration, seed, watermark, use_base64,
+        )
+        return self._watch(self._submit_video("image_to_video", params), progress, timeout)
 
     def text_to_video(
         self,
@@ -283,7 +938,9 @@ class QwenImg:
         duration: int = DEFAULT_DURATION,
         seed: Optional[int] = None,
         watermark: bool = False,
-    ) -> str:
+        progress: Optional[Callable[[TaskProgress], None]] = None,
+        timeout: Optional[float] = None,
+    ) -> VideoResult:
         """
         Generate video from text prompt.
 
@@ -295,76 +952,364 @@ class QwenImg:
             duration: Video duration in seconds (5 or 10)
             seed: Random seed for reproducibility
             watermark: Whether to add watermark
+            progress: Called with a :class:`TaskProgress` once the task is
+                    submitted and whenever DashScope reports a new state
+            timeout: Seconds the task may take after it is submitted; a task
+                    still running then is canceled and TimeoutError raised
 
         Returns:
-            URL of the generated video
+            VideoResult with the video URL (and local path if the client has a cache)
 
         Examples:
             >>> client = QwenImg()
-            >>> video_url = client.text_to_video("一只猫在草地上奔跑")
-            >>> video_url = client.text_to_video("美丽的日落", duration=10, resolution="1080P")
+            >>> video = client.text_to_video("一只猫在草地上奔跑")
+            >>> video = client.text_to_video("美丽的日落", duration=10, resolution="1080P")
         """
-        # Validate model
-        if model not in T2V_MODELS:
-            raise ValueError(f"Unsupported model: {model}. Supported models: {list(T2V_MODELS.keys())}")
+        return self.submit_text_to_video(
+            prompt, model, negative_prompt, resolution, duration, seed, watermark, progress, timeout
+        ).wait()
 
-        # Validate resolution
-        supported_resolutions = T2V_MODELS[model]["supported_resolutions"]
-        if resolution not in supported_resolutions:
-            raise ValueError(f"Unsupported resolution: {resolution}. Supported: {supported_resolutions}")
+    def submit_text_to_video(
+        self,
+        prompt: str,
+        model: str = DEFAULT_T2V_MODEL,
+        negative_prompt: str = "",
+        resolution: str = DEFAULT_RESOLUTION,
+        duration: int = DEFAULT_DURATION,
+        seed: Optional[int] = None,
+        watermark: bool = False,
+        progress: Optional[Callable[[TaskProgress], None]] = None,
+        timeout: Optional[float] = None,
+    ) -> TaskHandle:
+        """
+        Submit a text-to-video task without waiting for it to finish.
 
-        # Validate duration
-        supported_durations = T2V_MODELS[model]["supported_durations"]
-        if duration not in supported_durations:
-            raise ValueError(f"Unsupported duration: {duration}. Supported: {supported_durations}")
+        Takes the same arguments as :meth:`text_to_video`. The handle's
+        ``wait()`` / ``result()`` return a :class:`VideoResult`.
+        """
+        params = self._text_to_video_params(
+            prompt, model, negative_prompt, resolution, duration, seed, watermark
+        )
+        return self._watch(self._submit_video("text_to_video", params), progress, timeout)
+
+    def resume_task(
+        self,
+        kind: str,
+        task_id: str,
+        api_key: Optional[str] = None,
+        base_address: Optional[str] = None,
+        **kwargs,
+    ) -> TaskHandle:
+        """
+        Get a handle to a task submitted earlier, possibly by another process.
+
+        Nothing is submitted; the handle polls the existing task, and its
+        ``wait()`` / ``result()`` return what the ``submit_<kind>`` method
+        called with ``kwargs`` would have returned.
+
+        Args:
+            kind: Task kind ("text_to_image", "image_to_video" or "text_to_video")
+            task_id: Remote DashScope task id
+            api_key: API key the task was submitted with, default the client's
+            base_address: Endpoint the task was submitted to, default the client's
+            **kwargs: Arguments of the original ``submit_<kind>`` call; only
+                    those that shape the result (model, n, seed, resolution,
+                    duration, save, output_dir, return_pil, ...) and
+                    ``progress`` / ``timeout`` are used
+
+        Examples:
+            >>> handle = client.submit_text_to_video("一只猫在草地上奔跑")
+            >>> task_id = handle.task_id   # saved somewhere; the process exits
+            >>> video = client.resume_task("text_to_video", task_id).wait()
+        """
+        if kind not in ("text_to_image", "image_to_video", "text_to_video"):
+            raise ValueError(f"Unknown task kind: {kind}")
+        arguments = inspect.signature(getattr(self, f"submit_{kind}")).bind_partial(**kwargs)
+        arguments.apply_defaults()
+        args = arguments.arguments
 
-        # Prepare parameters
         params = {
-            "api_key": self.api_key,
-            "model": model,
-            "prompt": prompt,
-            "resolution": resolution,
-            "duration": duration,
-            "watermark": watermark,
+            "api_key": api_key or self.api_key,
+            "base_address": base_address or self.endpoint,
+            "model": args["model"],
         }
+        if kind == "text_to_image":
+            finish = partial(
+                self._collect_images, n=args["n"], save=args["save"], output_dir=args["output_dir"],
+                return_pil=args["return_pil"], return_results=args["return_results"],
+                seed=args["seed"], model=args["model"],
+            )
+        else:
+            params.update(resolution=args["resolution"], duration=args["duration"])
+            finish = partial(self._video_result, seed=args["seed"], model=args["model"])
+        handle = TaskHandle(task_api(kind), kind, task_id, params, finish, self.hooks)
+        return self._watch(handle, args["progress"], args["timeout"])
 
-        if negative_prompt:
-            params["negative_prompt"] = negative_prompt
+    def download_video(
+        self, video: Union[str, VideoResult], filepath: str, segments: int = DOWNLOAD_SEGMENTS
+    ) -> str:
+        """
+        Download a generated video, fetching byte ranges in parallel.
 
-        if seed is not None:
-            params["seed"] = seed
+        Progress is kept in ``<filepath>.part`` while downloading; calling
+        again after a failure resumes where the previous attempt stopped. The
+        finished file is checked against the size reported by the server.
+        A VideoResult whose file is already on disk, such as a result cache
+        hit, is copied instead, as its URL may have expired.
+
+        Args:
+            video: VideoResult returned by image_to_video / text_to_video, or
+                   the video URL; a VideoResult's path is set to filepath
+            filepath: Destination file path
+            segments: Number of byte ranges fetched in parallel
 
-        # Call API
-        response = VideoSynthesis.call(**params)
+        Returns:
+            Path to saved video
 
-        if response.status_code != HTTPStatus.OK:
-            raise RuntimeError(
-                f"Failed to generate video. Status: {response.status_code}, "
-                f"Code: {response.code}, Message: {response.message}"
-            )
+        Examples:
+            >>> video = client.text_to_video("一只猫在草地上奔跑")
+            >>> client.download_video(video, "outputs/cat.mp4", segments=8)
+        """
+        url = video.url if isinstance(video, VideoResult) else video
+        started = time.monotonic()
+        if isinstance(video, VideoResult) and video.path and os.path.exists(video.path):
+            Path(filepath).parent.mkdir(parents=True, exist_ok=True)
+            path = shutil.copyfile(video.path, filepath)
+        else:
+            path = download_file(url, filepath, segments, self.transport)
+        download_time = time.monotonic() - started
+        if isinstance(video, VideoResult):
+            video.path = path
+            video.timings["download"] = download_time
+        emit(
+            self.hooks, "download", download_time, url=url, nbytes=os.path.getsize(path),
+            model=video.model if isinstance(video, VideoResult) else None,
+            task_id=video.task_id if isinstance(video, VideoResult) else None,
+        )
+        return path
+
+    def _submit_video(self, kind: str, params: dict) -> TaskHandle:
+        """Submit a video task, or serve it from the cache."""
+        seed, model = params.get("seed"), params["model"]
+        key = self._cache_key(kind, params)
+        finish = partial(self._video_result, seed=seed, model=model)
+        if key is not None:
+            cached = self.cache.get_entry(key)
+            if cached is not None:
+                (path, url), = cached
+                return completed_handle(kind, params, lambda _: VideoResult(url, path, seed=seed, model=model))
+            finish = partial(self._cache_video, cache_key=key, seed=seed, model=model)
+
+        submit = partial(self._submit, kind, params, finish)
+        if self._singleflight is not None:
+            return self._singleflight.do(request_key(kind, params), submit, VideoResult.copy)
+        return submit()
 
-        return response.output.video_url
+    def _video_result(self, response, seed: Optional[int] = None, model: Optional[str] = None) -> VideoResult:
+        """Build the result of a finished video task."""
+        self._check_response(response, "video")
+        return VideoResult(
+            response.output.video_url, task_id=response.output.task_id,
+            seed=seed, timings=task_timings(response), model=model,
+        )
+
+    def _cache_video(
+        self, response, cache_key: str, seed: Optional[int] = None, model: Optional[str] = None
+    ) -> VideoResult:
+        """Download the video of a finished task into the cache."""
+        video = self._video_result(response, seed, model)
+        self.download_video(video, self.cache.temp_path())
+        video.path = self.cache.put_files(
+            cache_key, [(filename_from_url(video.url), video.path)], [video.url]
+        )[0]
+        return video
+
+    def _cache_key(self, kind: str, params: dict) -> Optional[str]:
+        """Cache key of a request, None if caching is off or the request is not reproducible."""
+        return None if self.cache is None else cache_key(kind, params)
+
+    def _submit(self, kind: str, params: dict, finish) -> TaskHandle:
+        """
+        Create a DashScope task and return a handle to it.
+
+        Throttled and transient failures are retried with jittered backoff;
+        with a rate limiter, throttling also shrinks the model's window. With
+        a key pool, a rejected key is quarantined and the next attempt uses
+        another key.
+        """
+        api = task_api(kind)
+        what = "image" if kind == "text_to_image" else "video"
+
+        attempt = 0
+        while True:
+            region, routed = self._route(params)
+            limiter = self._limiter(routed)
+            if limiter is not None:
+                limiter.acquire()
+            failure = None
+            started = time.monotonic()
+            try:
+                response = api.async_call(**routed)
+                failure = classify_response(response)
+                self._submitted(kind, routed, region, attempt, time.monotonic() - started, response, failure)
+                if region is not None:
+                    self.router.record(region, time.monotonic() - started, failure)
+                if failure is not None and self._rejected_key(routed, response):
+                    failure = TRANSIENT
+                if failure is None or failure == PERMANENT or attempt >= SUBMIT_MAX_RETRIES:
+                    self._check_response(response, what)
+                    break
+            except OSError:
+                # Connection errors (requests exceptions are OSErrors)
+                self._submitted(kind, routed, region, attempt, time.monotonic() - started, None, TRANSIENT)
+                if region is not None:
+                    self.router.record(region, time.monotonic() - started, TRANSIENT)
+                if limiter is not None:
+                    limiter.release()
+                self._release_key(routed)
+                if attempt >= SUBMIT_MAX_RETRIES:
+                    raise
+            except BaseException:
+                if limiter is not None:
+                    limiter.release(throttled=failure == THROTTLED)
+                self._release_key(routed)
+                raise
+            else:
+                if limiter is not None:
+                    limiter.release(throttled=failure == THROTTLED)
+                self._release_key(routed)
+
+            time.sleep(backoff_delay(attempt))
+            attempt += 1
+
+        handle = TaskHandle(api, kind, response.output.task_id, routed, finish, self.hooks)
+        if limiter is not None:
+            limiter.track(handle)
+        if self.keys is not None:
+            handle.add_done_callback(lambda _handle: self._release_key(routed))
+        return handle
+
+    def batch_text_to_image(
+        self,
+        prompts: Iterable[Union[str, dict]],
+        max_concurrency: int = BATCH_MAX_CONCURRENCY,
+        ordered: bool = False,
+        **kwargs,
+    ) -> Iterator[BatchResult]:
+        """
+        Generate images for many prompts with bounded concurrency.
+
+        Args:
+            prompts: Prompt strings, or dicts of :meth:`text_to_image` arguments.
+                    Consumed lazily, so generators of any size are fine.
+            max_concurrency: Maximum number of tasks in flight at once
+            ordered: Yield results in input order (True) or as they finish (False)
+            **kwargs: Arguments for :meth:`text_to_image` shared by all items;
+                    values in a dict item override them
+
+        Yields:
+            BatchResult per item; ``result`` is what text_to_image would have
+            returned and ``error`` holds the exception of a failed item
+
+        Examples:
+            >>> prompts = ["一只猫", "一只狗", {"prompt": "一只兔子", "n": 2}]
+            >>> for item in client.batch_text_to_image(prompts, return_pil=False):
+            ...     print(item.index, item.result if item.ok else item.error)
+        """
+        return run_batch(
+            lambda item: self.submit_text_to_image(**item_kwargs(item, "prompt", kwargs)),
+            prompts, max_concurrency, ordered,
+        )
+
+    def batch_image_to_video(
+        self,
+        images: Iterable[Union[str, dict]],
+        max_concurrency: int = BATCH_MAX_CONCURRENCY,
+        ordered: bool = False,
+        **kwargs,
+    ) -> Iterator[BatchResult]:
+        """
+        Generate videos for many images with bounded concurrency.
+
+        Args:
+            images: Image paths/URLs, or dicts of :meth:`image_to_video` arguments
+            max_concurrency: Maximum number of tasks in flight at once
+            ordered: Yield results in input order (True) or as they finish (False)
+            **kwargs: Arguments for :meth:`image_to_video` shared by all items
+
+        Yields:
+            BatchResult per item whose ``result`` is the video URL
+        """
+        return run_batch(
+            lambda item: self.submit_image_to_video(**item_kwargs(item, "image", kwargs)),
+            images, max_concurrency, ordered,
+        )
+
+    def batch_text_to_video(
+        self,
+        prompts: Iterable[Union[str, dict]],
+        max_concurrency: int = BATCH_MAX_CONCURRENCY,
+        ordered: bool = False,
+        **kwargs,
+    ) -> Iterator[BatchResult]:
+        """
+        Generate videos for many prompts with bounded concurrency.
+
+        Args:
+            prompts: Prompt strings, or dicts of :meth:`text_to_video` arguments
+            max_concurrency: Maximum number of tasks in flight at once
+            ordered: Yield results in input order (True) or as they finish (False)
+            **kwargs: Arguments for :meth:`text_to_video` shared by all items
+
+        Yields:
+            BatchResult per item whose ``result`` is the video URL
+        """
+        return run_batch(
+            lambda item: self.submit_text_to_video(**item_kwargs(item, "prompt", kwargs)),
+            prompts, max_concurrency, ordered,
+        )
 
     @staticmethod
-    def list_models(model_type: str = "all") -> dict:
+    def poll_many(handles: Iterable[TaskHandle], timeout: Optional[float] = None) -> Iterator[TaskHandle]:
         """
-        List all supported models.
+        Wait for many submitted tasks from one thread, yielding each as it finishes.
 
         Args:
-            model_type: Type of models to list ("t2i", "i2v", "t2v", or "all")
+            handles: Handles returned by the submit_* methods
+            timeout: Maximum seconds to wait for all handles, None to wait forever
+
+        Yields:
+            Handles in completion order; call ``handle.result()`` on each
+
+        Examples:
+            >>> handles = [client.submit_text_to_video(p) for p in prompts]
+            >>> for handle in client.poll_many(handles):
+            ...     print(handle.task_id, handle.result())
+        """
+        return poll_many(handles, timeout=timeout)
+
+    @staticmethod
+    def wait(
+        handles: Union[TaskHandle, Iterable[TaskHandle]],
+        timeout: Optional[float] = None,
+    ) -> Union[Any, List[Any]]:
+        """
+        Block until submitted tasks finish and return their results.
+
+        Args:
+            handles: A single handle or an iterable of handles
+            timeout: Maximum seconds to wait, None to wait forever
 
         Returns:
-            Dictionary of supported models
+            The result of a single handle, or a list of results in input order
+
+        Raises:
+            TimeoutError: If some tasks are still running when timeout expires
         """
-        if model_type == "t2i":
-            return T2I_MODELS
-        elif model_type == "i2v":
-            return I2V_MODELS
-        elif model_type == "t2v":
-            return T2V_MODELS
-        else:
-            return {
-                "text_to_image": T2I_MODELS,
-                "image_to_video": I2V_MODELS,
-                "text_to_video": T2V_MODELS,
-            }
+        if isinstance(handles, TaskHandle):
+            return handles.wait(timeout=timeout)
+
+        handles = list(handles)
+        for _ in poll_many(handles, timeout=timeout):
+            pass
+        return [handle.result() for handle in handles]
@@ -12,11 +12,15 @@ T2I_MODELS = {
         "name": "万相2.5文生图预览版",
         "supported_sizes": ["1024*1024", "720*1280", "1280*720"],
         "max_batch": 4,
+        "qps": 5,
+        "max_concurrent_tasks": 5,
     },
     "wanx-v1": {
         "name": "通义万相V1",
         "supported_sizes": ["1024*1024", "720*1280", "1280*720"],
         "max_batch": 4,
+        "qps": 5,
+        "max_concurrent_tasks": 5,
     },
 }
 
@@ -25,6 +29,8 @@ I2V_MODELS = {
         "name": "万相2.5图生视频预览版",
         "supported_resolutions": ["480P", "720P", "1080P"],
         "supported_durations": [5, 10],
+        "qps": 5,
+        "max_concurrent_tasks": 5,
     },
 }
 
@@ -33,9 +39,16 @@ T2V_MODELS = {
         "name": "万相2.5文生视频预览版",
         "supported_resolutions": ["480P", "720P", "1080P"],
         "supported_durations": [5, 10],
+        "qps": 5,
+        "max_concurrent_tasks": 5,
     },
 }
 
+# Quota used by the client-side rate limiter for models without their own
+# "qps" / "max_concurrent_tasks" entries above
+DEFAULT_QPS = 5
+DEFAULT_MAX_CONCURRENT_TASKS = 5
+
 # Default parameters
 DEFAULT_T2I_MODEL = "wan2.5-t2i-preview"
 DEFAULT_I2V_MODEL = "wan2.5-i2v-preview"
@@ -45,3 +58,94 @@ DEFAULT_SIZE = "1024*1024"
 DEFAULT_RESOLUTION = "1080P"
 DEFAULT_DURATION = 10
 DEFAULT_OUTPUT_DIR = "./outputs"
+
+# Task status polling intervals in seconds. The interval grows by
+# POLL_BACKOFF after every check until it reaches the max interval.
+IMAGE_POLL_INTERVAL = 1.0
+IMAGE_MAX_POLL_INTERVAL = 5.0
+
+# Videos take minutes, so polling starts slower and scales with the amount
+# of work: the base interval below is per 5 seconds of video.
+VIDEO_POLL_INTERVAL = {
+    "480P": 3.0,
+    "720P": 5.0,
+    "1080P": 8.0,
+}
+VIDEO_MAX_POLL_INTERVAL = 30.0
+
+POLL_BACKOFF = 1.5
+
+# Consecutive status checks that may fail with network errors before a
+# task is given up on; a single dropped connection keeps polling
+POLL_MAX_FAILURES = 10
+
+# HTTP transport used to download results
+HTTP_POOL_SIZE = 20
+HTTP_CONNECT_TIMEOUT = 10.0
+HTTP_READ_TIMEOUT = 60.0
+HTTP_MAX_RETRIES = 3
+HTTP_RETRY_BACKOFF = 0.5
+HTTP_RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# Number of result files a client downloads in parallel
+DOWNLOAD_WORKERS = 4
+
+# Videos are downloaded as this many byte ranges in parallel
+DOWNLOAD_SEGMENTS = 4
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+# Seconds between writes of a segmented download's resume state
+DOWNLOAD_STATE_INTERVAL = 1.0
+
+# Local inputs: bytes read per base64 chunk (a multiple of 3), and the total
+# size of encoded data URIs kept for reuse. Keeping data URIs is opt-in
+# (utils.set_data_uri_cache_size); content hashes are always remembered
+BASE64_CHUNK_SIZE = 3 * 256 * 1024
+PREPARED_INPUT_CACHE_BYTES = 0
+FILE_DIGEST_CACHE_BYTES = 1024 * 1024
+
+# Opt-in normalization of image-to-video inputs: output encoding, the colour
+# transparent pixels are flattened onto, and how many images the async
+# client normalizes at once
+NORMALIZE_FORMAT = "JPEG"
+NORMALIZE_QUALITY = 90
+NORMALIZE_BACKGROUND = (255, 255, 255)
+NORMALIZE_WORKERS = 2
+
+# Default number of tasks a batch keeps in flight
+BATCH_MAX_CONCURRENCY = 4
+
+# How long (seconds) a text-to-image request waits for compatible requests
+# to be packed into the same call when request packing is enabled
+PACK_WINDOW = 0.05
+
+# Retries of throttled or transiently failed task submissions; the delay
+# before retry k is drawn uniformly from [0, min(backoff * 2**k, max backoff)]
+SUBMIT_MAX_RETRIES = 5
+SUBMIT_RETRY_BACKOFF = 1.0
+SUBMIT_MAX_RETRY_BACKOFF = 30.0
+
+# Adaptive concurrency (AIMD) of the rate limiter: the concurrent task window
+# grows by 1 per window of accepted submissions and is multiplied by this
+# factor when DashScope throttles, at most once per cooldown period
+AIMD_DECREASE_FACTOR = 0.5
+AIMD_DECREASE_COOLDOWN = 1.0
+
+# On-disk cache of reproducible results (QwenImg(cache=True))
+CACHE_DIR = "~/.cache/qwenimg"
+CACHE_MAX_BYTES = 5 * 1024 ** 3
+CACHE_MAX_AGE = 30 * 24 * 3600
+
+# Region routing: weight of the newest submission in the latency / error rate
+# averages, how much a 100% error rate inflates a region's score, how fast
+# errors are forgotten (seconds), and how long a throttling region is skipped
+ROUTER_EWMA_ALPHA = 0.3
+ROUTER_ERROR_PENALTY = 10.0
+ROUTER_ERROR_HALF_LIFE = 60.0
+ROUTER_THROTTLE_COOLDOWN = 10.0
+
+# Seconds an API key of a KeyPool is skipped after DashScope rejected it
+KEY_QUARANTINE = 300.0
+
+# Seconds an uploaded local input is reused for; DashScope deletes temporary
+# uploads after 48 hours, and a task may queue for a while after submission
+UPLOAD_URL_TTL = 46 * 3600
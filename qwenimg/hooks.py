@@ -0,0 +1,263 @@
+"""
+Instrumentation hooks for the phases of a generation.
+
+A generation is a submission request, a wait in DashScope's queue, the
+generation itself, status checks, file downloads and, for PIL results, image
+decoding. A client given ``hooks=`` reports each phase to the matching method
+of a :class:`Hooks` object as a :class:`HookEvent`, so slow requests can be
+attributed to a phase without patching the client.
+
+:class:`HistogramCollector` is an in-process collector that keeps a latency
+histogram per phase and model and reports percentiles from it.
+"""
+
+import math
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+# Event phases and the hook each is reported to
+PHASE_HOOKS = {
+    "submit": "on_submit",
+    "status": "on_status",
+    "result": "on_result",
+    "download": "on_download",
+    "decode": "on_download",
+}
+
+# Histogram buckets grow by this factor (about 5% relative error) from the
+# smallest recorded value up
+HISTOGRAM_GROWTH = 1.1
+HISTOGRAM_MIN_VALUE = 1e-4
+
+
+class HookEvent:
+    """
+    One measured phase of a generation.
+
+    Attributes:
+        phase: "submit", "status", "result", "download" or "decode"
+        time: time.monotonic() when the phase ended
+        duration: Seconds the phase took; for "result" the seconds since
+                  the task was submitted
+        kind: Task kind ("text_to_image", ...), None if not known
+        model: Model of the task, None if not known
+        task_id: DashScope task id, None before the task exists
+        request_id: DashScope request id of the response, if any
+        status: Task status reported by DashScope ("status", "result")
+        failure: classify_response() of a failed response, or "transient"
+                 for a connection error
+        attempt: Submission attempt, counting from 0 ("submit")
+        region: Name of the region the request went to, with a router
+        url: URL of the downloaded file ("download", "decode")
+        nbytes: Bytes downloaded ("download", "decode")
+        timings: Seconds the task "queued" and spent in "generation" on
+                 DashScope, where reported ("result")
+    """
+
+    __slots__ = (
+        "phase", "time", "duration", "kind", "model", "task_id", "request_id",
+        "status", "failure", "attempt", "region", "url", "nbytes", "timings",
+    )
+
+    def __init__(
+        self,
+        phase: str,
+        duration: float,
+        kind: Optional[str] = None,
+        model: Optional[str] = None,
+        task_id: Optional[str] = None,
+        request_id: Optional[str] = None,
+        status: Optional[str] = None,
+        failure: Optional[str] = None,
+        attempt: Optional[int] = None,
+        region: Optional[str] = None,
+        url: Optional[str] = None,
+        nbytes: Optional[int] = None,
+        timings: Optional[Dict[str, float]] = None,
+    ):
+        self.phase = phase
+        self.time = time.monotonic()
+        self.duration = duration
+        self.kind = kind
+        self.model = model
+        self.task_id = task_id
+        self.request_id = request_id
+        self.status = status
+        self.failure = failure
+        self.attempt = attempt
+        self.region = region
+        self.url = url
+        self.nbytes = nbytes
+        self.timings = timings if timings is not None else {}
+
+    def __repr__(self) -> str:
+        return f"HookEvent({self.phase!r}, model={self.model!r}, duration={self.duration:.3f})"
+
+
+class Hooks:
+    """
+    Receiver of client instrumentation events; override the methods you need.
+
+    Hooks are called synchronously on the thread (or event loop) doing the
+    work, so they should return quickly and hand anything slow to a queue.
+
+    Examples:
+        >>> class PrintHooks(Hooks):
+        ...     def on_download(self, event):
+        ...         print(event.model, event.nbytes, event.duration)
+        >>> client = QwenImg(hooks=PrintHooks())
+    """
+
+    def on_submit(self, event: HookEvent) -> None:
+        """A task submission request returned (every attempt)."""
+
+    def on_status(self, event: HookEvent) -> None:
+        """A status check of a task returned."""
+
+    def on_result(self, event: HookEvent) -> None:
+        """A task reached a final state."""
+
+    def on_download(self, event: HookEvent) -> None:
+        """A result file was downloaded ("download") or decoded into a PIL image ("decode")."""
+
+
+def emit(hooks: Optional[Hooks], phase: str, duration: float, **fields) -> None:
+    """Report a phase to the hooks, if there are any."""
+    if hooks is not None:
+        getattr(hooks, PHASE_HOOKS[phase])(HookEvent(phase, duration, **fields))
+
+
+class Histogram:
+    """Log-bucketed histogram of positive values, such as latencies in seconds."""
+
+    __slots__ = ("count", "total", "min", "max", "_buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+        self._buckets: Dict[int, int] = {}
+
+    def add(self, value: float) -> None:
+        index = 0
+        if value > HISTOGRAM_MIN_VALUE:
+            index = math.ceil(math.log(value / HISTOGRAM_MIN_VALUE, HISTOGRAM_GROWTH))
+        self._buckets[index] = self._buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: "Histogram") -> None:
+        for index, count in other._buckets.items():
+            self._buckets[index] = self._buckets.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Get the value below which a fraction q (0-1) of the values fall.
+
+        Returns:
+            The geometric middle of the bucket holding that value, None if empty
+        """
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if seen >= rank:
+                middle = HISTOGRAM_MIN_VALUE * HISTOGRAM_GROWTH ** (index - 0.5)
+                return min(max(middle, self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+
+class HistogramCollector(Hooks):
+    """
+    Hooks that keep a latency histogram per metric and model.
+
+    Metrics are "submit" and "status" (request latency), "queued",
+    "generation" and "total" (per finished task), "download" and "decode"
+    (per file).
+
+    Examples:
+        >>> client = QwenImg(hooks=True)
+        >>> client.text_to_image("一只可爱的猫")
+        >>> client.hooks.percentile("queued", 0.99, model="wan2.5-t2i-preview")
+        >>> client.hooks.summary()["download"]
+        {'wan2.5-t2i-preview': {'count': 1, 'mean': 0.41, 'p50': 0.41, 'p90': 0.41, 'p99': 0.41, 'max': 0.41}}
+    """
+
+    def __init__(self):
+        self._histograms: Dict[Tuple[str, Optional[str]], Histogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, metric: str, model: Optional[str], seconds: float) -> None:
+        """Record one measurement."""
+        with self._lock:
+            histogram = self._histograms.get((metric, model))
+            if histogram is None:
+                histogram = self._histograms[(metric, model)] = Histogram()
+            histogram.add(seconds)
+
+    def on_submit(self, event: HookEvent) -> None:
+        self.observe("submit", event.model, event.duration)
+
+    def on_status(self, event: HookEvent) -> None:
+        self.observe("status", event.model, event.duration)
+
+    def on_result(self, event: HookEvent) -> None:
+        self.observe("total", event.model, event.duration)
+        for metric, seconds in event.timings.items():
+            self.observe(metric, event.model, seconds)
+
+    def on_download(self, event: HookEvent) -> None:
+        self.observe(event.phase, event.model, event.duration)
+
+    def histogram(self, metric: str, model: Optional[str] = None) -> Histogram:
+        """Get a copy of the histogram of a metric, for one model or all of them."""
+        merged = Histogram()
+        with self._lock:
+            for (name, name_model), histogram in self._histograms.items():
+                if name == metric and (model is None or name_model == model):
+                    merged.merge(histogram)
+        return merged
+
+    def percentile(self, metric: str, q: float, model: Optional[str] = None) -> Optional[float]:
+        """Get a percentile (q in 0-1) of a metric in seconds, None without measurements."""
+        return self.histogram(metric, model).percentile(q)
+
+    def summary(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Get count, mean, p50, p90, p99 and max of every metric, per model."""
+        snapshot = []
+        with self._lock:
+            for key, histogram in self._histograms.items():
+                copy = Histogram()
+                copy.merge(histogram)
+                snapshot.append((key, copy))
+
+        summary: Dict[str, Dict[str, Dict[str, float]]] = {}
+        for (metric, model), histogram in sorted(snapshot, key=lambda item: (item[0][0], item[0][1] or "")):
+            summary.setdefault(metric, {})[model or "unknown"] = {
+                "count": histogram.count,
+                "mean": histogram.mean,
+                "p50": histogram.percentile(0.5),
+                "p90": histogram.percentile(0.9),
+                "p99": histogram.percentile(0.99),
+                "max": histogram.max,
+            }
+        return summary
+
+    def reset(self) -> None:
+        """Forget all measurements."""
+        with self._lock:
+            self._histograms.clear()
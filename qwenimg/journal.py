@@ -0,0 +1,186 @@
+"""
+SQLite journal of batch jobs and their remote tasks.
+
+Each job of a job file is recorded as soon as DashScope accepts its task, with
+the task id, endpoint and a fingerprint of the API key used, and again when it
+finishes. A run that is interrupted can therefore be started again: finished
+jobs are skipped and tasks that were already submitted are polled again
+instead of being generated (and paid for) a second time.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+# Job states recorded in the journal; a job that is not recorded is pending
+SUBMITTED = "submitted"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+def job_spec(kind: str, kwargs: dict) -> str:
+    """Canonical JSON of a job, to notice a job file that changed between runs."""
+    return json.dumps({"kind": kind, **kwargs}, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+
+
+class JournalEntry:
+    """Recorded state of one job."""
+
+    __slots__ = ("job_id", "kind", "spec", "status", "task_id", "base_address", "key", "outputs", "error", "attempts")
+
+    def __init__(
+        self,
+        job_id: str,
+        kind: str,
+        spec: str,
+        status: str,
+        task_id: Optional[str],
+        base_address: Optional[str],
+        key: Optional[str],
+        outputs: Optional[str],
+        error: Optional[str],
+        attempts: int,
+    ):
+        self.job_id = job_id
+        self.kind = kind
+        self.spec = spec
+        self.status = status
+        self.task_id = task_id
+        self.base_address = base_address
+        self.key = key
+        self.outputs: List[str] = json.loads(outputs) if outputs else []
+        self.error = error
+        self.attempts = attempts
+
+    def __repr__(self) -> str:
+        return f"JournalEntry({self.job_id!r}, status={self.status!r}, task_id={self.task_id!r})"
+
+
+class Journal:
+    """
+    Durable record of the jobs of a batch run.
+
+    Examples:
+        >>> journal = Journal("prompts.jsonl.journal.sqlite3")
+        >>> journal.submitted("42", "text_to_image", spec, handle.task_id, handle.base_address, fingerprint)
+        >>> journal.finished("42", ["outputs/42.png"])
+        >>> journal.get("42").status
+        'succeeded'
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: SQLite database file, created if missing
+        """
+        self.path = Path(path).expanduser()
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as db:
+            # Every state change is committed on its own; WAL keeps that cheap
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " job_id TEXT PRIMARY KEY,"
+                " kind TEXT NOT NULL,"
+                " spec TEXT NOT NULL,"
+                " status TEXT NOT NULL,"
+                " task_id TEXT,"
+                " base_address TEXT,"
+                " key TEXT,"
+                " outputs TEXT,"
+                " error TEXT,"
+                " attempts INTEGER NOT NULL DEFAULT 0,"
+                " updated_at REAL NOT NULL)"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        db = sqlite3.connect(str(self.path), timeout=30)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def get(self, job_id: str) -> Optional[JournalEntry]:
+        """Get the recorded state of a job, None if it was never submitted."""
+        with self._lock, self._connect() as db:
+            row = db.execute(
+                "SELECT job_id, kind, spec, status, task_id, base_address, key, outputs, error, attempts"
+                " FROM jobs WHERE job_id = ?",
+                (job_id,),
+            ).fetchone()
+        return JournalEntry(*row) if row else None
+
+    def submitted(
+        self,
+        job_id: str,
+        kind: str,
+        spec: str,
+        task_id: Optional[str],
+        base_address: Optional[str],
+        key: Optional[str],
+    ) -> None:
+        """
+        Record that a job's task was accepted by DashScope.
+
+        Args:
+            job_id: Id of the job in the job file
+            kind: Task kind
+            spec: :func:`job_spec` of the job
+            task_id: Remote task id, None for a result served locally
+            base_address: Endpoint the task was submitted to
+            key: Fingerprint of the API key the task was submitted with
+        """
+        with self._lock, self._connect() as db:
+            db.execute(
+                "INSERT INTO jobs (job_id, kind, spec, status, task_id, base_address, key, attempts, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?)"
+                " ON CONFLICT (job_id) DO UPDATE SET"
+                " kind = excluded.kind, spec = excluded.spec, status = excluded.status,"
+                " task_id = excluded.task_id, base_address = excluded.base_address, key = excluded.key,"
+                " outputs = NULL, error = NULL, attempts = attempts + 1, updated_at = excluded.updated_at",
+                (job_id, kind, spec, SUBMITTED, task_id, base_address, key, time.time()),
+            )
+
+    def finished(self, job_id: str, outputs: List[str]) -> None:
+        """Record that a job succeeded, with the paths or URLs of its results."""
+        with self._lock, self._connect() as db:
+            db.execute(
+                "UPDATE jobs SET status = ?, outputs = ?, error = NULL, updated_at = ? WHERE job_id = ?",
+                (SUCCEEDED, json.dumps(outputs, ensure_ascii=False), time.time(), job_id),
+            )
+
+    def failed(self, job_id: str, kind: str, spec: str, error: str) -> None:
+        """Record that a job failed, whether or not its task was ever submitted."""
+        with self._lock, self._connect() as db:
+            db.execute(
+                "INSERT INTO jobs (job_id, kind, spec, status, error, updated_at) VALUES (?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (job_id) DO UPDATE SET status = excluded.status, error = excluded.error,"
+                " updated_at = excluded.updated_at",
+                (job_id, kind, spec, FAILED, error, time.time()),
+            )
+
+    def counts(self) -> Dict[str, int]:
+        """Get the number of jobs in each state."""
+        with self._lock, self._connect() as db:
+            return dict(db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+    def entries(self, status: Optional[str] = None) -> Iterator[JournalEntry]:
+        """Iterate over the recorded jobs, optionally only those in one state."""
+        query = (
+            "SELECT job_id, kind, spec, status, task_id, base_address, key, outputs, error, attempts FROM jobs"
+        )
+        with self._lock, self._connect() as db:
+            if status is None:
+                rows = db.execute(query + " ORDER BY updated_at").fetchall()
+            else:
+                rows = db.execute(query + " WHERE status = ? ORDER BY updated_at", (status,)).fetchall()
+        for row in rows:
+            yield JournalEntry(*row)
@@ -0,0 +1,117 @@
+"""
+Pools of DashScope API keys.
+
+Rate and concurrency quotas are per account, so one key caps a client's
+throughput no matter how much work is queued. :class:`KeyPool` spreads task
+submissions over several keys, sending each one to the key with the fewest
+tasks in flight, and sets a key aside for a while when DashScope rejects it
+(invalid key, unpaid account, exhausted quota).
+"""
+
+import hashlib
+import threading
+import time
+from typing import Dict, Iterable, List
+
+from .config import KEY_QUARANTINE
+
+# Error codes that say the key or its account cannot be used right now
+KEY_ERROR_CODES = ("InvalidApiKey", "Arrearage", "AccessDenied.Unpurchased")
+KEY_ERROR_CODE_PREFIXES = ("AllocationQuota", "Throttling.AllocationQuota")
+
+
+def is_key_error(response) -> bool:
+    """Whether a DashScope response rejects the API key rather than the request."""
+    code = response.code or ""
+    return response.status_code == 401 or code in KEY_ERROR_CODES or code.startswith(KEY_ERROR_CODE_PREFIXES)
+
+
+def mask_key(api_key: str) -> str:
+    """Shorten an API key to something safe to log."""
+    return f"{api_key[:6]}...{api_key[-4:]}" if len(api_key) > 12 else "***"
+
+
+def key_fingerprint(api_key: str) -> str:
+    """Identify an API key in stored records without storing the key itself."""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+class KeyPool:
+    """
+    API keys of several accounts, balanced by tasks in flight.
+
+    Examples:
+        >>> client = QwenImg(api_key=["sk-aaa...", "sk-bbb...", "sk-ccc..."])
+        >>> client = QwenImg(api_key=KeyPool(keys, quarantine=600))
+    """
+
+    def __init__(self, keys: Iterable[str], quarantine: float = KEY_QUARANTINE):
+        """
+        Args:
+            keys: API keys, one per account
+            quarantine: Seconds a rejected key is skipped for
+        """
+        self.keys: List[str] = list(dict.fromkeys(keys))
+        if not self.keys:
+            raise ValueError("KeyPool needs at least one API key")
+        self.quarantine = quarantine
+        self._in_flight: Dict[str, int] = {key: 0 for key in self.keys}
+        self._quarantined_until: Dict[str, float] = {key: float("-inf") for key in self.keys}
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def acquire(self) -> str:
+        """
+        Pick the key for a submission and count it as in flight.
+
+        The key with the fewest tasks in flight wins; ties rotate. If every key
+        is quarantined, the one that comes out of quarantine first is used.
+        """
+        now = time.monotonic()
+        with self._lock:
+            # Rotate the starting point so equally loaded keys take turns
+            order = self.keys[self._next:] + self.keys[:self._next]
+            self._next = (self._next + 1) % len(self.keys)
+
+            healthy = [key for key in order if self._quarantined_until[key] <= now]
+            if healthy:
+                key = min(healthy, key=self._in_flight.__getitem__)
+            else:
+                key = min(order, key=self._quarantined_until.__getitem__)
+            self._in_flight[key] += 1
+            return key
+
+    def release(self, key: str) -> None:
+        """Stop counting a submission or task of the key as in flight."""
+        with self._lock:
+            if self._in_flight.get(key, 0) > 0:
+                self._in_flight[key] -= 1
+
+    def reject(self, key: str, response) -> bool:
+        """
+        Quarantine the key if the response rejects it.
+
+        Returns:
+            True if the key was quarantined, so the request may succeed with
+            another key
+        """
+        if key not in self._quarantined_until or not is_key_error(response):
+            return False
+        with self._lock:
+            self._quarantined_until[key] = time.monotonic() + self.quarantine
+        return len(self.keys) > 1
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Get tasks in flight and remaining quarantine seconds per key, by position and masked key."""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                f"#{index} {mask_key(key)}": {
+                    "in_flight": self._in_flight[key],
+                    "quarantined_for": max(0.0, self._quarantined_until[key] - now),
+                }
+                for index, key in enumerate(self.keys)
+            }
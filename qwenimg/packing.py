@@ -0,0 +1,212 @@
+"""
+Packing of small text-to-image requests into shared DashScope calls.
+
+A text-to-image call can return up to ``max_batch`` images. Requests with the
+same generation parameters and no fixed seed are interchangeable, so instead
+of one call per request they are collected for a short window and submitted
+as a single call with the summed ``n``. Every caller still gets its own handle
+and only downloads its own slice of the results.
+"""
+
+import threading
+import time
+from concurrent.futures import CancelledError
+from typing import Callable, Dict, Optional, Tuple
+
+from .config import PACK_WINDOW, T2I_MODELS
+from .tasks import TaskHandle
+
+# Parameters that must match for requests to share a call
+PACK_KEY_PARAMS = ("api_key", "base_address", "model", "prompt", "negative_prompt", "size", "prompt_extend", "watermark")
+
+
+def pack_key(params: dict) -> Optional[Tuple]:
+    """
+    Get the key under which a text-to-image request can be packed.
+
+    Args:
+        params: Text-to-image API parameters
+
+    Returns:
+        Hashable key, or None if the request must not be packed
+    """
+    # A fixed seed asks for specific images, which a shared call cannot give
+    if params.get("seed") is not None:
+        return None
+    return tuple(params.get(name) for name in PACK_KEY_PARAMS)
+
+
+class _PackGroup:
+    """Requests collected for one shared call."""
+
+    def __init__(self, params: dict, capacity: int, deadline: float):
+        self.params = params
+        self.capacity = capacity
+        self.deadline = deadline
+        self.total = 0
+        # Requests in the call, and how many of them were canceled
+        self.callers = 0
+        self.canceled = 0
+        self.handle: Optional[TaskHandle] = None
+        self.error: Optional[BaseException] = None
+        self.lock = threading.Lock()
+
+    def reserve(self, n: int) -> Optional[int]:
+        """Reserve n images in the call; returns the offset, or None if they don't fit."""
+        if self.handle is not None or self.error is not None or self.total + n > self.capacity:
+            return None
+        offset = self.total
+        self.total += n
+        self.callers += 1
+        return offset
+
+
+class PackedTaskHandle(TaskHandle):
+    """
+    Handle to one caller's share of a packed text-to-image call.
+
+    Until the shared call is submitted the status is "QUEUED" and ``task_id``
+    is None. Afterwards the handle mirrors the shared task, and its result
+    only contains the images reserved for this caller.
+    """
+
+    def __init__(
+        self,
+        packer: "RequestPacker",
+        group: _PackGroup,
+        params: dict,
+        finish: Callable,
+    ):
+        # The API class and task id are taken from the shared task once submitted
+        super().__init__(None, "text_to_image", None, params, finish)
+        self.status = "QUEUED"
+        self.next_poll_at = group.deadline
+        self._packer = packer
+        self._group = group
+
+    def _refresh(self) -> str:
+        if self.done:
+            return self.status
+
+        try:
+            shared = self._packer.flush(self._group)
+        except Exception as e:
+            self._error = e
+            return self.status
+
+        with self._group.lock:
+            # Only the first slice due for a check actually polls the task
+            if not shared.done and shared.next_poll_at <= time.monotonic():
+                shared.refresh()
+
+        self.api = shared.api
+        self.task_id = shared.task_id
+        self.response = shared.response
+        self._error = shared._error
+        self.next_poll_at = shared.next_poll_at
+        # The shared task's image counts cover other callers' images too
+        self.started_at = shared.started_at
+        self.status = shared.status
+        return self.status
+
+    def _cancel_remote(self, pending: bool) -> bool:
+        group = self._group
+        with self._packer._lock:
+            group.canceled += 1
+            if group.canceled < group.callers:
+                # The other callers' images are still wanted
+                return False
+            key = pack_key(group.params)
+            if self._packer._groups.get(key) is group:
+                del self._packer._groups[key]
+
+        with group.lock:
+            if group.handle is None and group.error is None:
+                # Nobody wants the call any more, so it is never submitted
+                group.error = CancelledError("Every request of the packed call was canceled")
+                return True
+            handle = group.handle
+        return handle is not None and handle.cancel()
+
+
+class RequestPacker:
+    """
+    Collects compatible text-to-image requests and submits them together.
+
+    Args:
+        submit: Submits API parameters and returns the handle of the shared task
+        window: Seconds a request waits for companions before being submitted
+    """
+
+    def __init__(self, submit: Callable[[dict], TaskHandle], window: float = PACK_WINDOW):
+        self.submit = submit
+        self.window = window
+        self._groups: Dict[Tuple, _PackGroup] = {}
+        self._lock = threading.Lock()
+
+    def add(self, params: dict, make_finish: Callable[[int], Callable]) -> PackedTaskHandle:
+        """
+        Add a packable request.
+
+        Args:
+            params: Text-to-image API parameters; pack_key(params) must not be None
+            make_finish: Given the request's offset in the shared results,
+                         returns the function that builds its result
+
+        Returns:
+            Handle for the caller's images
+        """
+        key = pack_key(params)
+        n = params["n"]
+        ready = []
+
+        with self._lock:
+            group = self._groups.get(key)
+            offset = group.reserve(n) if group is not None else None
+
+            if offset is None:
+                # No open group, or this request does not fit: start a new one
+                if group is not None:
+                    ready.append(group)
+                capacity = T2I_MODELS[params["model"]]["max_batch"]
+                group = _PackGroup(params, capacity, time.monotonic() + self.window)
+                self._groups[key] = group
+                offset = group.reserve(n)
+
+            handle = PackedTaskHandle(self, group, params, make_finish(offset))
+            if group.total >= group.capacity:
+                del self._groups[key]
+                ready.append(group)
+
+        # Groups that cannot take more requests are submitted right away
+        for group in ready:
+            try:
+                self.flush(group)
+            except Exception:
+                pass  # stored on the group and reported through its handles
+        return handle
+
+    def flush(self, group: _PackGroup) -> TaskHandle:
+        """
+        Submit a group if it has not been submitted yet.
+
+        Returns:
+            Handle of the shared task
+
+        Raises:
+            Exception: Whatever submitting the shared call raised
+        """
+        with group.lock:
+            if group.handle is None and group.error is None:
+                with self._lock:
+                    key = pack_key(group.params)
+                    if self._groups.get(key) is group:
+                        del self._groups[key]
+                try:
+                    group.handle = self.submit({**group.params, "n": group.total})
+                except Exception as e:
+                    group.error = e
+
+            if group.error is not None:
+                raise group.error
+            return group.handle
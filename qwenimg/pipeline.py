@@ -0,0 +1,242 @@
+"""
+Pipelined multi-stage generation.
+
+A :class:`Pipeline` is a small DAG of generation stages run over a stream of
+input items: typically a text-to-image stage whose images each feed one or
+more image-to-video stages. All stages share one window of tasks in flight,
+so while the videos of item k generate, the image of item k+1 is already
+being generated, and the branches of a fan-out run side by side.
+
+Images are handed to the next stage by their remote result URL, which
+DashScope accepts as video input directly, so nothing is read back from disk
+or uploaded again between stages.
+"""
+
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .batch import item_kwargs
+from .config import BATCH_MAX_CONCURRENCY
+from .tasks import TaskHandle, TaskPoller
+
+# Kinds a stage may have, and the kind of stage each may follow
+ROOT_KINDS = ("text_to_image", "text_to_video")
+CHILD_KINDS = {"image_to_video": "text_to_image"}
+
+
+class Stage:
+    """
+    One generation step of a pipeline.
+
+    Keyword arguments are passed to the client's ``submit_<kind>`` method. A
+    callable value is called with the input item, for arguments that differ
+    per item.
+    """
+
+    def __init__(self, name: str, kind: str, after: Optional[str] = None, **kwargs):
+        """
+        Args:
+            name: Name of the stage, reported with its results
+            kind: "text_to_image" or "text_to_video" for a first stage,
+                  "image_to_video" for a stage after a text-to-image stage
+            after: Name of the stage whose images this stage animates
+            **kwargs: Arguments of the submit method
+        """
+        self.name = name
+        self.kind = kind
+        self.after = after
+        self.kwargs = kwargs
+        self.children: List["Stage"] = []
+
+    def __repr__(self) -> str:
+        return f"Stage({self.name!r}, {self.kind!r}, after={self.after!r})"
+
+    def arguments(self, item: Any) -> Dict[str, Any]:
+        """Get the submit arguments of this stage for one input item."""
+        return {name: value(item) if callable(value) else value for name, value in self.kwargs.items()}
+
+
+class PipelineResult:
+    """
+    Outcome of one stage for one input item (and, after a fan-out, one image).
+
+    Examples:
+        >>> for r in pipeline.run(prompts):
+        ...     print(r.index, r.stage, r.result if r.ok else r.error)
+    """
+
+    def __init__(
+        self,
+        index: int,
+        request: Any,
+        stage: str,
+        result: Any = None,
+        error: Optional[BaseException] = None,
+        task_id: Optional[str] = None,
+        source: Optional[str] = None,
+    ):
+        """
+        Args:
+            index: Position of the input item
+            request: The input item
+            stage: Name of the stage
+            result: What the stage's client method would have returned
+            error: Exception of a failed stage, or of a stage skipped
+                   because the stage before it failed
+            task_id: Remote DashScope task id, None if nothing was submitted
+            source: URL of the image this stage started from, None for a
+                    first stage
+        """
+        self.index = index
+        self.request = request
+        self.stage = stage
+        self.result = result
+        self.error = error
+        self.task_id = task_id
+        self.source = source
+
+    @property
+    def ok(self) -> bool:
+        """Whether the stage succeeded."""
+        return self.error is None
+
+    def __repr__(self) -> str:
+        state = "ok" if self.ok else f"error={self.error!r}"
+        return f"PipelineResult(index={self.index}, stage={self.stage!r}, task_id={self.task_id!r}, {state})"
+
+
+class Pipeline:
+    """
+    Stages of generation run over many input items with overlapping tasks.
+
+    Examples:
+        >>> pipeline = Pipeline(client, max_concurrency=8)
+        >>> pipeline.add("image", "text_to_image", size="1024*1024", output_dir="outputs/workflow")
+        >>> pipeline.add("calm", "image_to_video", after="image", prompt="云雾缓缓流动", resolution="1080P")
+        >>> pipeline.add("turn", "image_to_video", after="image", prompt="角色缓缓转身", duration=5)
+        >>> for r in pipeline.run(["古风男子，站在山间平台上", "仙鹤在湖面起舞"]):
+        ...     print(r.index, r.stage, r.result if r.ok else r.error)
+    """
+
+    def __init__(self, client, max_concurrency: int = BATCH_MAX_CONCURRENCY):
+        """
+        Args:
+            client: QwenImg client the tasks are submitted with
+            max_concurrency: Maximum number of tasks in flight, over all stages
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.client = client
+        self.max_concurrency = max_concurrency
+        self.stages: Dict[str, Stage] = {}
+
+    def add(self, name: str, kind: str, after: Optional[str] = None, **kwargs) -> Stage:
+        """
+        Add a stage; see :class:`Stage` for the arguments.
+
+        A stage can only follow a stage added before it, so the stages
+        always form a DAG.
+
+        Raises:
+            ValueError: If the name is taken or the stage cannot follow ``after``
+        """
+        if name in self.stages:
+            raise ValueError(f"Stage {name!r} already exists")
+        if after is None:
+            if kind not in ROOT_KINDS:
+                raise ValueError(f"A first stage must be one of {ROOT_KINDS}, got {kind!r}")
+        else:
+            parent = self.stages.get(after)
+            if parent is None:
+                raise ValueError(f"Unknown stage {after!r}; add it before the stages that follow it")
+            if CHILD_KINDS.get(kind) != parent.kind:
+                raise ValueError(f"A {kind} stage cannot follow a {parent.kind} stage")
+
+        stage = self.stages[name] = Stage(name, kind, after, **kwargs)
+        if after is not None:
+            self.stages[after].children.append(stage)
+        return stage
+
+    def _submit(self, stage: Stage, item: Any, source: Optional[str]) -> TaskHandle:
+        kwargs = stage.arguments(item)
+        if stage.after is None:
+            kwargs = item_kwargs(item, "prompt", kwargs)
+        else:
+            kwargs["image"] = source
+        if stage.kind == "text_to_image":
+            # Results carry their URL, which is what the next stages start from
+            kwargs["return_results"] = True
+        return getattr(self.client, f"submit_{stage.kind}")(**kwargs)
+
+    def _skipped(self, stage: Stage, index: int, item: Any, failed: str) -> Iterator[PipelineResult]:
+        for child in stage.children:
+            error = RuntimeError(f"Skipped because stage {failed!r} failed")
+            yield PipelineResult(index, item, child.name, error=error)
+            yield from self._skipped(child, index, item, failed)
+
+    def run(self, items: Iterable[Any]) -> Iterator[PipelineResult]:
+        """
+        Run every stage for every item.
+
+        Args:
+            items: Prompts, or dicts of arguments for the first stages.
+                   Consumed lazily, so generators of any size are fine.
+
+        Yields:
+            PipelineResult per stage and item (per image for stages after a
+            text-to-image stage with n > 1), as each finishes. Stages after a
+            failed stage are yielded as failed without being run.
+        """
+        roots = [stage for stage in self.stages.values() if stage.after is None]
+        if not roots:
+            raise ValueError("The pipeline has no stages")
+
+        items = iter(items)
+        poller = TaskPoller()
+        # Follow-up tasks ready to be submitted: (stage, index, item, source URL)
+        ready: Deque[Tuple[Stage, int, Any, Optional[str]]] = deque()
+        pending: Dict[int, Tuple[Stage, int, Any, Optional[str]]] = {}
+        next_index = 0
+        exhausted = False
+
+        while True:
+            # Tasks of items already started go first, so items finish in
+            # roughly the order they came in and the backlog stays bounded
+            while len(poller) < self.max_concurrency and (ready or not exhausted):
+                if ready:
+                    work = [ready.popleft()]
+                else:
+                    try:
+                        item = next(items)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    work = [(stage, next_index, item, None) for stage in roots]
+                    next_index += 1
+
+                for stage, index, item, source in work:
+                    try:
+                        handle = self._submit(stage, item, source)
+                    except Exception as e:
+                        yield PipelineResult(index, item, stage.name, error=e, source=source)
+                        yield from self._skipped(stage, index, item, stage.name)
+                        continue
+                    pending[id(handle)] = (stage, index, item, source)
+                    poller.add(handle)
+
+            if not poller:
+                break
+
+            handle = poller.next_done()
+            stage, index, item, source = pending.pop(id(handle))
+            try:
+                result = handle.result()
+            except Exception as e:
+                yield PipelineResult(index, item, stage.name, error=e, task_id=handle.task_id, source=source)
+                yield from self._skipped(stage, index, item, stage.name)
+                continue
+
+            if stage.children:
+                images = result if isinstance(result, list) else [result]
+                ready.extend((child, index, item, image.url) for image in images for child in stage.children)
+            yield PipelineResult(index, item, stage.name, result, task_id=handle.task_id, source=source)
@@ -0,0 +1,144 @@
+"""
+Normalization of local input images before image-to-video submission.
+
+Generated videos are at most 1080P, so a 20-megapixel PNG carries far more
+pixels than the model uses and costs upload time and server-side decoding.
+:func:`normalize_image` shrinks the image to the video resolution, drops its
+metadata and re-encodes it compactly. JPEG sources are decoded at reduced
+scale with ``draft()`` and large images are shrunk by whole factors with
+``reduce()`` before the final resampling, so big inputs are cheap to process.
+
+Normalized files are named after a hash of the source content and settings:
+re-using a source image finds the existing file, and its stable content keeps
+upload and result cache keys stable.
+"""
+
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from .config import CACHE_DIR, NORMALIZE_BACKGROUND, NORMALIZE_FORMAT, NORMALIZE_QUALITY, NORMALIZE_WORKERS
+from .utils import file_digest
+
+# Shorter side of the video, per resolution
+RESOLUTION_SHORT_SIDE = {
+    "480P": 480,
+    "720P": 720,
+    "1080P": 1080,
+}
+
+_EXTENSIONS = {"JPEG": ".jpg", "WEBP": ".webp"}
+
+# Image.info entries holding metadata that normalization strips
+_METADATA_KEYS = ("exif", "xmp", "XML:com.adobe.xmp", "comment")
+
+
+def _target_size(size, short_side: int):
+    """Scale (width, height) so the shorter side is at most short_side."""
+    width, height = size
+    scale = short_side / min(width, height)
+    if scale >= 1:
+        return size
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def _flatten(img, background=NORMALIZE_BACKGROUND):
+    """Convert an image to RGB, compositing transparent pixels onto background."""
+    if img.mode in ("RGB", "L"):
+        return img
+    if img.mode in ("RGBA", "LA", "PA") or "transparency" in img.info:
+        from PIL import Image
+
+        rgba = img.convert("RGBA")
+        flat = Image.new("RGB", rgba.size, background)
+        flat.paste(rgba, mask=rgba.getchannel("A"))
+        return flat
+    return img.convert("RGB")
+
+
+def normalize_image(
+    image_path: str,
+    resolution: str,
+    output_dir: str = f"{CACHE_DIR}/inputs",
+    format: str = NORMALIZE_FORMAT,
+    quality: int = NORMALIZE_QUALITY,
+) -> str:
+    """
+    Shrink a local image to a video resolution and re-encode it without metadata.
+
+    Transparent pixels are composited onto ``NORMALIZE_BACKGROUND``. JPEG /
+    WebP images that already fit the resolution and carry no EXIF, XMP or
+    comment are returned unchanged.
+
+    Args:
+        image_path: Path to the source image
+        resolution: Video resolution ("480P", "720P", "1080P") bounding the shorter side
+        output_dir: Directory of normalized images
+        format: Output format, "JPEG" or "WEBP"
+        quality: Encoder quality (1-100)
+
+    Returns:
+        Path to the image to submit
+    """
+    from PIL import Image, ImageOps
+
+    format = format.upper()
+    if format not in _EXTENSIONS:
+        raise ValueError(f"Unsupported format: {format}. Supported: {list(_EXTENSIONS)}")
+    short_side = RESOLUTION_SHORT_SIDE[resolution]
+
+    with Image.open(image_path) as img:
+        target = _target_size(img.size, short_side)
+        has_metadata = any(img.info.get(key) for key in _METADATA_KEYS)
+        if target == img.size and img.format in _EXTENSIONS and not has_metadata:
+            return image_path
+
+        settings = f"{file_digest(image_path)}:{short_side}:{format}:{quality}"
+        name = hashlib.sha256(settings.encode("utf-8")).hexdigest()[:32] + _EXTENSIONS[format]
+        output = Path(output_dir).expanduser() / name
+        if output.exists():
+            return str(output)
+
+        # JPEG: let the decoder skip detail it would throw away anyway
+        img.draft("RGB", target)
+        img = ImageOps.exif_transpose(img)
+        target = _target_size(img.size, short_side)
+
+        # reduce() only supports continuous-tone modes: palette (GIF, palette PNG)
+        # and 1-bit images must be converted before any resampling
+        img = _flatten(img)
+
+        # Cheap integer box reduction first, then one high-quality resample
+        factor = min(img.width // target[0], img.height // target[1])
+        if factor >= 2:
+            img = img.reduce(factor)
+        if img.size != target:
+            img = img.resize(target, Image.LANCZOS)
+
+        # Write under a temporary name so concurrent callers never see a partial file
+        output.parent.mkdir(parents=True, exist_ok=True)
+        partial = output.with_name(f"{output.name}.{threading.get_ident()}.tmp")
+        img.save(partial, format, quality=quality)
+        partial.replace(output)
+    return str(output)
+
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_normalize_pool() -> ThreadPoolExecutor:
+    """
+    Get the process-wide pool that normalizes images.
+
+    Pillow releases the GIL while decoding and resampling, so a few threads
+    keep several normalizations going without unbounded CPU use.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=NORMALIZE_WORKERS, thread_name_prefix="qwenimg-normalize")
+    return _pool
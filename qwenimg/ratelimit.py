@@ -0,0 +1,280 @@
+"""
+Client-side rate limiting of task submissions.
+
+DashScope limits how many tasks per second each model accepts and how many of
+an account's tasks may run at once; going over either gets the call rejected
+with a throttling error. :class:`RateLimiter` keeps the client under both
+limits instead: a token bucket spaces out ``async_call`` requests, and a
+concurrency slot is held from submission until the task reaches a final state.
+
+A thread waiting for a slot checks on the tasks that hold the slots, so code
+that submits many tasks before polling any of them cannot deadlock.
+
+The quota left to this client changes with whatever else uses the account, so
+the number of slots is adaptive: it shrinks multiplicatively whenever DashScope
+throttles a submission and grows back additively while submissions go through.
+"""
+
+import random
+import threading
+import time
+from typing import Dict, Optional, Set, Tuple
+
+from .config import (
+    T2I_MODELS,
+    I2V_MODELS,
+    T2V_MODELS,
+    DEFAULT_QPS,
+    DEFAULT_MAX_CONCURRENT_TASKS,
+    SUBMIT_RETRY_BACKOFF,
+    SUBMIT_MAX_RETRY_BACKOFF,
+    AIMD_DECREASE_FACTOR,
+    AIMD_DECREASE_COOLDOWN,
+)
+from .keys import key_fingerprint, mask_key
+from .tasks import TaskHandle
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Args:
+        rate: Tokens added per second
+        burst: Maximum number of tokens stored, defaults to ``rate``
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = max(burst if burst is not None else rate, 1)
+        self._tokens = self.burst
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> float:
+        """
+        Take a token if one is available.
+
+        Returns:
+            0 if a token was taken, otherwise the seconds until one is available
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self) -> None:
+        """Block until a token is available and take it."""
+        delay = self.try_acquire()
+        while delay:
+            time.sleep(delay)
+            delay = self.try_acquire()
+
+
+class ModelLimiter:
+    """
+    Submission rate and adaptive concurrency limit for one model.
+
+    Args:
+        qps: Maximum task submissions per second
+        max_concurrent_tasks: Upper bound of the concurrency window
+    """
+
+    # How often an async caller re-checks for a free slot
+    SLOT_RECHECK_INTERVAL = 0.1
+
+    def __init__(self, qps: float, max_concurrent_tasks: int):
+        if max_concurrent_tasks < 1:
+            raise ValueError("max_concurrent_tasks must be at least 1")
+        self.qps = qps
+        self.max_concurrent_tasks = max_concurrent_tasks
+        self._bucket = TokenBucket(qps)
+        self._window = float(max_concurrent_tasks)
+        self._decreased_at = float("-inf")
+        self._active = 0
+        self._handles: Set[TaskHandle] = set()
+        self._cond = threading.Condition()
+
+    @property
+    def in_flight(self) -> int:
+        """Number of slots currently held."""
+        return self._active
+
+    @property
+    def window(self) -> int:
+        """Number of tasks currently allowed in flight."""
+        return max(1, int(self._window))
+
+    def _increase(self) -> None:
+        # Additive increase: one more slot per window of accepted submissions
+        self._window = min(self._window + 1 / self._window, self.max_concurrent_tasks)
+
+    def _decrease(self) -> None:
+        # Multiplicative decrease, once per burst of throttled submissions
+        now = time.monotonic()
+        if now - self._decreased_at >= AIMD_DECREASE_COOLDOWN:
+            self._window = max(1.0, self._window * AIMD_DECREASE_FACTOR)
+            self._decreased_at = now
+
+    def try_acquire(self) -> float:
+        """
+        Reserve a concurrency slot and a submission token without blocking.
+
+        Returns:
+            0 if both were reserved, otherwise the seconds to wait before
+            trying again
+        """
+        with self._cond:
+            if self._active >= self.window:
+                return self.SLOT_RECHECK_INTERVAL
+            delay = self._bucket.try_acquire()
+            if not delay:
+                self._active += 1
+            return delay
+
+    def acquire(self) -> None:
+        """
+        Reserve a concurrency slot and a submission token.
+
+        While all slots are taken, the calling thread polls the task due
+        soonest itself, releasing its slot as soon as it finishes.
+        """
+        with self._cond:
+            while self._active >= self.window:
+                handle = min(self._handles, key=lambda h: h.next_poll_at, default=None)
+                delay = None if handle is None else handle.next_poll_at - time.monotonic()
+                if delay is not None and delay <= 0:
+                    self._cond.release()
+                    try:
+                        handle.refresh()
+                    finally:
+                        self._cond.acquire()
+                else:
+                    self._cond.wait(delay)
+            self._active += 1
+
+        self._bucket.acquire()
+
+    def release(self, throttled: bool = False) -> None:
+        """
+        Give back a slot whose submission failed or whose task finished.
+
+        Args:
+            throttled: The submission was throttled; shrinks the window
+        """
+        with self._cond:
+            self._active -= 1
+            if throttled:
+                self._decrease()
+            self._cond.notify()
+
+    def accepted(self) -> None:
+        """Record an accepted submission; grows the window back towards its maximum."""
+        with self._cond:
+            self._increase()
+            self._cond.notify()
+
+    def track(self, handle: TaskHandle) -> None:
+        """Record an accepted submission and hold its slot until the task finishes."""
+        with self._cond:
+            self._increase()
+            self._handles.add(handle)
+            self._cond.notify_all()
+        handle.add_done_callback(self._finished)
+
+    def _finished(self, handle: TaskHandle) -> None:
+        with self._cond:
+            if handle in self._handles:
+                self._handles.discard(handle)
+                self._active -= 1
+                self._cond.notify()
+
+
+class RateLimiter:
+    """
+    Per-model submission limits, shared by every client that uses it.
+
+    Limits come from the ``qps`` / ``max_concurrent_tasks`` entries of the
+    model tables in config, unless overridden for all models here.
+
+    Examples:
+        >>> client = QwenImg(rate_limiter=True)  # process-wide limiter
+        >>> client = QwenImg(rate_limiter=RateLimiter(max_concurrent_tasks=2))
+    """
+
+    def __init__(self, qps: Optional[float] = None, max_concurrent_tasks: Optional[int] = None):
+        """
+        Args:
+            qps: Submissions per second for every model, None to use the model tables
+            max_concurrent_tasks: Running tasks per model, None to use the model tables
+        """
+        self.qps = qps
+        self.max_concurrent_tasks = max_concurrent_tasks
+        # Keyed by model and key fingerprint; masked keys are only for labels,
+        # as two keys can share their first and last characters
+        self._limiters: Dict[Tuple[str, Optional[str]], ModelLimiter] = {}
+        self._labels: Dict[Tuple[str, Optional[str]], str] = {}
+        self._lock = threading.Lock()
+
+    def for_model(self, model: str, api_key: Optional[str] = None) -> ModelLimiter:
+        """
+        Get the limiter of a model, creating it on first use.
+
+        Args:
+            model: Model name
+            api_key: Key the submissions use; quotas are per account, so each
+                     key of a :class:`KeyPool` gets limiters of its own
+        """
+        fingerprint = None if api_key is None else key_fingerprint(api_key)
+        name = (model, fingerprint)
+        with self._lock:
+            limiter = self._limiters.get(name)
+            if limiter is None:
+                info = {**T2I_MODELS, **I2V_MODELS, **T2V_MODELS}.get(model, {})
+                limiter = ModelLimiter(
+                    self.qps or info.get("qps", DEFAULT_QPS),
+                    self.max_concurrent_tasks or info.get("max_concurrent_tasks", DEFAULT_MAX_CONCURRENT_TASKS),
+                )
+                self._limiters[name] = limiter
+                label = model if api_key is None else f"{model}@{mask_key(api_key)}"
+                if label in self._labels.values():
+                    label = f"{label}#{fingerprint}"
+                self._labels[name] = label
+            return limiter
+
+    def windows(self) -> Dict[str, int]:
+        """
+        Get the current concurrency window of every model used so far.
+
+        With a :class:`KeyPool`, windows are listed per model and key as
+        ``"<model>@<masked key>"``, followed by ``#<key fingerprint>`` for a
+        key whose masked form another key already has. Useful for sizing worker pools that feed
+        the client.
+        """
+        with self._lock:
+            return {self._labels[name]: limiter.window for name, limiter in self._limiters.items()}
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter delay in seconds before retry number ``attempt`` (from 0) of a submission."""
+    return random.uniform(0, min(SUBMIT_RETRY_BACKOFF * (2 ** attempt), SUBMIT_MAX_RETRY_BACKOFF))
+
+
+_default_rate_limiter: Optional[RateLimiter] = None
+_default_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Get the process-wide rate limiter used with ``rate_limiter=True``."""
+    global _default_rate_limiter
+    if _default_rate_limiter is None:
+        with _default_rate_limiter_lock:
+            if _default_rate_limiter is None:
+                _default_rate_limiter = RateLimiter()
+    return _default_rate_limiter
@@ -0,0 +1,125 @@
+"""
+Routing of task submissions across DashScope regions.
+
+Each region (Beijing, Singapore, ...) has its own endpoint, quota and
+incidents. :class:`RegionRouter` sends each submission to the region that has
+recently been fastest and healthiest, so one region throttling or degrading
+shifts work to the others instead of stalling every job. Status checks always
+go to the region a task was submitted to.
+"""
+
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+from .config import (
+    ROUTER_EWMA_ALPHA,
+    ROUTER_ERROR_PENALTY,
+    ROUTER_ERROR_HALF_LIFE,
+    ROUTER_THROTTLE_COOLDOWN,
+)
+from .tasks import PERMANENT, THROTTLED
+
+
+class Region:
+    """
+    One DashScope region and its recent submission statistics.
+
+    Args:
+        name: Region name, for logs and :meth:`RegionRouter.stats`
+        endpoint: HTTP API endpoint of the region
+        api_key: API key for the region, None to use the client's key
+    """
+
+    def __init__(self, name: str, endpoint: str, api_key: Optional[str] = None):
+        self.name = name
+        self.endpoint = endpoint
+        self.api_key = api_key
+        self.latency = 0.0
+        self.error_rate = 0.0
+        self.submissions = 0
+        self._updated_at = time.monotonic()
+        self._cooldown_until = float("-inf")
+
+    def __repr__(self) -> str:
+        return f"Region({self.name!r}, latency={self.latency:.3f}, error_rate={self.error_rate:.2f})"
+
+    def _decayed_error_rate(self, now: float) -> float:
+        # Errors fade while a region is not used, so a region that failed in
+        # the past is eventually tried again
+        return self.error_rate * 0.5 ** ((now - self._updated_at) / ROUTER_ERROR_HALF_LIFE)
+
+    def score(self, now: float):
+        """Sort key of the region; lower is better."""
+        cooling = now < self._cooldown_until
+        return cooling, self.latency * (1 + ROUTER_ERROR_PENALTY * self._decayed_error_rate(now))
+
+    def record(self, latency: float, failure: Optional[str], now: float) -> None:
+        error = failure is not None and failure != PERMANENT
+        error_rate = self._decayed_error_rate(now)
+        self.error_rate = error_rate + ROUTER_EWMA_ALPHA * (error - error_rate)
+        if self.submissions == 0:
+            self.latency = latency
+        else:
+            self.latency += ROUTER_EWMA_ALPHA * (latency - self.latency)
+        self.submissions += 1
+        self._updated_at = now
+        if failure == THROTTLED:
+            self._cooldown_until = now + ROUTER_THROTTLE_COOLDOWN
+
+
+class RegionRouter:
+    """
+    Picks the region for each task submission by measured latency and error rate.
+
+    Regions are tried in the given order until each has a measurement; after
+    that a region's score is its average submission latency, inflated by its
+    recent error rate. A region that throttles a submission is skipped for a
+    cool-down period while any other region is available.
+
+    Examples:
+        >>> router = RegionRouter([
+        ...     Region("beijing", BEIJING_ENDPOINT, api_key="sk-cn-..."),
+        ...     Region("singapore", SINGAPORE_ENDPOINT, api_key="sk-intl-..."),
+        ... ])
+        >>> client = QwenImg(router=router)
+    """
+
+    def __init__(self, regions: Iterable[Region]):
+        self.regions = list(regions)
+        if not self.regions:
+            raise ValueError("RegionRouter needs at least one region")
+        self._lock = threading.Lock()
+
+    def choose(self) -> Region:
+        """Get the region the next submission should go to."""
+        now = time.monotonic()
+        with self._lock:
+            return min(self.regions, key=lambda region: region.score(now))
+
+    def record(self, region: Region, latency: float, failure: Optional[str] = None) -> None:
+        """
+        Record the outcome of a submission.
+
+        Args:
+            region: Region the submission went to
+            latency: Seconds the submission request took
+            failure: classify_response() of the response, or TRANSIENT for
+                     a connection error; PERMANENT failures are the request's
+                     fault and do not count against the region
+        """
+        with self._lock:
+            region.record(latency, failure, time.monotonic())
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Get the current latency, error rate and submission count of every region."""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                region.name: {
+                    "latency": region.latency,
+                    "error_rate": region._decayed_error_rate(now),
+                    "submissions": region.submissions,
+                }
+                for region in self.regions
+            }
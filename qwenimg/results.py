@@ -0,0 +1,186 @@
+"""
+Result objects returned by the generation APIs.
+
+Results are small: an image result holds its bytes only until they are saved
+to disk, and the PIL image is only decoded when :attr:`ImageResult.image` is
+first accessed, so memory scales with what the caller actually touches.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from datetime import datetime
+from io import BytesIO
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Optional
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+# Format of the submit_time / scheduled_time / end_time fields of task output
+_TASK_TIME_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+
+def task_timings(response) -> Dict[str, float]:
+    """
+    Get how long a finished task queued and ran on DashScope.
+
+    Args:
+        response: Final task response
+
+    Returns:
+        Dict with "queued" and "generation" seconds, where the task output
+        reports the times needed to compute them
+    """
+    output = getattr(response, "output", None)
+    if output is None:
+        return {}
+
+    times = {}
+    for name in ("submit_time", "scheduled_time", "end_time"):
+        try:
+            times[name] = datetime.strptime(output.get(name), _TASK_TIME_FORMAT)
+        except (TypeError, ValueError):
+            pass
+
+    timings = {}
+    if "submit_time" in times and "scheduled_time" in times:
+        timings["queued"] = (times["scheduled_time"] - times["submit_time"]).total_seconds()
+    if "scheduled_time" in times and "end_time" in times:
+        timings["generation"] = (times["end_time"] - times["scheduled_time"]).total_seconds()
+    return timings
+
+
+class ImageResult:
+    """
+    One generated image.
+
+    Once the image is saved only its path is kept; the bytes are read back
+    from disk when :attr:`data` is accessed. The PIL image is only created
+    when :attr:`image` is first accessed.
+
+    Examples:
+        >>> for result in client.iter_text_to_image("美丽的风景", n=4):
+        ...     print(result.index, result.path, result.nbytes)
+        ...     thumbnail = result.image.resize((256, 256))
+    """
+
+    __slots__ = ("url", "path", "index", "seed", "timings", "_data", "_nbytes", "_image")
+
+    def __init__(
+        self,
+        url: str,
+        data: Optional[bytes] = None,
+        path: Optional[str] = None,
+        index: int = 0,
+        seed: Optional[int] = None,
+        timings: Optional[Dict[str, float]] = None,
+    ):
+        """
+        Args:
+            url: URL the image was downloaded from
+            data: Image file content, needed unless path is given
+            path: Path of the saved file, None if it was not saved
+            index: Position of the image in the task's results
+            seed: Seed the image was requested with, None if random
+            timings: Seconds spent per stage ("queued", "generation", "download",
+                     and "decode" once the image is decoded)
+        """
+        if data is None and path is None:
+            raise ValueError("ImageResult needs data or a path")
+        self.url = url
+        self.path = path
+        self.index = index
+        self.seed = seed
+        self.timings = timings if timings is not None else {}
+        self._data = data if path is None else None
+        self._nbytes = len(data) if data is not None else None
+        self._image: Optional[Image.Image] = None
+
+    def __repr__(self) -> str:
+        return f"ImageResult(index={self.index}, path={self.path!r}, bytes={self.nbytes})"
+
+    @property
+    def data(self) -> bytes:
+        """Image file content."""
+        if self._data is not None:
+            return self._data
+        return Path(self.path).read_bytes()
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the image file in bytes."""
+        if self._nbytes is None:
+            self._nbytes = os.path.getsize(self.path)
+        return self._nbytes
+
+    @property
+    def image(self) -> Image.Image:
+        """The image as a PIL.Image, decoded on first access."""
+        if self._image is None:
+            from PIL import Image
+
+            started = time.monotonic()
+            source = BytesIO(self._data) if self._data is not None else self.path
+            image = Image.open(source)
+            image.load()
+            self.timings["decode"] = time.monotonic() - started
+            self._image = image
+        return self._image
+
+
+class VideoResult:
+    """
+    One generated video.
+
+    ``str(result)`` is the local path if the video is on disk, otherwise its URL.
+
+    Examples:
+        >>> video = client.text_to_video("一只猫在草地上奔跑")
+        >>> video.url, video.timings
+    """
+
+    __slots__ = ("url", "path", "task_id", "seed", "timings", "model")
+
+    def __init__(
+        self,
+        url: Optional[str],
+        path: Optional[str] = None,
+        task_id: Optional[str] = None,
+        seed: Optional[int] = None,
+        timings: Optional[Dict[str, float]] = None,
+        model: Optional[str] = None,
+    ):
+        """
+        Args:
+            url: Video URL returned by DashScope; for a cache hit the URL
+                 first returned, which may have expired, or None if the
+                 entry was cached without it
+            path: Local path of the video file, None if not downloaded
+            task_id: DashScope task id, None if served from a cache
+            seed: Seed the video was requested with, None if random
+            timings: Seconds spent per stage ("queued", "generation", "download")
+            model: Model that generated the video
+        """
+        self.url = url
+        self.path = path
+        self.task_id = task_id
+        self.seed = seed
+        self.timings = timings if timings is not None else {}
+        self.model = model
+
+    def __repr__(self) -> str:
+        return f"VideoResult(url={self.url!r}, path={self.path!r})"
+
+    def __str__(self) -> str:
+        return self.path or self.url
+
+    def copy(self) -> "VideoResult":
+        """Get an independent copy of the result."""
+        return VideoResult(self.url, self.path, self.task_id, self.seed, dict(self.timings), self.model)
+
+    @property
+    def nbytes(self) -> Optional[int]:
+        """Size of the video file in bytes, None if it is not on disk."""
+        return os.path.getsize(self.path) if self.path else None
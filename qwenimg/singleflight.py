@@ -0,0 +1,144 @@
+"""
+Coalescing of identical in-flight generation requests.
+
+When the same request is made again while an identical one is still running,
+for example by a caller retrying after a timeout, or by two users picking the
+same prompt, both can share one remote task and one download. Each caller
+still gets its own handle and its own result object. The remote task is only
+canceled once every caller sharing it has canceled.
+"""
+
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict
+
+from .tasks import TaskHandle
+
+
+class _Flight:
+    """A shared task and the number of callers still waiting for it."""
+
+    __slots__ = ("handle", "callers", "lock")
+
+    def __init__(self, handle: TaskHandle):
+        self.handle = handle
+        self.callers = 0
+        self.lock = threading.Lock()
+
+    def join(self) -> None:
+        with self.lock:
+            self.callers += 1
+
+    def leave(self) -> bool:
+        """Stop waiting; returns whether no caller is left."""
+        with self.lock:
+            self.callers -= 1
+            return self.callers == 0
+
+
+class SharedTaskHandle(TaskHandle):
+    """
+    One caller's handle to a task shared with identical requests.
+
+    The handle mirrors the shared task. Its result is built from the shared
+    task's result, which is only computed (downloaded) once.
+    """
+
+    def __init__(self, flight: _Flight, share: Callable[[Any], Any]):
+        """
+        Args:
+            flight: The task all identical requests share
+            share: Turns the shared result into this caller's result
+        """
+        shared = flight.handle
+        super().__init__(shared.api, shared.kind, shared.task_id, {"model": shared.model},
+                         lambda _response: share(shared.result()))
+        self._flight = flight
+        self._shared = shared
+        flight.join()
+        self._mirror()
+
+    def _mirror(self) -> None:
+        shared = self._shared
+        self.submitted_at = shared.submitted_at
+        self.response = shared.response
+        self._error = shared._error
+        self.poll_interval = shared.poll_interval
+        self.next_poll_at = shared.next_poll_at
+        self.started_at = shared.started_at
+        self.metrics = shared.metrics
+        self.status = shared.status
+
+    def _refresh(self) -> str:
+        if self.done:
+            return self.status
+
+        # Only the first caller due for a check actually polls the task
+        shared = self._shared
+        if not shared.done and shared.next_poll_at <= time.monotonic():
+            shared.refresh()
+        self._mirror()
+        return self.status
+
+    def _cancel_remote(self, pending: bool) -> bool:
+        # The other callers may still want the task
+        return self._flight.leave() and self._shared.cancel()
+
+
+class SingleFlight:
+    """
+    Registry of in-flight requests by canonical key.
+
+    Examples:
+        >>> client = QwenImg(coalesce=True)
+        >>> # Both threads share one DashScope task and one download
+        >>> pool.submit(client.text_to_image, "一只猫")
+        >>> pool.submit(client.text_to_image, "一只猫")
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, submit: Callable[[], TaskHandle], share: Callable[[Any], Any]) -> TaskHandle:
+        """
+        Submit a request, or join the identical request already in flight.
+
+        Args:
+            key: Canonical request key
+            submit: Submits the request and returns the shared handle
+            share: Turns the shared result into this caller's result
+
+        Returns:
+            This caller's handle
+
+        Raises:
+            Exception: Whatever submitting the shared request raised
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+
+        if leader:
+            try:
+                shared = submit()
+            except BaseException as e:
+                self._forget(key, future)
+                future.set_exception(e)
+                raise
+            flight = _Flight(shared)
+            future.set_result(flight)
+            shared.add_done_callback(lambda _handle: self._forget(key, future))
+        else:
+            flight = future.result()
+
+        return SharedTaskHandle(flight, share)
+
+    def _forget(self, key: str, future: Future) -> None:
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
@@ -0,0 +1,682 @@
+"""
+Task handles and polling for submitted DashScope generations.
+
+``QwenImg.submit_*`` methods return a :class:`TaskHandle` as soon as DashScope
+has accepted the task. Handles can be waited on one at a time, or many of them
+can be checked from a single thread with :func:`poll_many`, which schedules each
+status request according to how long that kind of task usually takes.
+
+A handle can be given a deadline and can be canceled; either stops polling
+and cancels the remote task if DashScope has not started it yet.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from concurrent.futures import CancelledError
+from http import HTTPStatus
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .config import (
+    DEFAULT_DURATION,
+    DEFAULT_RESOLUTION,
+    IMAGE_POLL_INTERVAL,
+    IMAGE_MAX_POLL_INTERVAL,
+    VIDEO_POLL_INTERVAL,
+    VIDEO_MAX_POLL_INTERVAL,
+    POLL_BACKOFF,
+    POLL_MAX_FAILURES,
+)
+from .hooks import Hooks, emit
+from .keys import key_fingerprint
+from .results import task_timings
+
+# Task states after which DashScope will not change the task any more
+FINAL_TASK_STATUSES = ("SUCCEEDED", "FAILED", "CANCELED", "UNKNOWN")
+
+# Status codes worth polling again instead of failing the task
+RETRYABLE_STATUS_CODES = (
+    HTTPStatus.TOO_MANY_REQUESTS,
+    HTTPStatus.INTERNAL_SERVER_ERROR,
+    HTTPStatus.BAD_GATEWAY,
+    HTTPStatus.SERVICE_UNAVAILABLE,
+    HTTPStatus.GATEWAY_TIMEOUT,
+)
+
+# Failure classes of DashScope responses, see classify_response()
+THROTTLED = "throttled"
+TRANSIENT = "transient"
+PERMANENT = "permanent"
+
+# Error codes DashScope uses for server-side hiccups that may not come with
+# a 5xx status
+TRANSIENT_ERROR_CODES = ("InternalError", "InternalError.Timeout", "SystemError", "ServiceUnavailable", "RequestTimeOut")
+
+_NOT_SET = object()
+
+
+def classify_response(response) -> Optional[str]:
+    """
+    Classify a failed DashScope API response.
+
+    Args:
+        response: Response of async_call / fetch / call
+
+    Returns:
+        None if the request succeeded, otherwise THROTTLED (over the rate or
+        concurrency quota), TRANSIENT (worth retrying as is) or PERMANENT
+        (invalid request, content rejected, bad API key, ...)
+    """
+    if response.status_code == HTTPStatus.OK:
+        return None
+
+    code = response.code or ""
+    if response.status_code == HTTPStatus.TOO_MANY_REQUESTS or code.startswith("Throttling"):
+        return THROTTLED
+    if response.status_code in RETRYABLE_STATUS_CODES or code in TRANSIENT_ERROR_CODES:
+        return TRANSIENT
+    return PERMANENT
+
+
+def task_api(kind: str):
+    """Get the DashScope task API class of a task kind (ImageSynthesis or VideoSynthesis)."""
+    # dashscope takes a while to import, so it is only loaded once a task is run
+    from dashscope import ImageSynthesis, VideoSynthesis
+
+    return ImageSynthesis if kind == "text_to_image" else VideoSynthesis
+
+
+def task_response(api, response):
+    """Convert a generic task API response the way ``api.fetch`` does."""
+    from dashscope import VideoSynthesis
+    from dashscope.api_entities.dashscope_response import ImageSynthesisResponse, VideoSynthesisResponse
+
+    if isinstance(api, type) and issubclass(api, VideoSynthesis):
+        return VideoSynthesisResponse.from_api_response(response)
+    return ImageSynthesisResponse.from_api_response(response)
+
+
+def fetch_task(api, task_id: str, api_key: Optional[str], base_address: Optional[str] = None):
+    """
+    Check a task's status on the endpoint it was submitted to.
+
+    ``ImageSynthesis.fetch`` / ``VideoSynthesis.fetch`` do not pass
+    ``base_address`` on, so a task on a specific endpoint is fetched through
+    their parent's generic task API instead.
+
+    Args:
+        api: DashScope task API class the task was submitted with
+        task_id: Remote task id
+        api_key: API key the task was submitted with
+        base_address: Endpoint the task was submitted to, None for the
+                      SDK's global endpoint
+    """
+    if base_address is None:
+        return api.fetch(task_id, api_key=api_key)
+    return task_response(api, super(api, api).fetch(task_id, api_key=api_key, base_address=base_address))
+
+
+def cancel_task(api, task_id: str, api_key: Optional[str], base_address: Optional[str] = None) -> bool:
+    """
+    Cancel a task on the endpoint it was submitted to.
+
+    DashScope only cancels tasks that are still PENDING. Like ``fetch``, the
+    ``cancel`` methods of the task API classes drop ``base_address``, so the
+    generic task API is called directly.
+
+    Returns:
+        Whether DashScope canceled the task
+    """
+    try:
+        response = super(api, api).cancel(task_id, api_key=api_key, base_address=base_address)
+    except OSError:
+        return False
+    return classify_response(response) is None
+
+
+def task_metrics(response) -> Dict[str, int]:
+    """Get the TOTAL / SUCCEEDED / FAILED image counts a task reports, if any."""
+    metrics = getattr(response.output, "task_metrics", None)
+    return dict(metrics) if metrics else {}
+
+
+class TaskProgress:
+    """
+    State of a task, as passed to progress callbacks.
+
+    DashScope does not report a task's position in its queue; ``queued``
+    tells how long the task has been (or was) waiting instead.
+
+    Attributes:
+        kind: Task kind ("text_to_image", ...)
+        task_id: DashScope task id, None while the request waits locally
+        model: Model of the task
+        status: "PENDING", "RUNNING", "SUCCEEDED", "FAILED", "CANCELED",
+                "UNKNOWN", or "QUEUED" while a packed request waits for
+                companions before it is submitted
+        elapsed: Seconds since the task was submitted
+        queued: Seconds the task waited before it started running; while
+                it is pending, how long it has waited so far
+        metrics: Image counts of a text-to-image task ("TOTAL",
+                 "SUCCEEDED", "FAILED"), where DashScope reports them
+        done: Whether the task reached a final state
+        base_address: Endpoint the task was submitted to, if known
+        key: :func:`~qwenimg.keys.key_fingerprint` of the API key the task
+             was submitted with, if known; with ``task_id`` and
+             ``base_address`` it is what ``resume_task`` needs to pick the
+             task up from another process
+    """
+
+    __slots__ = ("kind", "task_id", "model", "status", "elapsed", "queued", "metrics", "done", "base_address", "key")
+
+    def __init__(
+        self,
+        kind: str,
+        task_id: Optional[str],
+        model: Optional[str],
+        status: str,
+        elapsed: float,
+        queued: float,
+        metrics: Optional[Dict[str, int]] = None,
+        done: bool = False,
+        base_address: Optional[str] = None,
+        key: Optional[str] = None,
+    ):
+        self.kind = kind
+        self.task_id = task_id
+        self.model = model
+        self.status = status
+        self.elapsed = elapsed
+        self.queued = queued
+        self.metrics = metrics if metrics is not None else {}
+        self.done = done
+        self.base_address = base_address
+        self.key = key
+
+    @property
+    def state(self) -> Tuple:
+        """What a new report must differ in to be passed on."""
+        return self.task_id, self.status, self.done, tuple(sorted(self.metrics.items()))
+
+    def __repr__(self) -> str:
+        return f"TaskProgress({self.status!r}, task_id={self.task_id!r}, elapsed={self.elapsed:.1f})"
+
+
+class ProgressListeners:
+    """
+    Progress callbacks of one task.
+
+    Only changes of state are passed on, and a callback added late is first
+    called with the latest state. Callbacks run on the thread (or event loop)
+    polling the task, so they should return quickly.
+    """
+
+    def __init__(self, callback: Optional[Callable[[TaskProgress], None]] = None):
+        self._callbacks: List[Callable[[TaskProgress], None]] = []
+        self._lock = threading.Lock()
+        self.last: Optional[TaskProgress] = None
+        if callback is not None:
+            self._callbacks.append(callback)
+
+    def __bool__(self) -> bool:
+        return bool(self._callbacks)
+
+    def add(self, callback: Callable[[TaskProgress], None]) -> None:
+        with self._lock:
+            self._callbacks.append(callback)
+            last = self.last
+        if last is not None:
+            callback(last)
+
+    def report(self, progress: TaskProgress) -> None:
+        """Pass a state to the callbacks, unless it is the one reported last."""
+        with self._lock:
+            if self.last is not None and self.last.state == progress.state:
+                return
+            self.last = progress
+            callbacks = list(self._callbacks)
+        for callback in callbacks:
+            callback(progress)
+
+
+def poll_intervals(kind: str, params: dict) -> Tuple[float, float]:
+    """
+    Get the initial and maximum status polling interval for a task.
+
+    Args:
+        kind: Task kind ("text_to_image", "image_to_video" or "text_to_video")
+        params: API parameters the task was submitted with
+
+    Returns:
+        Tuple of (initial interval, max interval) in seconds
+    """
+    if kind == "text_to_image":
+        return IMAGE_POLL_INTERVAL, IMAGE_MAX_POLL_INTERVAL
+
+    resolution = params.get("resolution", DEFAULT_RESOLUTION)
+    duration = params.get("duration", DEFAULT_DURATION)
+    base = VIDEO_POLL_INTERVAL.get(resolution, max(VIDEO_POLL_INTERVAL.values()))
+    interval = base * max(duration, 1) / 5
+    return min(interval, VIDEO_MAX_POLL_INTERVAL), VIDEO_MAX_POLL_INTERVAL
+
+
+class TaskHandle:
+    """
+    Reference to a generation task running on DashScope.
+
+    A handle only holds the remote task id and what is needed to check on it,
+    so thousands of them can be kept around cheaply.
+
+    Examples:
+        >>> handle = client.submit_text_to_video("一只猫在草地上奔跑")
+        >>> handle.task_id
+        '0385dc79-5ff8-4d82-bcb6-xxxxxx'
+        >>> video_url = handle.wait()
+        >>> handle.cancel()  # or give up on it, e.g. when the user navigates away
+    """
+
+    def __init__(
+        self,
+        api: Any,
+        kind: str,
+        task_id: str,
+        params: dict,
+        finish: Callable[[Any], Any],
+        hooks: Optional[Hooks] = None,
+    ):
+        """
+        Args:
+            api: DashScope task API class (ImageSynthesis or VideoSynthesis)
+            kind: Task kind ("text_to_image", "image_to_video" or "text_to_video")
+            task_id: Remote DashScope task id
+            params: API parameters the task was submitted with
+            finish: Turns the final task response into the value returned by
+                    :meth:`result`
+            hooks: Receive status check and final state events
+        """
+        self.api = api
+        self.kind = kind
+        self.task_id = task_id
+        self.model = params.get("model")
+        self.status = "PENDING"
+        self.submitted_at = time.monotonic()
+        self.started_at: Optional[float] = None
+        self.metrics: Dict[str, int] = {}
+        self.response = None
+        self.api_key = params.get("api_key")
+        self.base_address = params.get("base_address")
+        self.deadline: Optional[float] = None
+
+        self._poll_failures = 0
+        self._finish = finish
+        self._hooks = hooks
+        self._result = _NOT_SET
+        self._error: Optional[BaseException] = None
+        self._lock = threading.Lock()
+        # Held while result() downloads, separately from _lock so that
+        # cancel() and refresh() don't wait for the downloads
+        self._result_lock = threading.Lock()
+        self._finishing = False
+        self._done_callbacks: List[Callable[["TaskHandle"], None]] = []
+        self._callbacks_lock = threading.Lock()
+        self._progress = ProgressListeners()
+
+        self.poll_interval, self.max_poll_interval = poll_intervals(kind, params)
+        self.next_poll_at = self.submitted_at + self.poll_interval
+
+    def __repr__(self) -> str:
+        return f"TaskHandle(kind={self.kind!r}, task_id={self.task_id!r}, status={self.status!r})"
+
+    @property
+    def done(self) -> bool:
+        """Whether DashScope reported a final state for the task."""
+        return self._error is not None or self.status in FINAL_TASK_STATUSES
+
+    def add_done_callback(self, fn: Callable[["TaskHandle"], None]) -> None:
+        """
+        Call fn(handle) once the task reaches a final state or is canceled.
+
+        If the task is already done, fn is called immediately.
+        """
+        with self._callbacks_lock:
+            if not self.done:
+                self._done_callbacks.append(fn)
+                return
+        fn(self)
+
+    def _run_done_callbacks(self) -> None:
+        with self._callbacks_lock:
+            callbacks, self._done_callbacks = self._done_callbacks, []
+        for fn in callbacks:
+            fn(self)
+
+    def set_timeout(self, timeout: Optional[float]) -> "TaskHandle":
+        """
+        Give the task a deadline, counted from its submission.
+
+        A task still running at its deadline is canceled (see :meth:`cancel`)
+        and :meth:`result` raises TimeoutError.
+
+        Args:
+            timeout: Seconds the task may take, None for no deadline
+
+        Returns:
+            The handle itself
+        """
+        self.deadline = None if timeout is None else self.submitted_at + timeout
+        if self.deadline is not None and self.next_poll_at > self.deadline:
+            self.next_poll_at = self.deadline
+        return self
+
+    def cancel(self) -> bool:
+        """
+        Stop waiting for the task and cancel it on DashScope if possible.
+
+        Polling stops at once, also in other threads waiting on the handle,
+        and rate limiter and key pool slots are released. :meth:`result`
+        raises ``concurrent.futures.CancelledError``.
+
+        A task whose result is being downloaded can still be canceled.
+        Downloads already under way are not interrupted, but their result
+        is dropped: the thread running :meth:`result` raises
+        ``CancelledError`` once they end. A task whose result was already
+        returned is not affected.
+
+        Returns:
+            Whether DashScope canceled the remote task. Only PENDING tasks
+            can be canceled; a task that already started runs to the end on
+            DashScope, but its result is never fetched.
+        """
+        return self._stop(CancelledError(f"Task {self.task_id} was canceled"))
+
+    def _stop(self, error: BaseException) -> bool:
+        with self._lock:
+            if self._error is not None or (self.done and not self._finishing):
+                return False
+            pending = self.status in ("PENDING", "QUEUED")
+            self.status = "CANCELED"
+            self._error = error
+        canceled = self._cancel_remote(pending)
+        self._report_progress()
+        self._run_done_callbacks()
+        return canceled
+
+    def _cancel_remote(self, pending: bool) -> bool:
+        """Cancel the remote task; ``pending`` tells whether it was last seen PENDING."""
+        if not pending or self.api is None or self.task_id is None:
+            return False
+        return cancel_task(self.api, self.task_id, self.api_key, self.base_address)
+
+    def _past_deadline(self) -> bool:
+        """Stop the task if its deadline has passed."""
+        if self.deadline is None or self.done or time.monotonic() < self.deadline:
+            return False
+        timeout = self.deadline - self.submitted_at
+        self._stop(TimeoutError(f"Task {self.task_id} did not finish within {timeout:g} seconds"))
+        return True
+
+    def add_progress_callback(self, fn: Callable[[TaskProgress], None]) -> None:
+        """
+        Call fn(progress) with the current state and on every change of it.
+
+        States change when DashScope reports a new status or image counts;
+        they are picked up by whatever polls the handle (``wait()``,
+        ``poll_many()``, a batch).
+
+        Examples:
+            >>> handle = client.submit_text_to_video("一只猫在草地上奔跑")
+            >>> handle.add_progress_callback(lambda p: print(p.status, round(p.elapsed)))
+            >>> video = handle.wait()
+            PENDING 0
+            RUNNING 41
+            SUCCEEDED 187
+        """
+        self._report_progress(force=True)
+        self._progress.add(fn)
+
+    def _report_progress(self, force: bool = False) -> None:
+        if not (self._progress or force):
+            return
+        now = time.monotonic()
+        queued = (self.started_at if self.started_at is not None else now) - self.submitted_at
+        if self.response is not None:
+            queued = task_timings(self.response).get("queued", queued)
+        self._progress.report(TaskProgress(
+            self.kind, self.task_id, self.model, self.status, now - self.submitted_at,
+            queued, self.metrics, self.done, self.base_address,
+            key_fingerprint(self.api_key) if self.api_key else None,
+        ))
+
+    def refresh(self) -> str:
+        """
+        Check the task status once, or cancel the task if its deadline passed.
+
+        Safe to call from several threads; concurrent calls are serialized.
+
+        Returns:
+            Current task status ("PENDING", "RUNNING", "SUCCEEDED", ...)
+        """
+        if self._past_deadline():
+            return self.status
+        with self._lock:
+            self._refresh()
+            if self.deadline is not None and self.next_poll_at > self.deadline:
+                self.next_poll_at = self.deadline
+        self._report_progress()
+        if self.done:
+            self._run_done_callbacks()
+        return self.status
+
+    def _refresh(self) -> str:
+        if self.done:
+            return self.status
+
+        started = time.monotonic()
+        try:
+            response = fetch_task(self.api, self.task_id, self.api_key, self.base_address)
+        except OSError as e:
+            # Network errors (requests exceptions are OSErrors) say nothing
+            # about the remote task, so just check again later
+            self._schedule_next_poll()
+            self._emit("status", time.monotonic() - started, status=self.status, failure=TRANSIENT)
+            self._poll_failures += 1
+            if self._poll_failures >= POLL_MAX_FAILURES:
+                self._error = RuntimeError(
+                    f"Failed to check task {self.task_id}: {self._poll_failures} consecutive network errors"
+                )
+                self._error.__cause__ = e
+            return self.status
+        self._poll_failures = 0
+        self._schedule_next_poll()
+
+        failure = classify_response(response)
+        if failure is None:
+            self.status = response.output.task_status
+            self.metrics = task_metrics(response) or self.metrics
+            if self.status != "PENDING" and self.started_at is None:
+                self.started_at = time.monotonic()
+        self._emit(
+            "status", time.monotonic() - started, request_id=response.request_id,
+            status=self.status, failure=failure,
+        )
+        if failure in (THROTTLED, TRANSIENT):
+            return self.status
+
+        if failure is not None:
+            self.response = response
+            self._error = RuntimeError(
+                f"Failed to check task {self.task_id}. Status: {response.status_code}, "
+                f"Code: {response.code}, Message: {response.message}"
+            )
+        elif self.status in FINAL_TASK_STATUSES:
+            self.response = response
+        if self.done:
+            self._emit(
+                "result", time.monotonic() - self.submitted_at, request_id=response.request_id,
+                status=self.status, failure=failure, timings=task_timings(response),
+            )
+        return self.status
+
+    def _emit(self, phase: str, duration: float, **fields) -> None:
+        emit(self._hooks, phase, duration, kind=self.kind, model=self.model, task_id=self.task_id, **fields)
+
+    def _schedule_next_poll(self) -> None:
+        self.next_poll_at = time.monotonic() + self.poll_interval
+        self.poll_interval = min(self.poll_interval * POLL_BACKOFF, self.max_poll_interval)
+
+    def result(self) -> Any:
+        """
+        Get the result of a finished task.
+
+        Returns:
+            The same value the blocking client method would have returned
+
+        Raises:
+            RuntimeError: If the task is still running or failed
+            TimeoutError: If the task was stopped at its deadline
+            concurrent.futures.CancelledError: If the task was canceled
+        """
+        if self._error is not None:
+            raise self._error
+        if not self.done:
+            raise RuntimeError(f"Task {self.task_id} is still {self.status}")
+
+        with self._result_lock:
+            # Downloads happen here, so concurrent callers must not both run it
+            if self._result is _NOT_SET and self._error is None:
+                with self._lock:
+                    self._finishing = True
+                try:
+                    result = self._finish(self.response)
+                except BaseException:
+                    self._finishing = False
+                    raise
+                with self._lock:
+                    self._finishing = False
+                    # Canceled while downloading: the result is dropped
+                    if self._error is None:
+                        self._result = result
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+    def wait(self, timeout: Optional[float] = None) -> Any:
+        """
+        Block until the task finishes and return its result.
+
+        Args:
+            timeout: Maximum seconds to wait, None to wait forever. Unlike a
+                     deadline (:meth:`set_timeout`), running out of it leaves
+                     the task running.
+
+        Raises:
+            TimeoutError: If the task did not finish within timeout
+        """
+        for _ in poll_many([self], timeout=timeout):
+            pass
+        return self.result()
+
+
+class TaskPoller:
+    """
+    Heap-scheduled poller that more handles can be added to while it runs.
+
+    :func:`poll_many` covers a fixed set of handles; the batch APIs use a
+    poller directly to keep a bounded window of tasks in flight.
+    """
+
+    def __init__(self):
+        self._queue: List[Tuple[float, int, TaskHandle]] = []
+        self._counter = itertools.count()
+        # Handles that finished (or were canceled) but were not returned yet
+        self._done: Deque[TaskHandle] = deque()
+        self._watching = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+
+    def __len__(self) -> int:
+        return self._watching
+
+    def add(self, handle: TaskHandle) -> None:
+        """Start watching a handle."""
+        self._watching += 1
+        if not handle.done:
+            heapq.heappush(self._queue, (handle.next_poll_at, next(self._counter), handle))
+        handle.add_done_callback(self._finished)
+
+    def _finished(self, handle: TaskHandle) -> None:
+        # Also called from other threads, by cancel()
+        with self._lock:
+            self._done.append(handle)
+        self._wakeup.set()
+
+    def next_done(self, deadline: Optional[float] = None) -> TaskHandle:
+        """
+        Block until one of the watched handles finishes and return it.
+
+        Args:
+            deadline: time.monotonic() value to give up at, None to wait forever
+
+        Raises:
+            TimeoutError: If no handle finished before the deadline
+            IndexError: If no handles are being watched
+        """
+        while True:
+            with self._lock:
+                if self._done:
+                    self._watching -= 1
+                    return self._done.popleft()
+
+            # Handles canceled while waiting were returned through _done already
+            while self._queue and self._queue[0][2].done:
+                heapq.heappop(self._queue)
+            if not self._queue:
+                raise IndexError("No tasks to poll")
+
+            poll_at, _, handle = self._queue[0]
+            now = time.monotonic()
+
+            if deadline is not None and now >= deadline:
+                raise TimeoutError(f"{self._watching} task(s) still running")
+
+            if poll_at > now:
+                wake_at = poll_at if deadline is None else min(poll_at, deadline)
+                self._wakeup.wait(wake_at - now)
+                self._wakeup.clear()
+                continue
+
+            heapq.heappop(self._queue)
+            handle.refresh()
+            if not handle.done:
+                heapq.heappush(self._queue, (handle.next_poll_at, next(self._counter), handle))
+
+
+def poll_many(handles: Iterable[TaskHandle], timeout: Optional[float] = None) -> Iterator[TaskHandle]:
+    """
+    Poll many tasks from the calling thread and yield each one as it finishes.
+
+    Status checks are scheduled per handle, so image tasks are checked every
+    few seconds while long videos are only checked a couple of times a minute.
+
+    Args:
+        handles: Task handles to wait for
+        timeout: Maximum seconds to wait for all handles, None to wait forever
+
+    Yields:
+        Handles in completion order
+
+    Raises:
+        TimeoutError: If some tasks are still running when timeout expires
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    poller = TaskPoller()
+    for handle in handles:
+        poller.add(handle)
+
+    while poller:
+        try:
+            yield poller.next_done(deadline)
+        except TimeoutError:
+            raise TimeoutError(f"{len(poller)} task(s) still running after {timeout} seconds")
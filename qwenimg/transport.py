@@ -0,0 +1,253 @@
+"""
+Pooled HTTP transport for downloading generation results.
+
+Result images and videos are served from OSS. Reusing keep-alive connections
+from one pool saves a TCP + TLS handshake per file, and explicit timeouts with
+retries keep a stalled socket from hanging the caller forever.
+"""
+
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+from .config import (
+    HTTP_POOL_SIZE,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_READ_TIMEOUT,
+    HTTP_MAX_RETRIES,
+    HTTP_RETRY_BACKOFF,
+    HTTP_RETRY_STATUS_CODES,
+)
+
+
+class HttpTransport:
+    """
+    Shared, thread-safe HTTP connection pool with timeouts and retries.
+
+    Examples:
+        >>> transport = HttpTransport(pool_size=50, read_timeout=120)
+        >>> client = QwenImg(transport=transport)
+    """
+
+    def __init__(
+        self,
+        pool_size: int = HTTP_POOL_SIZE,
+        connect_timeout: float = HTTP_CONNECT_TIMEOUT,
+        read_timeout: float = HTTP_READ_TIMEOUT,
+        max_retries: int = HTTP_MAX_RETRIES,
+        backoff: float = HTTP_RETRY_BACKOFF,
+        http2: bool = False,
+    ):
+        """
+        Args:
+            pool_size: Maximum number of keep-alive connections per host
+            connect_timeout: Seconds to wait for a connection to be established
+            read_timeout: Seconds to wait between bytes from the server
+            max_retries: Retries after a connection error or retryable status
+            backoff: Base delay in seconds; doubles every retry, with full jitter
+            http2: Use HTTP/2 through httpx so concurrent downloads from one
+                   host share a single connection (requires ``httpx[http2]``)
+        """
+        self.pool_size = pool_size
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.http2 = http2
+
+        if http2:
+            try:
+                import httpx
+            except ImportError:
+                raise ImportError(
+                    "HTTP/2 support requires httpx with the http2 extra. "
+                    "Install it with: pip install 'httpx[http2]'"
+                )
+            self._client = httpx.Client(
+                http2=True,
+                timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+                limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+                follow_redirects=True,
+            )
+            self._retry_errors = (httpx.TransportError,)
+        else:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            self._client = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            self._client.mount("http://", adapter)
+            self._client.mount("https://", adapter)
+            self._retry_errors = (
+                requests.ConnectionError,
+                requests.Timeout,
+                requests.exceptions.ChunkedEncodingError,
+            )
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        self._client.close()
+
+    def __enter__(self) -> "HttpTransport":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _sleep_before_retry(self, attempt: int) -> None:
+        # Full jitter: spreads retries from many workers hitting the same outage
+        time.sleep(random.uniform(0, self.backoff * (2 ** attempt)))
+
+    def _send(self, url: str, headers: Optional[Dict[str, str]], stream: bool):
+        if self.http2:
+            request = self._client.build_request("GET", url, headers=headers)
+            return self._client.send(request, stream=stream)
+        return self._client.get(url, headers=headers, stream=stream, timeout=self.timeout)
+
+    @contextmanager
+    def stream(self, url: str, headers: Optional[Dict[str, str]] = None) -> Iterator[object]:
+        """
+        Open a GET request, retrying connection errors and retryable statuses.
+
+        Args:
+            url: URL to fetch
+            headers: Extra request headers (e.g. Range)
+
+        Yields:
+            The response, whose body has not been read yet
+        """
+        attempt = 0
+        while True:
+            try:
+                response = self._send(url, headers, stream=True)
+            except self._retry_errors:
+                if attempt >= self.max_retries:
+                    raise
+            else:
+                if response.status_code not in HTTP_RETRY_STATUS_CODES or attempt >= self.max_retries:
+                    break
+                response.close()
+
+            self._sleep_before_retry(attempt)
+            attempt += 1
+
+        try:
+            response.raise_for_status()
+            yield response
+        finally:
+            response.close()
+
+    def iter_chunks(self, response, chunk_size: int) -> Iterator[bytes]:
+        """Iterate over the body of a response opened with :meth:`stream`."""
+        if self.http2:
+            return response.iter_bytes(chunk_size)
+        return response.iter_content(chunk_size=chunk_size)
+
+    def get_bytes(self, url: str) -> bytes:
+        """
+        Download the content of a URL into memory.
+
+        Connection resets while reading the body are retried as well.
+
+        Args:
+            url: URL to fetch
+
+        Returns:
+            Response body
+        """
+        # One retry loop covers connecting, retryable statuses and reading the
+        # body, so a failing URL is tried at most max_retries + 1 times
+        attempt = 0
+        while True:
+            try:
+                response = self._send(url, None, stream=True)
+                try:
+                    if response.status_code not in HTTP_RETRY_STATUS_CODES or attempt >= self.max_retries:
+                        response.raise_for_status()
+                        return response.read() if self.http2 else response.content
+                finally:
+                    response.close()
+            except self._retry_errors:
+                if attempt >= self.max_retries:
+                    raise
+            self._sleep_before_retry(attempt)
+            attempt += 1
+
+    def fetch_range(
+        self, url: str, start: int, end: int, write: Callable[[bytes], None], chunk_size: int = 1024 * 1024
+    ) -> int:
+        """
+        Download bytes start..end (inclusive) of a URL, passing each chunk to write.
+
+        A dropped connection or retryable status is retried from the first
+        byte not yet received, so no chunk is passed twice.
+
+        Args:
+            url: URL to fetch
+            start: First byte of the range
+            end: Last byte of the range
+            write: Called with every chunk, in order
+            chunk_size: Bytes read per chunk
+
+        Returns:
+            Number of bytes received
+
+        Raises:
+            ValueError: If the server ignores the Range request
+        """
+        received = 0
+        attempt = 0
+        while True:
+            try:
+                response = self._send(url, {"Range": f"bytes={start + received}-{end}"}, stream=True)
+                try:
+                    if response.status_code not in HTTP_RETRY_STATUS_CODES or attempt >= self.max_retries:
+                        response.raise_for_status()
+                        if response.status_code != 206:
+                            raise ValueError(f"Server ignored the Range request for {url}")
+                        for chunk in self.iter_chunks(response, chunk_size):
+                            write(chunk)
+                            received += len(chunk)
+                        return received
+                finally:
+                    response.close()
+            except self._retry_errors:
+                if attempt >= self.max_retries:
+                    raise
+            self._sleep_before_retry(attempt)
+            attempt += 1
+
+    def download(self, url: str, filepath: str, chunk_size: int = 1024 * 1024) -> int:
+        """
+        Stream a URL to a file.
+
+        Args:
+            url: URL to fetch
+            filepath: Destination file path
+            chunk_size: Bytes written per chunk
+
+        Returns:
+            Number of bytes written
+        """
+        written = 0
+        with self.stream(url) as response:
+            with open(filepath, "wb") as f:
+                for chunk in self.iter_chunks(response, chunk_size):
+                    f.write(chunk)
+                    written += len(chunk)
+        return written
+
+
+_default_transport: Optional[HttpTransport] = None
+_default_transport_lock = threading.Lock()
+
+
+def get_default_transport() -> HttpTransport:
+    """Get the process-wide transport used when no transport is passed."""
+    global _default_transport
+    if _default_transport is None:
+        with _default_transport_lock:
+            if _default_transport is None:
+                _default_transport = HttpTransport()
+    return _default_transport
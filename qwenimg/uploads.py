@@ -0,0 +1,194 @@
+"""
+Upload-once cache of local task inputs.
+
+A local image or audio file is passed to DashScope as a ``file://`` URL, and
+the SDK uploads it to temporary OSS storage on every call. The upload returns
+an ``oss://`` URL that stays valid for 48 hours, so the same file can be sent
+as that URL to later tasks instead of being uploaded again.
+
+Uploaded URLs are indexed in SQLite by the file's content hash, so the cache
+survives restarts and can be shared by several processes.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional
+
+from .config import CACHE_DIR, UPLOAD_URL_TTL
+from .utils import file_digest
+
+# Task parameters that may hold a local file to upload
+UPLOAD_PARAMS = ("img_url", "audio_url")
+
+
+def upload_local_file(file_url: str, model: str, api_key: str, base_address: Optional[str] = None) -> str:
+    """
+    Upload a local file to DashScope's temporary storage.
+
+    Args:
+        file_url: ``file://`` URL of the local file
+        model: Model the file is an input of
+        api_key: DashScope API key
+        base_address: Endpoint to get the upload policy from, None for the
+                      SDK's global endpoint
+
+    Returns:
+        ``oss://`` URL of the uploaded file
+    """
+    from dashscope.common.error import UploadFileException
+    from dashscope.utils.oss_utils import OssUtils, upload_file
+
+    if base_address is None:
+        return upload_file(model, file_url, api_key)
+    # upload_file() has no endpoint argument, the lower-level upload does
+    url, _ = OssUtils.upload(
+        model=model, file_path=file_url[len("file://"):], api_key=api_key, base_address=base_address
+    )
+    if url is None:
+        raise UploadFileException(f"Uploading file: {file_url} failed")
+    return url
+
+
+def local_inputs(params: dict) -> List[str]:
+    """Get the names of the task parameters that hold a local ``file://`` input."""
+    return [
+        name for name in UPLOAD_PARAMS
+        if isinstance(params.get(name), str) and params[name].startswith("file://")
+    ]
+
+
+def upload_inputs(params: dict, upload: Callable[[str, str, str, Optional[str]], str] = upload_local_file) -> dict:
+    """
+    Replace the local file inputs of task parameters with uploaded URLs.
+
+    Args:
+        params: Task parameters
+        upload: Uploads one file, see :func:`upload_local_file`
+
+    Returns:
+        The parameters, copied if any input was replaced
+    """
+    local = local_inputs(params)
+    if not local:
+        return params
+    params = dict(params)
+    for name in local:
+        params[name] = upload(params[name], params["model"], params["api_key"], params.get("base_address"))
+    return params
+
+
+class UploadCache:
+    """
+    Index of files already uploaded to DashScope's temporary storage.
+
+    Examples:
+        >>> client = QwenImg(upload_cache=True)
+        >>> client.image_to_video("cat.png", prompt="猫在奔跑")   # uploads cat.png
+        >>> client.image_to_video("cat.png", prompt="猫在睡觉")   # reuses the upload
+    """
+
+    def __init__(self, path: str = f"{CACHE_DIR}/uploads.sqlite3", ttl: float = UPLOAD_URL_TTL):
+        """
+        Args:
+            path: SQLite database file
+            ttl: Seconds an uploaded URL is reused for; keep it below the
+                 48 hour lifetime of DashScope's temporary files
+        """
+        self.path = Path(path).expanduser()
+        self.ttl = ttl
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS uploads ("
+                " digest TEXT NOT NULL,"
+                " model TEXT NOT NULL,"
+                " account TEXT NOT NULL,"
+                " url TEXT NOT NULL,"
+                " uploaded_at REAL NOT NULL,"
+                " PRIMARY KEY (digest, model, account))"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        db = sqlite3.connect(str(self.path), timeout=30)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def get(self, digest: str, model: str, api_key: str, base_address: Optional[str] = None) -> Optional[str]:
+        """
+        Look up an unexpired upload of a file.
+
+        Args:
+            digest: SHA-256 hex digest of the file content
+            model: Model the file was uploaded for
+            api_key: API key the file was uploaded with
+            base_address: Endpoint the file was uploaded through
+
+        Returns:
+            The ``oss://`` URL, or None if the file must be uploaded
+        """
+        cutoff = time.time() - self.ttl
+        with self._lock, self._connect() as db:
+            row = db.execute(
+                "SELECT url FROM uploads WHERE digest = ? AND model = ? AND account = ? AND uploaded_at > ?",
+                (digest, model, _account(api_key, base_address), cutoff),
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, digest: str, model: str, api_key: str, url: str, base_address: Optional[str] = None) -> None:
+        """Record the URL a file was uploaded to."""
+        now = time.time()
+        with self._lock, self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO uploads (digest, model, account, url, uploaded_at) VALUES (?, ?, ?, ?, ?)",
+                (digest, model, _account(api_key, base_address), url, now),
+            )
+            db.execute("DELETE FROM uploads WHERE uploaded_at <= ?", (now - self.ttl,))
+
+    def upload(self, file_url: str, model: str, api_key: str, base_address: Optional[str] = None) -> str:
+        """
+        Get the uploaded URL of a local file, uploading it if needed.
+
+        Args:
+            file_url: ``file://`` URL of the local file
+            model: Model the file is an input of
+            api_key: DashScope API key
+            base_address: Endpoint of the region the file is used in
+
+        Returns:
+            ``oss://`` URL of the uploaded file
+        """
+        digest = file_digest(file_url[len("file://"):])
+        url = self.get(digest, model, api_key, base_address)
+        if url is None:
+            url = upload_local_file(file_url, model, api_key, base_address)
+            self.put(digest, model, api_key, url, base_address)
+        return url
+
+    def prepare(self, params: dict) -> dict:
+        """
+        Replace the local file inputs of task parameters with uploaded URLs.
+
+        Returns:
+            The parameters, copied if any input was replaced
+        """
+        return upload_inputs(params, self.upload)
+
+    def clear(self) -> None:
+        """Forget every recorded upload."""
+        with self._lock, self._connect() as db:
+            db.execute("DELETE FROM uploads")
+
+
+def _account(api_key: str, base_address: Optional[str] = None) -> str:
+    # Uploads belong to the account in one region; store a fingerprint, not the key itself
+    return hashlib.sha256(f"{api_key}@{base_address or ''}".encode("utf-8")).hexdigest()[:16]
@@ -3,13 +3,88 @@ Utility functions for QwenImg.
 """
 
 import os
-import base64
+import binascii
+import hashlib
 import mimetypes
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional, Tuple
 from urllib.parse import urlparse, unquote
 from pathlib import PurePosixPath
-import requests
+
+from .config import BASE64_CHUNK_SIZE, FILE_DIGEST_CACHE_BYTES, PREPARED_INPUT_CACHE_BYTES
+from .transport import HttpTransport, get_default_transport
+
+
+class _FileMemo:
+    """
+    Bounded LRU of values derived from local files.
+
+    Entries are keyed by the file's resolved path, size and modification
+    time, so editing or replacing a file invalidates what was derived from it.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple, str]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, kind: str, file_path: str, compute: Callable[[str], str]) -> str:
+        path = Path(file_path).resolve()
+        stat = path.stat()
+        key = (kind, str(path), stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                return value
+
+        value = compute(str(path))
+        if len(value) > self.max_bytes:
+            return value
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = value
+                self._size += len(value)
+                self._evict()
+        return value
+
+    def resize(self, max_bytes: int) -> None:
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def _evict(self) -> None:
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+# Prepared inputs, so the same source file used for several tasks is only
+# read and encoded (or hashed) once
+_data_uris = _FileMemo(PREPARED_INPUT_CACHE_BYTES)
+_file_digests = _FileMemo(FILE_DIGEST_CACHE_BYTES)
+
+
+def set_data_uri_cache_size(max_bytes: int) -> None:
+    """
+    Keep up to max_bytes of encoded data URIs for reuse.
+
+    A data URI is a third larger than its file and stays in memory for the
+    life of the process, so this is off (0) by default. Turn it on when the
+    same local images are sent with ``use_base64=True`` many times.
+
+    Args:
+        max_bytes: Total size of the kept data URIs; 0 disables keeping them
+    """
+    _data_uris.resize(max_bytes)
 
 
 def get_api_key(api_key: Optional[str] = None) -> str:
@@ -66,10 +141,44 @@ def encode_image_to_base64(file_path: str) -> str:
     if not mime_type or not mime_type.startswith("image/"):
         raise ValueError(f"Unsupported or unrecognized image format: {file_path}")
 
-    with open(file_path, "rb") as f:
-        encoded = base64.b64encode(f.read()).decode('utf-8')
+    return _data_uris.get("base64", file_path, _data_uri_encoder(mime_type))
+
+
+def _data_uri_encoder(mime_type: str) -> Callable[[str], str]:
+    """Get a function that encodes a file as a data URI of the given MIME type."""
+    def encode(file_path: str) -> str:
+        # Encode chunk by chunk (chunk size is a multiple of 3, so chunks
+        # encode without padding) into one buffer sized for the whole data
+        # URI; the raw file is never held in memory, and the only copy is
+        # the final conversion to str
+        prefix = f"data:{mime_type};base64,".encode("ascii")
+        buffer = bytearray(len(prefix) + 4 * -(-os.path.getsize(file_path) // 3))
+        buffer[:len(prefix)] = prefix
+        end = len(prefix)
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(BASE64_CHUNK_SIZE), b""):
+                encoded = binascii.b2a_base64(chunk, newline=False)
+                buffer[end:end + len(encoded)] = encoded
+                end += len(encoded)
+        with memoryview(buffer)[:end] as view:
+            return str(view, "ascii")
+    return encode
+
+
+def file_digest(file_path: str) -> str:
+    """
+    Get the SHA-256 hex digest of a file's content.
+
+    The digest is remembered until the file changes.
+    """
+    def digest(path: str) -> str:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+        return h.hexdigest()
 
-    return f"data:{mime_type};base64,{encoded}"
+    return _file_digests.get("sha256", file_path, digest)
 
 
 def prepare_image_url(image: str, use_base64: bool = False) -> str:
@@ -103,12 +212,40 @@ def prepare_image_url(image: str, use_base64: bool = False) -> str:
         return f"file://{path.resolve()}"
 
 
-def download_image(url: str, output_dir: str = "./outputs") -> str:
+def filename_from_url(url: str) -> str:
     """
-    Download image from URL.
+    Extract the file name from a result URL.
+
+    Args:
+        url: Image or video URL
+
+    Returns:
+        Last path component of the URL
+    """
+    return PurePosixPath(unquote(urlparse(url).path)).parts[-1]
+
+
+def fetch_bytes(url: str, transport: Optional[HttpTransport] = None) -> bytes:
+    """
+    Download the content of a URL into memory.
 
     Args:
         url: Image URL
+        transport: HTTP transport to use (default: the shared process-wide pool)
+
+    Returns:
+        Response body
+    """
+    return (transport or get_default_transport()).get_bytes(url)
+
+
+def save_image(data: bytes, url: str, output_dir: str = "./outputs") -> str:
+    """
+    Save downloaded image bytes under the file name taken from its URL.
+
+    Args:
+        data: Image file content
+        url: Image URL the content was downloaded from
         output_dir: Directory to save image
 
     Returns:
@@ -116,20 +253,32 @@ def download_image(url: str, output_dir: str = "./outputs") -> str:
     """
     Path(output_dir).mkdir(parents=True, exist_ok=True)
 
-    # Extract filename from URL
-    filename = PurePosixPath(unquote(urlparse(url).path)).parts[-1]
-    filepath = Path(output_dir) / filename
-
-    # Download and save
-    response = requests.get(url)
-    response.raise_for_status()
-
+    filepath = Path(output_dir) / filename_from_url(url)
     with open(filepath, 'wb') as f:
-        f.write(response.content)
+        f.write(data)
 
     return str(filepath)
 
 
+def download_image(
+    url: str,
+    output_dir: str = "./outputs",
+    transport: Optional[HttpTransport] = None,
+) -> str:
+    """
+    Download image from URL.
+
+    Args:
+        url: Image URL
+        output_dir: Directory to save image
+        transport: HTTP transport to use (default: the shared process-wide pool)
+
+    Returns:
+        Path to saved image
+    """
+    return save_image(fetch_bytes(url, transport), url, output_dir)
+
+
 def format_size(size: str) -> str:
     """
     Format and validate size parameter.
@@ -38,6 +38,7 @@ setup(
         "dashscope>=1.14.0",
         "Pillow>=9.0.0",
         "requests>=2.25.0",
+        "aiohttp>=3.8.0",
         "python-dotenv>=0.19.0",
     ],
     extras_require={
@@ -48,6 +49,11 @@ setup(
             "mypy>=0.950",
         ],
     },
+    entry_points={
+        "console_scripts": [
+            "qwenimg=qwenimg.cli:main",
+        ],
+    },
     keywords="qwen alibaba aliyun image video generation ai ml dashscope",
     project_urls={
         "Bug Reports": "https://github.com/cclank/qwenimg/issues",
@@ -0,0 +1,30 @@
+"""Shared fixtures: an offline DashScope mock server and an isolated cache directory."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+from mock_server import MockDashScope  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def fast_polling(monkeypatch):
+    """Poll every few milliseconds instead of every few seconds."""
+    import qwenimg.aio
+    import qwenimg.tasks
+
+    intervals = lambda kind, params: (0.02, 0.05)
+    monkeypatch.setattr(qwenimg.aio, "poll_intervals", intervals)
+    monkeypatch.setattr(qwenimg.tasks, "poll_intervals", intervals)
+
+
+@pytest.fixture
+def mock_server():
+    """A fast mock DashScope server; tests tweak its settings as needed."""
+    with MockDashScope(generation_time=0.2, queue_time=0.05, image_bytes=2000, seed=1) as server:
+        yield server
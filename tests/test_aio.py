@@ -0,0 +1,21 @@
+"""AsyncQwenImg lifecycle."""
+
+import asyncio
+
+from qwenimg import AsyncQwenImg
+
+
+def test_close_releases_every_http_session(mock_server):
+    from dashscope.api_entities import aio_session
+
+    async def run():
+        async with AsyncQwenImg(api_key="sk-test", endpoint=mock_server.endpoint) as client:
+            await client.text_to_image("a cat", save=False, return_results=True)
+            sdk_session = aio_session._aio_sessions.get(asyncio.get_running_loop())
+            own_session = client._session
+        return sdk_session, own_session
+
+    sdk_session, own_session = asyncio.run(run())
+
+    assert own_session.closed
+    assert sdk_session is None or sdk_session.closed
@@ -0,0 +1,104 @@
+"""Reproducible requests are served from the result cache without a new task."""
+
+import os
+import time
+
+from qwenimg import QwenImg
+from qwenimg.cache import ResultCache
+
+
+def client_for(server, tmp_path, **kwargs):
+    return QwenImg(
+        api_key="sk-test", endpoint=server.endpoint, cache=ResultCache(str(tmp_path / "cache")), **kwargs
+    )
+
+
+def test_reproducible_images_are_served_from_cache(mock_server, tmp_path):
+    client = client_for(mock_server, tmp_path)
+
+    first = client.text_to_image(
+        "a cat", n=2, seed=42, prompt_extend=False, save=False, return_results=True
+    )
+    second = client.text_to_image(
+        "a cat", n=2, seed=42, prompt_extend=False, save=False, return_results=True
+    )
+
+    assert mock_server.stats["submitted"] == 1
+    assert [r.data for r in second] == [r.data for r in first]
+    assert [r.url for r in second] == [r.url for r in first]
+    assert all(r.seed == 42 for r in second)
+
+
+def test_requests_that_vary_are_not_cached(mock_server, tmp_path):
+    client = client_for(mock_server, tmp_path)
+
+    for _ in range(2):
+        client.text_to_image("a cat", save=False, return_results=True)            # random seed
+    for _ in range(2):
+        client.text_to_image("a cat", seed=42, save=False, return_results=True)   # prompt_extend
+
+    assert mock_server.stats["submitted"] == 4
+
+
+def test_reproducible_video_is_served_from_cache(mock_server, tmp_path):
+    mock_server.video_generation_time = 0.1
+    client = client_for(mock_server, tmp_path)
+
+    first = client.text_to_video("a cat", seed=7)
+    second = client.text_to_video("a cat", seed=7)
+
+    assert mock_server.stats["submitted"] == 1
+    assert second.path == first.path and os.path.getsize(second.path) == len(mock_server.video)
+    assert second.url == first.url
+    assert second.seed == 7
+
+
+def test_cached_video_is_copied_without_downloading_it_again(mock_server, tmp_path):
+    mock_server.video_generation_time = 0.1
+    client = client_for(mock_server, tmp_path)
+    client.text_to_video("a cat", seed=7)
+    downloads = mock_server.stats["downloads"]
+
+    video = client.text_to_video("a cat", seed=7)
+    path = client.download_video(video, str(tmp_path / "out" / "cat.mp4"))
+
+    assert mock_server.stats["downloads"] == downloads
+    assert os.path.getsize(path) == len(mock_server.video) and video.path == path
+
+
+def test_cache_without_urls_is_upgraded(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    with cache._connect() as db:
+        db.execute("DROP TABLE entries")
+        db.execute(
+            "CREATE TABLE entries (key TEXT PRIMARY KEY, files TEXT NOT NULL, size INTEGER NOT NULL,"
+            " created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+    (path,) = ResultCache(str(tmp_path)).put("a" * 64, [("a.png", b"x")])
+
+    assert ResultCache(str(tmp_path)).get_entry("a" * 64) == [(path, None)]
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=250)
+    cache.put("a" * 64, [("a.png", b"x" * 100)])
+    time.sleep(0.01)
+    cache.put("b" * 64, [("b.png", b"x" * 100)])
+    time.sleep(0.01)
+    assert cache.get("a" * 64) is not None      # "a" is now the most recently used
+
+    cache.put("c" * 64, [("c.png", b"x" * 100)])
+
+    assert cache.get("b" * 64) is None
+    assert cache.get("a" * 64) is not None and cache.get("c" * 64) is not None
+
+
+def test_expired_entries_are_dropped(tmp_path):
+    cache = ResultCache(str(tmp_path), max_age=0.05)
+    (path,) = cache.put("a" * 64, [("a.png", b"x")])
+    assert cache.get("a" * 64) == [path]
+
+    time.sleep(0.1)
+
+    assert cache.get("a" * 64) is None
+    assert not os.path.exists(path)
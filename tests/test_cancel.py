@@ -0,0 +1,143 @@
+"""Canceling task handles and giving them deadlines."""
+
+import threading
+import time
+from concurrent.futures import CancelledError
+
+import pytest
+
+import qwenimg.client
+from qwenimg import QwenImg
+
+
+def client_for(server):
+    return QwenImg(api_key="sk-test", endpoint=server.endpoint)
+
+
+def submit(client, **kwargs):
+    return client.submit_text_to_image("a cat", n=2, save=False, return_results=True, **kwargs)
+
+
+def test_pending_task_is_canceled_remotely(mock_server):
+    mock_server.queue_time = 5
+    handle = submit(client_for(mock_server))
+
+    assert handle.cancel()
+
+    assert handle.status == "CANCELED" and handle.done
+    assert mock_server.stats["canceled"] == 1
+    with pytest.raises(CancelledError):
+        handle.result()
+    # Canceling again changes nothing
+    assert not handle.cancel()
+    assert mock_server.stats["canceled"] == 1
+
+
+def test_running_task_is_only_given_up_locally(mock_server):
+    mock_server.queue_time = 0
+    mock_server.generation_time = 5
+    handle = submit(client_for(mock_server))
+    while handle.refresh() != "RUNNING":
+        time.sleep(0.02)
+
+    assert not handle.cancel()
+
+    assert mock_server.stats["canceled"] == 0
+    with pytest.raises(CancelledError):
+        handle.wait()
+
+
+def test_cancel_wakes_a_waiting_thread(mock_server):
+    mock_server.queue_time = 5
+    handle = submit(client_for(mock_server))
+    errors = []
+
+    def wait():
+        try:
+            handle.wait()
+        except CancelledError as e:
+            errors.append(e)
+
+    waiter = threading.Thread(target=wait)
+    waiter.start()
+    time.sleep(0.1)
+    handle.cancel()
+    waiter.join(1)
+
+    assert not waiter.is_alive() and len(errors) == 1
+
+
+def test_cancel_does_not_wait_for_downloads(mock_server, monkeypatch):
+    fetch_bytes = qwenimg.client.fetch_bytes
+    downloading = threading.Event()
+
+    def slow_fetch_bytes(*args, **kwargs):
+        downloading.set()
+        time.sleep(0.5)
+        return fetch_bytes(*args, **kwargs)
+    monkeypatch.setattr(qwenimg.client, "fetch_bytes", slow_fetch_bytes)
+    handle = submit(client_for(mock_server))
+    errors = []
+
+    def wait():
+        try:
+            handle.wait()
+        except CancelledError as e:
+            errors.append(e)
+
+    waiter = threading.Thread(target=wait)
+    waiter.start()
+    assert downloading.wait(5)
+    started = time.monotonic()
+    handle.cancel()
+
+    assert time.monotonic() - started < 0.3
+    waiter.join(2)
+    # The downloads already started end, but their result is dropped
+    assert len(errors) == 1
+    with pytest.raises(CancelledError):
+        handle.result()
+
+
+def test_result_is_kept_once_returned(mock_server):
+    handle = submit(client_for(mock_server))
+    images = handle.wait()
+
+    assert not handle.cancel()
+
+    assert handle.result() is images
+
+
+def test_deadline_cancels_a_pending_task(mock_server):
+    mock_server.queue_time = 5
+    client = client_for(mock_server)
+
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        client.text_to_image("a cat", save=False, timeout=0.3)
+
+    assert time.monotonic() - started < 2
+    assert mock_server.stats["canceled"] == 1
+
+
+def test_set_timeout_on_a_handle(mock_server):
+    mock_server.queue_time = 5
+    handle = submit(client_for(mock_server))
+
+    handle.set_timeout(0.3)
+
+    with pytest.raises(TimeoutError, match="did not finish within 0.3 seconds"):
+        handle.wait()
+    assert handle.status == "CANCELED"
+    assert mock_server.stats["canceled"] == 1
+
+
+def test_wait_timeout_leaves_the_task_running(mock_server):
+    mock_server.queue_time = 0.3
+    handle = submit(client_for(mock_server))
+
+    with pytest.raises(TimeoutError):
+        handle.wait(timeout=0.1)
+
+    assert len(handle.wait()) == 2
+    assert mock_server.stats["canceled"] == 0
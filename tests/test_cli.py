@@ -0,0 +1,77 @@
+"""The batch runner: journaled runs that resume, with downloads off the polling path."""
+
+import time
+
+from qwenimg import QwenImg
+from qwenimg.cli import run_jobs
+from qwenimg.journal import SUCCEEDED, Journal, job_spec
+from qwenimg.keys import key_fingerprint
+
+
+def video_jobs(count):
+    return [(f"job-{i}", "text_to_video", {"prompt": f"waves {i}"}) for i in range(count)]
+
+
+def test_run_jobs_downloads_videos_and_journals_them(mock_server, tmp_path):
+    mock_server.video_generation_time = 0.1
+    client = QwenImg(api_key="sk-test", endpoint=mock_server.endpoint)
+    journal = Journal(str(tmp_path / "journal.sqlite3"))
+
+    counts = run_jobs(client, iter(video_jobs(3)), journal, 2, str(tmp_path / "out"), log=lambda line: None)
+
+    assert counts[SUCCEEDED] == 3
+    assert journal.counts() == {SUCCEEDED: 3}
+    for entry in journal.entries(SUCCEEDED):
+        with open(entry.outputs[0], "rb") as f:
+            assert f.read() == mock_server.video
+
+
+def test_slow_downloads_do_not_hold_up_submissions(mock_server, tmp_path):
+    mock_server.video_generation_time = 0.1
+    client = QwenImg(api_key="sk-test", endpoint=mock_server.endpoint)
+    submitted_during_download = []
+    download_video = client.download_video
+
+    def slow_download(video, path):
+        time.sleep(0.5)
+        submitted_during_download.append(mock_server.stats["submitted"])
+        return download_video(video, path)
+
+    client.download_video = slow_download
+    journal = Journal(str(tmp_path / "journal.sqlite3"))
+
+    counts = run_jobs(client, iter(video_jobs(4)), journal, 1, str(tmp_path / "out"), log=lambda line: None)
+
+    assert counts[SUCCEEDED] == 4
+    # With concurrency 1, later jobs were submitted while the first video downloaded
+    assert submitted_during_download[0] > 1
+
+
+def test_second_run_skips_finished_jobs(mock_server, tmp_path):
+    mock_server.video_generation_time = 0.1
+    client = QwenImg(api_key="sk-test", endpoint=mock_server.endpoint)
+    journal = Journal(str(tmp_path / "journal.sqlite3"))
+    run_jobs(client, iter(video_jobs(2)), journal, 2, str(tmp_path / "out"), log=lambda line: None)
+
+    counts = run_jobs(client, iter(video_jobs(3)), journal, 2, str(tmp_path / "out"), log=lambda line: None)
+
+    assert counts["skipped"] == 2
+    assert counts[SUCCEEDED] == 1
+    assert mock_server.stats["submitted"] == 3
+
+
+def test_submitted_jobs_are_resumed_not_resubmitted(mock_server, tmp_path):
+    mock_server.video_generation_time = 0.1
+    client = QwenImg(api_key="sk-test", endpoint=mock_server.endpoint)
+    journal = Journal(str(tmp_path / "journal.sqlite3"))
+    job_id, kind, kwargs = video_jobs(1)[0]
+    # An earlier run submitted the task and was killed before it finished
+    handle = client.submit_text_to_video(**kwargs)
+    journal.submitted(job_id, kind, job_spec(kind, kwargs), handle.task_id, handle.base_address,
+                      key_fingerprint(handle.api_key))
+
+    counts = run_jobs(client, iter([(job_id, kind, kwargs)]), journal, 1, str(tmp_path / "out"), log=lambda line: None)
+
+    assert counts["resumed"] == 1
+    assert counts[SUCCEEDED] == 1
+    assert mock_server.stats["submitted"] == 1
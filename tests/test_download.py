@@ -0,0 +1,99 @@
+"""Segmented downloads record their progress and resume after an interruption."""
+
+import json
+import os
+
+import pytest
+import requests
+
+import qwenimg.download
+from qwenimg.download import download_file
+from qwenimg.transport import HttpTransport
+
+CHUNK = 64 * 1024
+
+
+class Killed(BaseException):
+    """Stands in for the process being killed: nothing catches it."""
+
+
+class CountingTransport(HttpTransport):
+    """Counts the body bytes read, and can be "killed" after some chunks."""
+
+    def __init__(self, kill_after=None, on_chunk=None):
+        super().__init__(backoff=0)
+        self.received = 0
+        self.chunks = 0
+        self.kill_after = kill_after
+        self.on_chunk = on_chunk
+
+    def iter_chunks(self, response, chunk_size):
+        for chunk in super().iter_chunks(response, chunk_size):
+            if self.kill_after is not None and self.chunks >= self.kill_after:
+                raise Killed()
+            self.chunks += 1
+            self.received += len(chunk)
+            yield chunk
+            if self.on_chunk:
+                self.on_chunk()
+
+
+def read_state(path):
+    with open(f"{path}.part.json") as f:
+        return json.load(f)
+
+
+def test_state_is_saved_while_segments_download(mock_server, tmp_path, monkeypatch):
+    monkeypatch.setattr(qwenimg.download, "DOWNLOAD_STATE_INTERVAL", 0)
+    path = tmp_path / "video.mp4"
+    seen = []
+
+    def check_state():
+        seen.append(sum(done for _, _, done in read_state(path)["ranges"]))
+
+    with CountingTransport(kill_after=40, on_chunk=check_state) as transport:
+        with pytest.raises(Killed):
+            download_file(f"{mock_server.base_url}/files/a.mp4", str(path), transport=transport, chunk_size=CHUNK)
+
+    # Progress reached the state file during the download, not only at the end
+    assert max(seen) > 0
+    assert sum(done for _, _, done in read_state(path)["ranges"]) == 40 * CHUNK
+
+
+def test_interrupted_download_resumes_where_it_stopped(mock_server, tmp_path):
+    path = tmp_path / "video.mp4"
+    url = f"{mock_server.base_url}/files/a.mp4"
+    total = len(mock_server.video)
+
+    with CountingTransport(kill_after=40) as transport:
+        with pytest.raises(Killed):
+            download_file(url, str(path), transport=transport, chunk_size=CHUNK)
+    done = sum(done for _, _, done in read_state(path)["ranges"])
+    assert 0 < done < total
+
+    with CountingTransport() as transport:
+        download_file(url, str(path), transport=transport, chunk_size=CHUNK)
+        assert transport.received == total - done
+
+    assert path.read_bytes() == mock_server.video
+    assert not os.path.exists(f"{path}.part.json")
+
+
+def test_fetch_range_retries_from_the_last_byte_received(mock_server):
+    url = f"{mock_server.base_url}/files/a.mp4"
+    received = bytearray()
+
+    class Dropping(HttpTransport):
+        dropped = False
+
+        def iter_chunks(self, response, chunk_size):
+            for i, chunk in enumerate(super().iter_chunks(response, chunk_size)):
+                if i == 3 and not self.dropped:
+                    Dropping.dropped = True
+                    raise requests.exceptions.ChunkedEncodingError("connection reset")
+                yield chunk
+
+    with Dropping(backoff=0) as transport:
+        transport.fetch_range(url, 1000, 999_999, received.extend, CHUNK)
+
+    assert bytes(received) == mock_server.video[1000:1_000_000]
@@ -0,0 +1,203 @@
+"""Backend job queue: leases, attempt limits and resuming submitted DashScope tasks."""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+# The backend reads DATABASE_URL when its database module is imported
+os.environ.setdefault(
+    "DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="qwenimg-jobs-"), "jobs.db")
+)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+from app import database  # noqa: E402
+from app.jobqueue import JobQueue  # noqa: E402
+from app.models import GenerationTask  # noqa: E402
+from app.tasks import TaskManager  # noqa: E402
+
+from qwenimg import AsyncQwenImg, QwenImg, TaskProgress  # noqa: E402
+from qwenimg.keys import key_fingerprint  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def jobs_db(tmp_path, monkeypatch):
+    """Empty tables for every test, and outputs written under tmp_path."""
+    database.engine.echo = False
+    database.Base.metadata.drop_all(bind=database.engine)
+    database.init_db()
+    monkeypatch.chdir(tmp_path)
+
+
+def add_job(task_id="job-1", **columns):
+    db = database.SessionLocal()
+    try:
+        db.add(GenerationTask(
+            task_id=task_id, task_type="text_to_image", status="pending", prompt="a cat",
+            params={"prompt": "a cat", "n": 2, "seed": 7}, attempts=0, **columns,
+        ))
+        db.commit()
+    finally:
+        db.close()
+
+
+def get_job(task_id="job-1"):
+    db = database.SessionLocal()
+    try:
+        return db.query(GenerationTask).filter(GenerationTask.task_id == task_id).one().to_dict()
+    finally:
+        db.close()
+
+
+def test_claimed_job_is_leased_until_released():
+    add_job()
+    queue = JobQueue(lease_seconds=60)
+
+    jobs, abandoned = queue.claim(10)
+    assert [job.task_id for job in jobs] == ["job-1"] and not abandoned
+    assert jobs[0].attempts == 1
+    assert queue.claim(10) == ([], [])
+    assert queue.counts() == {"queued": 0, "leased": 1}
+
+    queue.release({"job-1": jobs[0].lease_token})
+    jobs, _ = queue.claim(10)
+    # A released lease does not count as an attempt
+    assert [job.attempts for job in jobs] == [1]
+
+
+def test_expired_lease_is_claimed_again():
+    add_job()
+    queue = JobQueue(lease_seconds=0.2)
+
+    first, _ = queue.claim(10)
+    queue.extend({"job-1": first[0].lease_token})
+    assert queue.claim(10) == ([], [])
+
+    time.sleep(0.3)
+    second, _ = queue.claim(10)
+    assert [job.attempts for job in second] == [2]
+    assert second[0].lease_token != first[0].lease_token
+
+
+def test_job_is_abandoned_after_max_attempts():
+    add_job()
+    queue = JobQueue(lease_seconds=0, max_attempts=1)
+
+    jobs, abandoned = queue.claim(10)
+    assert len(jobs) == 1 and not abandoned
+    jobs, abandoned = queue.claim(10)
+    assert not jobs and [job.attempts for job in abandoned] == [2]
+
+
+async def run_jobs(manager, task_id="job-1", timeout=10):
+    """Run the dispatcher until the job is finished."""
+    manager.start()
+    try:
+        deadline = time.monotonic() + timeout
+        while get_job(task_id)["status"] not in ("completed", "failed"):
+            assert time.monotonic() < deadline, "job did not finish"
+            await asyncio.sleep(0.05)
+    finally:
+        await manager.stop()
+    return get_job(task_id)
+
+
+def manager_for(server):
+    manager = TaskManager()
+    manager.qwen_client = AsyncQwenImg(api_key="sk-test", endpoint=server.endpoint)
+    return manager
+
+
+def test_job_records_its_remote_task(mock_server):
+    add_job()
+
+    job = asyncio.run(run_jobs(manager_for(mock_server)))
+
+    assert job["status"] == "completed", job["error_message"]
+    assert len(job["result_urls"]) == 2
+    assert job["remote_task_id"]
+    assert mock_server.stats["submitted"] == 1
+
+
+def test_released_job_resumes_its_remote_task(mock_server):
+    # A previous process submitted the task and exited before it finished
+    handle = QwenImg(api_key="sk-test", endpoint=mock_server.endpoint).submit_text_to_image(
+        "a cat", n=2, seed=7, save=False
+    )
+    add_job(
+        remote_task_id=handle.task_id, remote_base_address=mock_server.endpoint,
+        remote_key=key_fingerprint("sk-test"),
+    )
+
+    job = asyncio.run(run_jobs(manager_for(mock_server)))
+
+    assert job["status"] == "completed", job["error_message"]
+    assert len(job["result_urls"]) == 2
+    assert all(os.path.exists("." + url) for url in job["result_urls"])
+    assert mock_server.stats["submitted"] == 1
+
+
+def test_canceled_remote_task_is_submitted_again(mock_server):
+    mock_server.queue_time = 5
+    handle = QwenImg(api_key="sk-test", endpoint=mock_server.endpoint).submit_text_to_image(
+        "a cat", n=2, seed=7, save=False
+    )
+    assert handle.cancel()
+    mock_server.queue_time = 0.05
+    add_job(
+        remote_task_id=handle.task_id, remote_base_address=mock_server.endpoint,
+        remote_key=key_fingerprint("sk-test"),
+    )
+
+    job = asyncio.run(run_jobs(manager_for(mock_server)))
+
+    assert job["status"] == "completed", job["error_message"]
+    assert mock_server.stats["submitted"] == 2
+    assert job["remote_task_id"] != handle.task_id
+
+
+def test_async_resume_task(mock_server):
+    mock_server.video_generation_time = 0.1
+    handle = QwenImg(api_key="sk-test", endpoint=mock_server.endpoint).submit_text_to_video(
+        "a cat", seed=3
+    )
+
+    async def run():
+        async with AsyncQwenImg(api_key="sk-test", endpoint=mock_server.endpoint) as client:
+            return await client.resume_task("text_to_video", handle.task_id, seed=3)
+
+    video = asyncio.run(run())
+
+    assert video.task_id == handle.task_id
+    assert video.url and video.seed == 3
+    assert mock_server.stats["submitted"] == 1
+
+
+def test_progress_updates_are_written_in_order(monkeypatch):
+    manager = TaskManager()
+    monkeypatch.setattr(manager.queue, "record_remote_task", lambda *args: None)
+    written = []
+
+    async def update_task_progress(task_id, progress=None, status="running", **kwargs):
+        # The first write is the slowest, as a busy database might make it
+        await asyncio.sleep(0.1 if progress == 25.0 else 0)
+        written.append(progress)
+    monkeypatch.setattr(manager, "update_task_progress", update_task_progress)
+
+    async def run():
+        report = manager._progress_reporter("job-1")
+        for done in (1, 2, 3, 4):
+            report(TaskProgress(
+                "text_to_image", "remote-1", "wan2.5-t2i-preview", "RUNNING", 1.0, 0.1,
+                {"TOTAL": 4, "SUCCEEDED": done},
+            ))
+        await asyncio.sleep(0.3)
+
+    asyncio.run(run())
+
+    assert written == [25.0, 50.0, 75.0, 100.0]
@@ -0,0 +1,107 @@
+"""Packed text-to-image requests share one call but keep their own results."""
+
+from concurrent.futures import CancelledError
+
+import pytest
+
+from qwenimg import QwenImg
+
+
+def packing_client(server, window=0.2):
+    return QwenImg(api_key="sk-test", endpoint=server.endpoint, pack_requests=True, pack_window=window)
+
+
+def submit(client, n):
+    return client.submit_text_to_image("a cat", n=n, save=False, return_results=True)
+
+
+def test_each_packed_request_gets_only_its_own_images(mock_server):
+    client = packing_client(mock_server)
+
+    # 1 + 2 + 1 images fill the model's max_batch of 4, so the call goes out at once
+    handles = [submit(client, 1), submit(client, 2), submit(client, 1)]
+    results = [handle.wait() for handle in handles]
+
+    assert mock_server.stats["submitted"] == 1
+    assert len({handle.task_id for handle in handles}) == 1
+    first, second, third = results
+    urls = [first.url] + [r.url for r in second] + [third.url]
+    task_id = handles[0].task_id
+    assert urls == [f"{mock_server.base_url}/files/{task_id}_{i}.png" for i in range(4)]
+
+
+def test_requests_that_do_not_fit_start_a_new_call(mock_server):
+    client = packing_client(mock_server, window=0.05)
+
+    handles = [submit(client, 3), submit(client, 2)]
+    results = [handle.wait() for handle in handles]
+
+    assert mock_server.stats["submitted"] == 2
+    assert [len(r) for r in results] == [3, 2]
+    assert handles[0].task_id != handles[1].task_id
+
+
+def test_failed_packed_task_reaches_every_request(mock_server):
+    mock_server.task_failure_rate = 1.0
+    client = packing_client(mock_server, window=0.05)
+
+    handles = [submit(client, 1), submit(client, 2)]
+
+    for handle in handles:
+        with pytest.raises(RuntimeError):
+            handle.wait()
+    assert mock_server.stats["submitted"] == 1
+
+
+def test_failed_submission_reaches_every_request(mock_server):
+    client = packing_client(mock_server, window=0.05)
+
+    def refuse(params):
+        raise RuntimeError("submission refused")
+    client._packer.submit = refuse
+
+    handles = [submit(client, 1), submit(client, 2)]
+
+    for handle in handles:
+        with pytest.raises(RuntimeError, match="submission refused"):
+            handle.wait()
+
+
+def test_canceled_packed_task_reaches_every_request(mock_server):
+    mock_server.queue_time = 5
+    client = packing_client(mock_server)
+    handles = [submit(client, 2), submit(client, 2)]
+    shared = client._packer.flush(handles[0]._group)
+
+    assert shared.cancel()
+
+    for handle in handles:
+        with pytest.raises(CancelledError):
+            handle.wait(timeout=5)
+    assert mock_server.stats["canceled"] == 1
+
+
+def test_packed_call_is_only_canceled_with_its_last_request(mock_server):
+    mock_server.queue_time = 5
+    client = packing_client(mock_server, window=0.05)
+    first, second = submit(client, 1), submit(client, 1)
+    first.refresh()     # submits the call without waiting out the window
+
+    assert not first.cancel()
+    assert mock_server.stats["canceled"] == 0
+    assert second.refresh() == "PENDING"
+
+    assert second.cancel()
+    assert mock_server.stats["canceled"] == 1
+
+
+def test_packed_call_canceled_before_submission_is_never_sent(mock_server):
+    client = packing_client(mock_server, window=5)
+    first, second = submit(client, 1), submit(client, 1)
+
+    first.cancel()
+    second.cancel()
+
+    with pytest.raises(CancelledError):
+        second.result()
+    assert mock_server.stats["submitted"] == 0
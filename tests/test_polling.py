@@ -0,0 +1,102 @@
+"""Status polling keeps following a task through network errors, up to a bound."""
+
+import asyncio
+
+import aiohttp
+import pytest
+
+import qwenimg.aio
+import qwenimg.tasks
+from qwenimg import AsyncQwenImg, QwenImg
+from qwenimg.hooks import Hooks
+
+
+def failing(fetch, failures, error):
+    """Wrap fetch so its first `failures` calls raise error."""
+    calls = {"n": 0}
+
+    def wrapper(*args, **kwargs):
+        calls["n"] += 1
+        if calls["n"] <= failures:
+            raise error
+        return fetch(*args, **kwargs)
+    return wrapper
+
+
+def failing_async(fetch, failures, error):
+    calls = {"n": 0}
+
+    async def wrapper(*args, **kwargs):
+        calls["n"] += 1
+        if calls["n"] <= failures:
+            raise error
+        return await fetch(*args, **kwargs)
+    return wrapper
+
+
+def test_async_poll_survives_network_errors(mock_server):
+    async def run():
+        async with AsyncQwenImg(api_key="sk-test", endpoint=mock_server.endpoint) as client:
+            client._fetch = failing_async(client._fetch, 3, aiohttp.ClientConnectionError("reset"))
+            return await client.text_to_image("a cat", n=2, save=False, return_results=True)
+
+    assert len(asyncio.run(run())) == 2
+
+
+def test_async_poll_gives_up_after_consecutive_errors(mock_server, monkeypatch):
+    monkeypatch.setattr(qwenimg.aio, "POLL_MAX_FAILURES", 3)
+
+    async def run():
+        async with AsyncQwenImg(api_key="sk-test", endpoint=mock_server.endpoint) as client:
+            client._fetch = failing_async(client._fetch, 100, asyncio.TimeoutError())
+            await client.text_to_image("a cat", n=2, save=False, return_results=True)
+
+    with pytest.raises(RuntimeError, match="3 consecutive network errors"):
+        asyncio.run(run())
+
+
+def test_sync_poll_survives_network_errors(mock_server, monkeypatch):
+    monkeypatch.setattr(qwenimg.tasks, "fetch_task", failing(qwenimg.tasks.fetch_task, 3, ConnectionError()))
+    client = QwenImg(api_key="sk-test", endpoint=mock_server.endpoint)
+
+    handle = client.submit_text_to_image("a cat", n=2, save=False, return_results=True)
+
+    assert len(handle.wait()) == 2
+
+
+def test_sync_poll_gives_up_after_consecutive_errors(mock_server, monkeypatch):
+    monkeypatch.setattr(qwenimg.tasks, "POLL_MAX_FAILURES", 3)
+    monkeypatch.setattr(qwenimg.tasks, "fetch_task", failing(qwenimg.tasks.fetch_task, 100, ConnectionError()))
+    client = QwenImg(api_key="sk-test", endpoint=mock_server.endpoint)
+
+    handle = client.submit_text_to_image("a cat", n=2, save=False, return_results=True)
+
+    with pytest.raises(RuntimeError, match="3 consecutive network errors"):
+        handle.wait()
+
+
+def test_async_cancel_after_failed_status_check_cancels_remotely(mock_server):
+    mock_server.queue_time = 5
+    statuses = []
+
+    class Recorder(Hooks):
+        def on_status(self, event):
+            statuses.append((event.status, event.failure))
+
+    async def run():
+        async with AsyncQwenImg(api_key="sk-test", endpoint=mock_server.endpoint, hooks=Recorder()) as client:
+            task = asyncio.ensure_future(client.text_to_image("a cat", save=False, return_results=True))
+            while not statuses:
+                await asyncio.sleep(0.01)
+            # Status checks now fail with 500; the task is still PENDING on DashScope
+            mock_server.error_rate = 1.0
+            while len(statuses) < 3:
+                await asyncio.sleep(0.01)
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(run())
+
+    assert ("PENDING", "transient") in statuses
+    assert all(status == "PENDING" for status, _ in statuses)
+    assert mock_server.stats["canceled"] == 1
@@ -0,0 +1,59 @@
+"""Tests for qwenimg.preprocess."""
+
+from PIL import Image
+
+from qwenimg.preprocess import normalize_image
+
+
+def test_large_palette_gif_is_normalized(tmp_path):
+    source = tmp_path / "big.gif"
+    Image.new("RGB", (4000, 3000), (200, 30, 60)).quantize(16).save(source)
+
+    output = normalize_image(str(source), "720P", output_dir=str(tmp_path / "out"))
+
+    with Image.open(output) as img:
+        assert img.format == "JPEG"
+        assert img.mode == "RGB"
+        assert img.size == (960, 720)
+
+
+def test_large_bilevel_image_is_normalized(tmp_path):
+    source = tmp_path / "big.png"
+    Image.new("1", (4000, 3000), 1).save(source)
+
+    output = normalize_image(str(source), "720P", output_dir=str(tmp_path / "out"))
+
+    with Image.open(output) as img:
+        assert img.size == (960, 720)
+
+
+def test_small_jpeg_is_returned_unchanged(tmp_path):
+    source = tmp_path / "small.jpg"
+    Image.new("RGB", (640, 480)).save(source)
+
+    assert normalize_image(str(source), "720P", output_dir=str(tmp_path / "out")) == str(source)
+
+
+def test_transparent_pixels_are_composited_onto_the_background(tmp_path):
+    source = tmp_path / "logo.png"
+    Image.new("RGBA", (4000, 3000), (255, 0, 0, 0)).save(source)
+
+    output = normalize_image(str(source), "720P", output_dir=str(tmp_path / "out"))
+
+    with Image.open(output) as img:
+        red, green, blue = img.getpixel((480, 360))
+        assert min(red, green, blue) > 245
+
+
+def test_small_jpeg_with_exif_is_stripped(tmp_path):
+    source = tmp_path / "photo.jpg"
+    exif = Image.Exif()
+    exif[0x010F] = "Camera maker"
+    Image.new("RGB", (640, 480)).save(source, exif=exif)
+
+    output = normalize_image(str(source), "720P", output_dir=str(tmp_path / "out"))
+
+    assert output != str(source)
+    with Image.open(output) as img:
+        assert img.size == (640, 480)
+        assert not img.info.get("exif")
@@ -0,0 +1,72 @@
+"""Token bucket, adaptive concurrency window and per-key limiters."""
+
+import time
+
+import pytest
+
+from qwenimg.ratelimit import ModelLimiter, RateLimiter, TokenBucket
+
+
+def test_token_bucket_allows_a_burst_then_spaces_tokens():
+    bucket = TokenBucket(rate=10, burst=2)
+
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == 0
+    assert bucket.try_acquire() == pytest.approx(0.1, abs=0.02)
+
+    time.sleep(0.12)
+    assert bucket.try_acquire() == 0
+
+
+def test_token_bucket_acquire_waits_for_a_token():
+    bucket = TokenBucket(rate=20, burst=1)
+    bucket.acquire()
+
+    started = time.monotonic()
+    bucket.acquire()
+
+    assert time.monotonic() - started >= 0.04
+
+
+def test_concurrency_window_holds_slots_until_released():
+    limiter = ModelLimiter(qps=1000, max_concurrent_tasks=3)
+
+    assert [limiter.try_acquire() for _ in range(3)] == [0, 0, 0]
+    assert limiter.try_acquire() == ModelLimiter.SLOT_RECHECK_INTERVAL
+    assert limiter.in_flight == 3
+
+    limiter.release()
+    assert limiter.try_acquire() == 0
+
+
+def test_window_shrinks_on_throttling_and_grows_back():
+    limiter = ModelLimiter(qps=1000, max_concurrent_tasks=8)
+    limiter.try_acquire()
+
+    limiter.release(throttled=True)
+    assert limiter.window == 4
+    # One decrease per burst of throttled submissions
+    limiter.try_acquire()
+    limiter.release(throttled=True)
+    assert limiter.window == 4
+
+    # Additive increase: about one slot per window of accepted submissions
+    for _ in range(4):
+        limiter.accepted()
+    assert limiter.window == 4
+    limiter.accepted()
+    assert limiter.window == 5
+    for _ in range(100):
+        limiter.accepted()
+    assert limiter.window == 8
+
+
+def test_keys_with_the_same_masked_form_get_their_own_limiters():
+    rate_limiter = RateLimiter()
+    first, second = "sk-abc" + "1" * 20 + "wxyz", "sk-abc" + "2" * 20 + "wxyz"
+
+    limiter = rate_limiter.for_model("wan2.5-t2i-preview", first)
+
+    assert rate_limiter.for_model("wan2.5-t2i-preview", first) is limiter
+    assert rate_limiter.for_model("wan2.5-t2i-preview", second) is not limiter
+    assert len(rate_limiter.windows()) == 2
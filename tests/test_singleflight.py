@@ -0,0 +1,111 @@
+"""Identical in-flight requests share one task and one download."""
+
+import threading
+import time
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+import pytest
+
+from qwenimg import QwenImg
+
+
+def coalescing_client(server):
+    return QwenImg(api_key="sk-test", endpoint=server.endpoint, coalesce=True)
+
+
+def submit(client, **kwargs):
+    return client.submit_text_to_image("a cat", n=2, save=False, return_results=True, **kwargs)
+
+
+def test_identical_requests_share_one_task_and_download(mock_server):
+    client = coalescing_client(mock_server)
+
+    first, second = submit(client), submit(client)
+    first_images, second_images = first.wait(), second.wait()
+
+    assert mock_server.stats["submitted"] == 1
+    assert mock_server.stats["downloads"] == 2
+    assert first.task_id == second.task_id
+    assert [r.url for r in first_images] == [r.url for r in second_images]
+    # Every caller gets its own result objects
+    assert all(a is not b for a, b in zip(first_images, second_images))
+
+
+def test_concurrent_identical_requests_submit_one_task(mock_server):
+    client = coalescing_client(mock_server)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda _: client.text_to_image(
+            "a cat", n=2, save=False, return_results=True
+        ), range(4)))
+
+    assert mock_server.stats["submitted"] == 1
+    assert all(len(images) == 2 for images in results)
+
+
+def test_different_requests_are_not_shared(mock_server):
+    client = coalescing_client(mock_server)
+
+    submit(client, seed=1).wait()
+    submit(client, seed=2).wait()
+
+    assert mock_server.stats["submitted"] == 2
+
+
+def test_canceling_one_sharer_keeps_the_task_for_the_others(mock_server):
+    mock_server.queue_time = 0.3
+    client = coalescing_client(mock_server)
+    first, second = submit(client), submit(client)
+
+    assert not first.cancel()
+
+    with pytest.raises(CancelledError):
+        first.result()
+    assert len(second.wait()) == 2
+    assert mock_server.stats["canceled"] == 0
+
+
+def test_task_is_canceled_with_its_last_sharer(mock_server):
+    mock_server.queue_time = 5
+    client = coalescing_client(mock_server)
+    first, second = submit(client), submit(client)
+
+    first.cancel()
+    assert second.cancel()
+
+    assert mock_server.stats["canceled"] == 1
+
+
+def test_failed_task_reaches_every_sharer(mock_server):
+    mock_server.task_failure_rate = 1.0
+    client = coalescing_client(mock_server)
+
+    handles = [submit(client), submit(client)]
+
+    for handle in handles:
+        with pytest.raises(RuntimeError):
+            handle.wait()
+    assert mock_server.stats["submitted"] == 1
+
+
+def test_failed_submission_reaches_every_waiter(mock_server):
+    client = coalescing_client(mock_server)
+    entered = threading.Event()
+
+    def refuse(kind, params, finish):
+        entered.set()
+        time.sleep(0.2)     # the other request joins while this one is in flight
+        raise RuntimeError("submission refused")
+    client._submit = refuse
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(submit, client)
+        entered.wait(5)
+        follower = pool.submit(submit, client)
+        for future in (leader, follower):
+            with pytest.raises(RuntimeError, match="submission refused"):
+                future.result()
+
+    # Nothing is left in flight, so the next request is submitted again
+    del client._submit
+    assert len(submit(client).wait()) == 2
@@ -0,0 +1,88 @@
+"""Task submissions are retried after throttling and network errors."""
+
+import asyncio
+
+import aiohttp
+import pytest
+
+import qwenimg.aio
+import qwenimg.client
+from qwenimg import AsyncQwenImg, QwenImg
+from qwenimg.config import DEFAULT_T2I_MODEL
+from qwenimg.ratelimit import RateLimiter
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(qwenimg.aio, "backoff_delay", lambda attempt: 0)
+    monkeypatch.setattr(qwenimg.client, "backoff_delay", lambda attempt: 0)
+
+
+@pytest.mark.parametrize("error", [
+    aiohttp.ServerDisconnectedError(),
+    aiohttp.ClientConnectionError("reset"),
+    asyncio.TimeoutError(),
+    ConnectionResetError(),
+])
+def test_async_submit_retries_network_errors(mock_server, error):
+    async def run():
+        async with AsyncQwenImg(api_key="sk-test", endpoint=mock_server.endpoint) as client:
+            task_api = client._task_api
+            calls = []
+
+            async def flaky(kind, method, *args, **kwargs):
+                if method == "async_call":
+                    calls.append(method)
+                    if len(calls) <= 2:
+                        raise error
+                return await task_api(kind, method, *args, **kwargs)
+
+            client._task_api = flaky
+            await client.text_to_image("a cat", save=False, return_results=True)
+            return len(calls)
+
+    assert asyncio.run(run()) == 3
+    assert mock_server.stats["submitted"] == 1
+
+
+def test_async_submit_gives_up_after_max_retries(mock_server, monkeypatch):
+    monkeypatch.setattr(qwenimg.aio, "SUBMIT_MAX_RETRIES", 2)
+
+    async def run():
+        async with AsyncQwenImg(api_key="sk-test", endpoint=mock_server.endpoint) as client:
+            async def down(kind, method, *args, **kwargs):
+                raise aiohttp.ClientConnectionError("down")
+
+            client._task_api = down
+            await client.text_to_image("a cat", save=False, return_results=True)
+
+    with pytest.raises(aiohttp.ClientConnectionError):
+        asyncio.run(run())
+
+
+def test_throttled_submissions_are_retried(mock_server):
+    mock_server.throttle_rate = 0.3
+    client = QwenImg(api_key="sk-test", endpoint=mock_server.endpoint)
+
+    images = [client.text_to_image("a cat", save=False, return_results=True) for _ in range(4)]
+
+    assert len(images) == 4
+    assert mock_server.stats["throttled"] > 0
+    assert mock_server.stats["submitted"] == 4
+
+
+def test_throttling_shrinks_the_concurrency_window_until_submissions_succeed(mock_server):
+    limiter = RateLimiter(qps=1000, max_concurrent_tasks=8)
+    client = QwenImg(api_key="sk-test", endpoint=mock_server.endpoint, rate_limiter=limiter)
+
+    mock_server.throttle_rate = 1.0
+    with pytest.raises(RuntimeError, match="Throttling"):
+        client.text_to_image("a cat", save=False, return_results=True)
+    assert limiter.windows() == {DEFAULT_T2I_MODEL: 4}
+
+    mock_server.throttle_rate = 0.0
+    mock_server.generation_time = 0.01
+    handles = [client.submit_text_to_image("a cat", save=False, return_results=True) for _ in range(25)]
+    client.wait(handles)
+
+    assert limiter.windows() == {DEFAULT_T2I_MODEL: 8}
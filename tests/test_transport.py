@@ -0,0 +1,84 @@
+"""HttpTransport retries: one retry layer, bounded attempts."""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from qwenimg.transport import HttpTransport
+
+
+class _Flaky:
+    """HTTP server answering the first `failures` requests with 503."""
+
+    def __init__(self, failures: int, body: bytes = b"payload"):
+        self.failures = failures
+        self.body = body
+        self.requests = 0
+        flaky = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                flaky.requests += 1
+                if flaky.requests <= flaky.failures:
+                    self.send_response(503)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(flaky.body)))
+                self.end_headers()
+                self.wfile.write(flaky.body)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/file"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def flaky():
+    servers = []
+
+    def make(failures):
+        servers.append(_Flaky(failures))
+        return servers[-1]
+    yield make
+    for server in servers:
+        server.close()
+
+
+def test_get_bytes_retries_retryable_status(flaky):
+    server = flaky(2)
+    with HttpTransport(max_retries=3, backoff=0) as transport:
+        assert transport.get_bytes(server.url) == b"payload"
+    assert server.requests == 3
+
+
+def test_get_bytes_tries_a_failing_url_max_retries_plus_one_times(flaky):
+    server = flaky(100)
+    with HttpTransport(max_retries=3, backoff=0) as transport:
+        with pytest.raises(requests.HTTPError):
+            transport.get_bytes(server.url)
+    assert server.requests == 4
+
+
+def test_connection_errors_are_retried_a_bounded_number_of_times():
+    attempts = []
+
+    class Refused(HttpTransport):
+        def _send(self, url, headers, stream):
+            attempts.append(url)
+            raise requests.ConnectionError("refused")
+
+    with Refused(max_retries=2, backoff=0) as transport:
+        with pytest.raises(requests.ConnectionError):
+            transport.get_bytes("http://127.0.0.1:9/file")
+    assert len(attempts) == 3
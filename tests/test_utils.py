@@ -0,0 +1,66 @@
+"""Local input preparation: data URI encoding and the prepared-input memos."""
+
+import base64
+import os
+
+import pytest
+
+from qwenimg import utils
+from qwenimg.utils import encode_image_to_base64, file_digest, set_data_uri_cache_size
+
+
+@pytest.fixture(autouse=True)
+def fresh_memos():
+    utils._data_uris.clear()
+    utils._file_digests.clear()
+    yield
+    set_data_uri_cache_size(0)
+
+
+@pytest.mark.parametrize("size", [0, 1, 2, 3, 1000, 3 * 256 * 1024, 3 * 256 * 1024 + 5, 2_000_001])
+def test_data_uri_matches_base64_of_the_file(tmp_path, size):
+    path = tmp_path / "image.png"
+    data = os.urandom(size)
+    path.write_bytes(data)
+
+    assert encode_image_to_base64(str(path)) == "data:image/png;base64," + base64.b64encode(data).decode("ascii")
+
+
+def test_data_uris_are_not_kept_by_default(tmp_path):
+    path = tmp_path / "image.png"
+    path.write_bytes(os.urandom(3000))
+
+    first = encode_image_to_base64(str(path))
+
+    assert encode_image_to_base64(str(path)) is not first
+    assert utils._data_uris._size == 0
+
+
+def test_data_uris_are_kept_once_enabled(tmp_path):
+    set_data_uri_cache_size(1024 * 1024)
+    path = tmp_path / "image.png"
+    path.write_bytes(os.urandom(3000))
+
+    first = encode_image_to_base64(str(path))
+
+    assert encode_image_to_base64(str(path)) is first
+    set_data_uri_cache_size(0)
+    assert utils._data_uris._size == 0
+
+
+def test_data_uri_is_recomputed_when_the_file_changes(tmp_path):
+    set_data_uri_cache_size(1024 * 1024)
+    path = tmp_path / "image.png"
+    path.write_bytes(b"one")
+    encode_image_to_base64(str(path))
+
+    path.write_bytes(b"second")
+
+    assert encode_image_to_base64(str(path)).endswith(base64.b64encode(b"second").decode("ascii"))
+
+
+def test_file_digests_are_remembered(tmp_path):
+    path = tmp_path / "image.png"
+    path.write_bytes(b"content")
+
+    assert file_digest(str(path)) is file_digest(str(path))